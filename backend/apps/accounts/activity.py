@@ -0,0 +1,153 @@
+"""
+Write-coalescing session activity tracking.
+
+Requests record ``(last_activity, ip_address)`` per session in a Redis hash at
+``SESSION_ACTIVITY_GRANULARITY`` resolution, so each session costs at most one
+Redis write per time bucket and later values simply overwrite earlier ones.
+A periodic task moves the hash aside and writes everything back to
+``UserSession`` with one bulk ``UPDATE ... FROM (VALUES ...)`` per batch.
+
+Client IPs are validated before they are buffered (invalid ones are stored
+as NULL). If writing a flush fails, its entries are merged back into the live
+hash for the next run, and hashes left behind by a flusher that died are
+picked up again once they are ``ORPHAN_AGE`` seconds old.
+"""
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+
+from .utils import normalize_ip
+
+REDIS_HASH_KEY = 'accounts:session_activity'
+FLUSHING_PREFIX = f'{REDIS_HASH_KEY}:flushing:'
+ORPHAN_AGE = 10 * 60
+
+_recorded_buckets = {}
+_recorded_lock = threading.Lock()
+_MAX_RECORDED = 50000
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def record_activity(session_key, ip_address, now=None):
+    """Record activity for a session, at most once per time bucket per process."""
+    granularity = getattr(settings, 'SESSION_ACTIVITY_GRANULARITY', 60)
+    now = now or time.time()
+    bucket = int(now // granularity)
+
+    with _recorded_lock:
+        if _recorded_buckets.get(session_key) == bucket:
+            return False
+        if len(_recorded_buckets) >= _MAX_RECORDED:
+            _recorded_buckets.clear()
+        _recorded_buckets[session_key] = bucket
+
+    _redis().hset(REDIS_HASH_KEY, session_key, json.dumps({
+        'ts': bucket * granularity,
+        'ip': normalize_ip(ip_address),
+    }))
+    return True
+
+
+def flush_activity(batch_size=1000):
+    """Write recorded activity back to UserSession. Returns sessions updated."""
+    redis = _redis()
+    _restore_orphans(redis)
+    flushing_key = f'{FLUSHING_PREFIX}{int(time.time())}:{uuid.uuid4().hex}'
+    try:
+        redis.rename(REDIS_HASH_KEY, flushing_key)
+    except Exception:
+        # Nothing recorded since the last flush.
+        if not redis.exists(REDIS_HASH_KEY):
+            return 0
+        raise
+
+    try:
+        entries = redis.hgetall(flushing_key)
+        rows = []
+        for session_key, raw in entries.items():
+            value = json.loads(raw)
+            rows.append((
+                session_key.decode() if isinstance(session_key, bytes) else session_key,
+                datetime.fromtimestamp(value['ts'], tz=dt_timezone.utc),
+                normalize_ip(value.get('ip')),
+            ))
+
+        updated = 0
+        for start in range(0, len(rows), batch_size):
+            updated += _bulk_update_sessions(rows[start:start + batch_size])
+    except Exception:
+        _restore(redis, flushing_key)
+        raise
+
+    redis.delete(flushing_key)
+    return updated
+
+
+def _restore(redis, flushing_key):
+    """Merge a flushing hash back into the live hash; newer live entries win."""
+    entries = redis.hgetall(flushing_key)
+    pipe = redis.pipeline()
+    for session_key, raw in entries.items():
+        pipe.hsetnx(REDIS_HASH_KEY, session_key, raw)
+    pipe.delete(flushing_key)
+    pipe.execute()
+
+
+def _restore_orphans(redis):
+    """Restore flushing hashes left behind by flushers that died mid-write."""
+    cutoff = time.time() - ORPHAN_AGE
+    for key in redis.scan_iter(match=f'{FLUSHING_PREFIX}*'):
+        key = key.decode() if isinstance(key, bytes) else key
+        try:
+            started = int(key[len(FLUSHING_PREFIX):].split(':')[0])
+        except ValueError:
+            started = 0
+        if started < cutoff:
+            _restore(redis, key)
+
+
+def _bulk_update_sessions(rows):
+    from .models import UserSession
+
+    if connection.vendor != 'postgresql':
+        return _bulk_update_sessions_portable(rows)
+
+    qn = connection.ops.quote_name
+    table = qn(UserSession._meta.db_table)
+    values = ', '.join(['(%s, %s::timestamptz, %s::inet)'] * len(rows))
+    params = [param for row in rows for param in row]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} AS s '
+            f'SET last_activity = v.last_activity, ip_address = v.ip_address '
+            f'FROM (VALUES {values}) AS v(session_key, last_activity, ip_address) '
+            f'WHERE s.session_key = v.session_key AND s.last_activity < v.last_activity',
+            params
+        )
+        return cursor.rowcount
+
+
+def _bulk_update_sessions_portable(rows):
+    from .models import UserSession
+
+    latest = {session_key: (last_activity, ip) for session_key, last_activity, ip in rows}
+    sessions = list(UserSession.objects.filter(session_key__in=latest).only('pk', 'session_key', 'last_activity'))
+    changed = []
+    for session in sessions:
+        last_activity, ip = latest[session.session_key]
+        if session.last_activity < last_activity:
+            session.last_activity = last_activity
+            session.ip_address = ip
+            changed.append(session)
+    # queryset.bulk_update() skips auto_now, so last_activity keeps our value
+    UserSession.objects.bulk_update(changed, ['last_activity', 'ip_address'])
+    return len(changed)
@@ -4,7 +4,7 @@ Admin configuration for accounts app.
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import User, UserProfile, Role, UserSession, LoginAttempt
+from .models import User, UserProfile, Role, UserSession, LoginAttempt, UserStats
 
 
 @admin.register(Role)
@@ -103,3 +103,13 @@ class LoginAttemptAdmin(admin.ModelAdmin):
     search_fields = ['email', 'ip_address']
     readonly_fields = ['email', 'ip_address', 'user_agent', 'success', 'failure_reason', 'created_at']
 
+
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = [
+        'user', 'contracts_total', 'contracts_deployed', 'transactions_total',
+        'total_spend', 'last_deployment_at', 'updated_at'
+    ]
+    search_fields = ['user__email']
+    readonly_fields = [field.name for field in UserStats._meta.fields]
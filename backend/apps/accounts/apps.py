@@ -6,3 +6,5 @@ class AccountsConfig(AppConfig):
     name = 'apps.accounts'
     verbose_name = 'User Accounts'
 
+    def ready(self):
+        from . import signals  # noqa: F401
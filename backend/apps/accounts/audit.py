@@ -0,0 +1,247 @@
+"""
+Buffered login audit writes.
+
+Login attempts and session upserts are queued instead of being written inside
+the login request. A background flusher persists them in batches with
+``bulk_create`` every ``LOGIN_AUDIT_FLUSH_INTERVAL_MS`` milliseconds or as soon
+as ``LOGIN_AUDIT_BATCH_SIZE`` events are waiting.
+
+Backends (``LOGIN_AUDIT_BACKEND``):
+
+* ``memory`` - per-process queue drained by a daemon thread.
+* ``redis`` - shared Redis list, drained by the flusher of any process.
+* ``sync`` - write immediately; intended for tests and management commands.
+
+Events are cleaned when they are queued (invalid IPs become NULL, long
+values are truncated). If a batch still fails on bad data, its events are
+written one by one and those that fail again are logged and moved to a
+dead-letter list (``redis`` backend), so one bad row never blocks the queue.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections
+
+from .utils import normalize_ip
+
+logger = logging.getLogger(__name__)
+
+REDIS_QUEUE_KEY = 'accounts:login_audit'
+REDIS_DEAD_LETTER_KEY = 'accounts:login_audit:dead'
+
+# Errors that mean the database is unavailable, not that the events are bad.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+EVENT_LOGIN_ATTEMPT = 'login_attempt'
+EVENT_USER_SESSION = 'user_session'
+
+
+class LoginAuditBuffer:
+    """
+    Queue of pending login audit events with a background flusher.
+    """
+    def __init__(self, backend='memory', flush_interval_ms=500, batch_size=200, max_buffer_size=10000):
+        self.backend = backend
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.max_buffer_size = max_buffer_size
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def record_attempt(self, email, ip_address, user_agent, success, failure_reason=''):
+        """Queue a LoginAttempt row."""
+        from .models import LoginAttempt
+
+        fields = LoginAttempt._meta
+        self.enqueue({
+            'type': EVENT_LOGIN_ATTEMPT,
+            'email': str(email or '')[:fields.get_field('email').max_length],
+            'ip_address': normalize_ip(ip_address),
+            'user_agent': user_agent or '',
+            'success': success,
+            'failure_reason': (failure_reason or '')[:fields.get_field('failure_reason').max_length],
+        })
+
+    def record_session(self, session_key, user_id, ip_address, user_agent):
+        """Queue an upsert of the UserSession for ``session_key``."""
+        self.enqueue({
+            'type': EVENT_USER_SESSION,
+            'session_key': session_key,
+            'user_id': user_id,
+            'ip_address': normalize_ip(ip_address),
+            'user_agent': user_agent or '',
+        })
+
+    def enqueue(self, event):
+        if self.backend == 'sync':
+            persist_events([event])
+            return
+
+        if self.backend == 'redis':
+            self._redis().rpush(REDIS_QUEUE_KEY, json.dumps(event))
+            pending = None
+        else:
+            with self._lock:
+                if len(self._queue) >= self.max_buffer_size:
+                    logger.warning('Login audit buffer full, dropping %s event', event['type'])
+                    return
+                self._queue.append(event)
+                pending = len(self._queue)
+
+        self._ensure_flusher()
+        if pending is not None and pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Persist every queued event. Returns the number of events written."""
+        written = 0
+        while True:
+            events = self._take(self.batch_size)
+            if not events:
+                return written
+            try:
+                persist_events(events)
+            except TRANSIENT_ERRORS:
+                logger.exception('Failed to persist %d login audit events', len(events))
+                self._requeue(events)
+                return written
+            except Exception:
+                logger.warning(
+                    'Batch of %d login audit events failed, writing them one by one',
+                    len(events), exc_info=True
+                )
+                count, complete = self._persist_each(events)
+                written += count
+                if not complete:
+                    return written
+            else:
+                written += len(events)
+
+    def _persist_each(self, events):
+        """
+        Write events one at a time, dead-lettering those that fail.
+
+        Returns ``(written, complete)``; on a database outage the remaining
+        events are requeued and ``complete`` is False.
+        """
+        written = 0
+        for index, event in enumerate(events):
+            try:
+                persist_events([event])
+            except TRANSIENT_ERRORS:
+                logger.exception('Failed to persist login audit events')
+                self._requeue(events[index:])
+                return written, False
+            except Exception as exc:
+                self._dead_letter(event, exc)
+            else:
+                written += 1
+        return written, True
+
+    def _dead_letter(self, event, error):
+        logger.error('Dropping login audit event %s: %s', json.dumps(event), error)
+        if self.backend == 'redis':
+            pipe = self._redis().pipeline()
+            pipe.rpush(REDIS_DEAD_LETTER_KEY, json.dumps({**event, 'error': str(error)}))
+            pipe.ltrim(REDIS_DEAD_LETTER_KEY, -self.max_buffer_size, -1)
+            pipe.execute()
+
+    def _take(self, count):
+        if self.backend == 'redis':
+            pipe = self._redis().pipeline()
+            pipe.lrange(REDIS_QUEUE_KEY, 0, count - 1)
+            pipe.ltrim(REDIS_QUEUE_KEY, count, -1)
+            raw_events, _ = pipe.execute()
+            return [json.loads(raw) for raw in raw_events]
+
+        with self._lock:
+            return [self._queue.popleft() for _ in range(min(count, len(self._queue)))]
+
+    def _requeue(self, events):
+        if self.backend == 'redis':
+            self._redis().lpush(REDIS_QUEUE_KEY, *[json.dumps(event) for event in reversed(events)])
+            return
+
+        with self._lock:
+            room = self.max_buffer_size - len(self._queue)
+            if room > 0:
+                self._queue.extendleft(reversed(events[:room]))
+
+    def _ensure_flusher(self):
+        # The flusher thread does not survive a fork, so track the owning pid
+        # and start a fresh thread in each worker process.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='login-audit-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+    def _redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+
+def persist_events(events):
+    """Write a batch of audit events with one statement per table."""
+    from .models import LoginAttempt, UserSession
+
+    attempts = []
+    sessions = {}
+    for event in events:
+        if event['type'] == EVENT_LOGIN_ATTEMPT:
+            attempts.append(LoginAttempt(
+                email=event['email'],
+                ip_address=event['ip_address'],
+                user_agent=event['user_agent'],
+                success=event['success'],
+                failure_reason=event['failure_reason'],
+            ))
+        elif event['type'] == EVENT_USER_SESSION:
+            # An upsert cannot touch the same row twice, keep the latest event.
+            sessions[event['session_key']] = UserSession(
+                session_key=event['session_key'],
+                user_id=event['user_id'],
+                ip_address=event['ip_address'],
+                user_agent=event['user_agent'],
+                is_active=True,
+            )
+
+    if attempts:
+        LoginAttempt.objects.bulk_create(attempts)
+    if sessions:
+        UserSession.objects.bulk_create(
+            sessions.values(),
+            update_conflicts=True,
+            unique_fields=['session_key'],
+            update_fields=['user', 'ip_address', 'user_agent', 'last_activity', 'is_active'],
+        )
+
+
+login_audit = LoginAuditBuffer(
+    backend=getattr(settings, 'LOGIN_AUDIT_BACKEND', 'memory'),
+    flush_interval_ms=getattr(settings, 'LOGIN_AUDIT_FLUSH_INTERVAL_MS', 500),
+    batch_size=getattr(settings, 'LOGIN_AUDIT_BATCH_SIZE', 200),
+    max_buffer_size=getattr(settings, 'LOGIN_AUDIT_MAX_BUFFER_SIZE', 10000),
+)
+
+atexit.register(login_audit.flush)
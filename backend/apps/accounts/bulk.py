@@ -0,0 +1,277 @@
+"""
+Streaming bulk import and export of users.
+
+Records are read and written one at a time as CSV or JSON Lines, so memory
+use depends on the batch size and not on the file size. Imports validate
+every record against the model fields, hash passwords in a process pool and
+insert the valid users and profiles with one ``bulk_create`` per batch;
+rejected records are reported with their reasons. Exports walk the table
+with a server-side cursor.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import validate_email
+from django.db import transaction
+
+USER_FIELDS = (
+    'email', 'first_name', 'last_name', 'phone_number', 'country', 'language',
+    'wallet_address', 'wallet_type', 'subscription_type',
+    'is_active', 'is_verified', 'email_notifications', 'sms_notifications',
+)
+
+PROFILE_FIELDS = (
+    'company_name', 'job_title', 'industry',
+    'address_line_1', 'address_line_2', 'city', 'state_province', 'postal_code',
+    'website', 'linkedin_profile', 'twitter_handle', 'bio', 'timezone',
+)
+
+BOOLEAN_FIELDS = {'is_active', 'is_verified', 'email_notifications', 'sms_notifications'}
+
+EXPORT_FIELDS = (
+    ('id', 'id'),
+    *((field, field) for field in USER_FIELDS),
+    ('role', 'role__name'),
+    ('date_joined', 'date_joined'),
+    *((field, f'profile__{field}') for field in PROFILE_FIELDS),
+)
+
+FORMATS = ('csv', 'jsonl')
+
+
+class UserImportError(Exception):
+    """Raised for a record that cannot be imported."""
+
+
+def detect_format(path, fmt=None):
+    """Return the record format, taken from ``fmt`` or the file extension."""
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path or '')[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_records(stream, fmt):
+    """Yield one dict per CSV row or JSON line."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y', 't')
+
+
+def _init_worker():
+    # Spawned workers start without Django configured.
+    import django
+    django.setup()
+
+
+class UserImporter:
+    """
+    Batched user importer.
+
+    Rows that fail model validation, carry an unrecognised password hash, or
+    whose email already exists or repeats within the file are skipped and
+    reported instead of aborting the import.
+    """
+    def __init__(self, batch_size=1000, workers=None, default_role=None):
+        from .models import User
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.default_role = default_role
+        self.normalize_email = User.objects.normalize_email
+        self._roles = None
+        self.created = 0
+        self.skipped = []
+
+    def run(self, records):
+        """Import every record. Returns the number of users created."""
+        records = iter(records)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            line = 0
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    return self.created
+                self.import_batch(batch, pool, first_line=line + 1)
+                line += len(batch)
+
+    def import_batch(self, records, pool, first_line=1):
+        from .models import User, UserProfile
+
+        rows = self._clean(records, first_line)
+        if not rows:
+            return
+
+        existing = set(
+            User.objects.filter(email__in=[row['email'] for row in rows])
+            .values_list('email', flat=True)
+        )
+        for row in rows:
+            if row['email'] in existing:
+                self.skipped.append((row['line'], f"{row['email']} already exists"))
+        rows = [row for row in rows if row['email'] not in existing]
+        if not rows:
+            return
+
+        # Raw passwords are hashed across the pool; pre-hashed and missing
+        # passwords need no work.
+        to_hash = [row for row in rows if row['password']]
+        hashes = pool.map(
+            make_password,
+            [row['password'] for row in to_hash],
+            chunksize=max(1, len(to_hash) // (self.workers * 4)),
+        )
+        for row, hashed in zip(to_hash, hashes):
+            row['password_hash'] = hashed
+
+        users = []
+        for row in rows:
+            user = row['user']
+            user.password = row['password_hash'] or make_password(None)
+            users.append(user)
+
+        with transaction.atomic():
+            users = User.objects.bulk_create(users, batch_size=self.batch_size)
+            if any(user.pk is None for user in users):
+                # Backends that do not return ids on insert.
+                ids = dict(
+                    User.objects.filter(email__in=[user.email for user in users])
+                    .values_list('email', 'pk')
+                )
+                for user in users:
+                    user.pk = ids[user.email]
+            for user, row in zip(users, rows):
+                row['profile'].user_id = user.pk
+            UserProfile.objects.bulk_create([row['profile'] for row in rows], batch_size=self.batch_size)
+        self.created += len(users)
+
+    def _clean(self, records, first_line):
+        from .models import User, UserProfile
+
+        rows = []
+        seen = set()
+        for line, record in enumerate(records, start=first_line):
+            email = self.normalize_email((record.get('email') or '').strip())
+            try:
+                validate_email(email)
+            except ValidationError:
+                self.skipped.append((line, f'invalid email {email!r}'))
+                continue
+            if email in seen:
+                self.skipped.append((line, f'{email} repeated in file'))
+                continue
+            seen.add(email)
+
+            role_name = (record.get('role') or '').strip() or self.default_role
+            try:
+                role_id = self.resolve_role(role_name)
+            except UserImportError as exc:
+                self.skipped.append((line, str(exc)))
+                continue
+
+            password_hash = record.get('password_hash') or None
+            if password_hash and not password_hash.startswith(UNUSABLE_PASSWORD_PREFIX):
+                try:
+                    identify_hasher(password_hash)
+                except ValueError:
+                    self.skipped.append((line, 'unrecognised password_hash'))
+                    continue
+
+            fields = {}
+            for field in USER_FIELDS:
+                value = record.get(field)
+                if value in (None, ''):
+                    continue
+                fields[field] = _to_bool(value) if field in BOOLEAN_FIELDS else value
+            fields['email'] = email
+            user = User(role_id=role_id, **fields)
+            profile = UserProfile(
+                **{field: record[field] for field in PROFILE_FIELDS if record.get(field) not in (None, '')}
+            )
+
+            # Uniqueness is checked per batch with one query, and the role was
+            # resolved above, so validation makes no queries.
+            errors = self._validation_errors(user, exclude=['password', 'role'])
+            errors += self._validation_errors(profile, exclude=['user'])
+            if errors:
+                self.skipped.append((line, '; '.join(errors)))
+                continue
+
+            rows.append({
+                'line': line,
+                'email': email,
+                'user': user,
+                'profile': profile,
+                'password': record.get('password') or None,
+                'password_hash': password_hash,
+            })
+        return rows
+
+    @staticmethod
+    def _validation_errors(instance, exclude):
+        try:
+            instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+        except ValidationError as exc:
+            return [
+                f"{field}: {' '.join(messages)}" for field, messages in exc.message_dict.items()
+            ]
+        return []
+
+    def resolve_role(self, name):
+        """Return the id of the role called ``name``."""
+        if not name:
+            return None
+        if self._roles is None:
+            from .models import Role
+            self._roles = dict(Role.objects.values_list('name', 'pk'))
+        if name not in self._roles:
+            raise UserImportError(f'unknown role {name!r}')
+        return self._roles[name]
+
+
+def export_users(stream, fmt='csv', queryset=None, chunk_size=2000, include_password_hash=False):
+    """Write users to ``stream``. Returns the number of users written."""
+    from .models import User
+
+    fields = list(EXPORT_FIELDS)
+    if include_password_hash:
+        fields.append(('password_hash', 'password'))
+    names = [name for name, _ in fields]
+    lookups = [lookup for _, lookup in fields]
+
+    queryset = User.objects.all() if queryset is None else queryset
+    rows = queryset.order_by('pk').values_list(*lookups).iterator(chunk_size=chunk_size)
+
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(names)
+        write = writer.writerow
+    else:
+        encoder = DjangoJSONEncoder()
+
+        def write(row):
+            stream.write(encoder.encode(dict(zip(names, row))))
+            stream.write('\n')
+
+    written = 0
+    for row in rows:
+        write(row)
+        written += 1
+    return written
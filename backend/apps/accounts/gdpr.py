@@ -0,0 +1,218 @@
+"""
+GDPR data export archives.
+
+A user's data is written as a ZIP archive produced incrementally: every table
+becomes a JSON Lines entry filled from a chunked queryset, and uploaded
+documents are copied in fixed-size chunks. The archive can be streamed
+straight into an HTTP response or written to a file in the background, and
+neither path holds more than one chunk of rows or file data in memory.
+"""
+import json
+import os
+import time
+import zipfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Fields never included in an export.
+EXCLUDED_FIELDS = {
+    'accounts.User': {'password'},
+}
+
+
+def _sections(user):
+    """Return ``(entry_name, queryset)`` pairs holding the user's rows."""
+    model = apps.get_model
+    return [
+        ('user.jsonl', model('accounts', 'User').objects.filter(pk=user.pk)),
+        ('profile.jsonl', model('accounts', 'UserProfile').objects.filter(user_id=user.pk)),
+        ('sessions.jsonl', model('accounts', 'UserSession').objects.filter(user_id=user.pk)),
+        ('login_attempts.jsonl', model('accounts', 'LoginAttempt').objects.filter(email=user.email)),
+        ('contracts.jsonl', model('contracts', 'SmartContract').all_objects.filter(user_id=user.pk)),
+        ('deployment_logs.jsonl', model('contracts', 'ContractDeploymentLog').objects.filter(contract__user_id=user.pk)),
+        ('transactions.jsonl', model('transactions', 'Transaction').objects.filter(user_id=user.pk)),
+        ('payment_methods.jsonl', model('transactions', 'PaymentMethod').objects.filter(user_id=user.pk)),
+        ('subscriptions.jsonl', model('transactions', 'Subscription').objects.filter(user_id=user.pk)),
+    ]
+
+
+class _ZipStream:
+    """
+    Write-only file object collecting what ``ZipFile`` writes until drained.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Yield everything written since the last drain, if anything."""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        if data:
+            yield data
+
+
+def _iter_rows(queryset, chunk_size):
+    meta = queryset.model._meta
+    excluded = EXCLUDED_FIELDS.get(meta.label, set())
+    fields = [field.attname for field in meta.concrete_fields if field.name not in excluded]
+    return queryset.order_by('pk').values(*fields).iterator(chunk_size=chunk_size)
+
+
+def iter_export_archive(user, chunk_size=500):
+    """Yield the bytes of the user's export archive, entry by entry."""
+    SmartContract = apps.get_model('contracts', 'SmartContract')
+    encoder = DjangoJSONEncoder()
+    stream = _ZipStream()
+
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        manifest = {
+            'user_id': user.pk,
+            'email': user.email,
+            'generated_at': timezone.now(),
+            'entries': [],
+        }
+
+        for name, queryset in _sections(user):
+            with archive.open(f'data/{name}', 'w', force_zip64=True) as entry:
+                rows = 0
+                for row in _iter_rows(queryset, chunk_size):
+                    entry.write(encoder.encode(row).encode())
+                    entry.write(b'\n')
+                    rows += 1
+                    if rows % chunk_size == 0:
+                        yield from stream.drain()
+            manifest['entries'].append({'name': f'data/{name}', 'rows': rows})
+            yield from stream.drain()
+
+        documents = (
+            SmartContract.all_objects
+            .filter(user_id=user.pk)
+            .exclude(document_file='')
+            .exclude(document_file__isnull=True)
+            .order_by('pk')
+            .values_list('pk', 'document_file')
+            .iterator(chunk_size=chunk_size)
+        )
+        storage = SmartContract._meta.get_field('document_file').storage
+        for contract_id, file_name in documents:
+            name = f'documents/{contract_id}/{os.path.basename(file_name)}'
+            try:
+                source = storage.open(file_name, 'rb')
+            except (FileNotFoundError, OSError):
+                manifest['entries'].append({'name': name, 'missing': True})
+                continue
+            info = zipfile.ZipInfo(name, date_time=timezone.now().timetuple()[:6])
+            # PDF and DOCX documents are already compressed, so store them as is.
+            info.compress_type = zipfile.ZIP_STORED
+            with source, archive.open(info, 'w', force_zip64=True) as entry:
+                while True:
+                    chunk = source.read(FILE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    entry.write(chunk)
+                    yield from stream.drain()
+            manifest['entries'].append({'name': name})
+            yield from stream.drain()
+
+        archive.writestr('manifest.json', json.dumps(manifest, cls=DjangoJSONEncoder, indent=2))
+
+    yield from stream.drain()
+
+
+def export_filename(user):
+    return f'blockbustre-export-{user.pk}-{timezone.now():%Y%m%d%H%M%S}.zip'
+
+
+def write_export_archive(user, path):
+    """Write the user's export archive to ``path``."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f'{path}.part'
+    with open(partial, 'wb') as output:
+        for chunk in iter_export_archive(user):
+            output.write(chunk)
+    os.replace(partial, path)
+    return path
+
+
+def _status_key(user_id):
+    return f'accounts:gdpr_export:{user_id}'
+
+
+def get_export_status(user_id):
+    """Return the status dict of the user's latest background export, if any."""
+    return cache.get(_status_key(user_id))
+
+
+def set_export_status(user_id, **status):
+    cache.set(_status_key(user_id), status, getattr(settings, 'GDPR_EXPORT_TTL', 7 * 24 * 60 * 60))
+
+
+def is_export_pending(export):
+    """
+    Return whether an export is queued or running.
+
+    A pending export older than ``GDPR_EXPORT_PENDING_TIMEOUT`` seconds is
+    treated as lost, so the user can request a new one.
+    """
+    if not export or export.get('status') != 'pending':
+        return False
+    timeout = getattr(settings, 'GDPR_EXPORT_PENDING_TIMEOUT', 30 * 60)
+    requested_at = export.get('requested_at') or 0
+    return timezone.now().timestamp() - requested_at < timeout
+
+
+def export_path(user):
+    return os.path.join(str(settings.GDPR_EXPORT_DIR), str(user.pk), export_filename(user))
+
+
+def cleanup_expired_exports(max_age=None):
+    """
+    Delete export archives older than ``max_age`` seconds.
+
+    Archives outlive their status entry otherwise, since only a user's next
+    export removes the previous one. The archive a live status still points
+    at is kept, and so is any file younger than ``GDPR_EXPORT_TTL``, which
+    also leaves exports being written alone.
+    """
+    max_age = max_age or getattr(settings, 'GDPR_EXPORT_TTL', 7 * 24 * 60 * 60)
+    root = str(settings.GDPR_EXPORT_DIR)
+    cutoff = time.time() - max_age
+    deleted = 0
+
+    try:
+        user_dirs = os.listdir(root)
+    except FileNotFoundError:
+        return {'deleted': 0}
+
+    for user_id in user_dirs:
+        directory = os.path.join(root, user_id)
+        if not os.path.isdir(directory):
+            continue
+        live = (get_export_status(user_id) or {}).get('path')
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            try:
+                if path == live or os.path.getmtime(path) >= cutoff:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            deleted += 1
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
+    return {'deleted': deleted}
@@ -0,0 +1,66 @@
+"""
+Management command to stream users out as CSV or JSON Lines.
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.bulk import FORMATS, detect_format, export_users
+from apps.accounts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Export users and profiles to a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help="Destination file, or '-' for stdout (default)"
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Record format (default: from the file extension, else csv)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched per round trip from the server-side cursor'
+        )
+        parser.add_argument(
+            '--active-only',
+            action='store_true',
+            help='Only export active users'
+        )
+        parser.add_argument(
+            '--include-password-hash',
+            action='store_true',
+            help='Include password hashes so the file can be re-imported'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = detect_format(None if output == '-' else output, options['format'])
+        queryset = User.objects.all()
+        if options['active_only']:
+            queryset = queryset.filter(is_active=True)
+
+        kwargs = {
+            'fmt': fmt,
+            'queryset': queryset,
+            'chunk_size': options['chunk_size'],
+            'include_password_hash': options['include_password_hash'],
+        }
+        if output == '-':
+            written = export_users(sys.stdout, **kwargs)
+        else:
+            try:
+                stream = open(output, 'w', newline='', encoding='utf-8')
+            except OSError as exc:
+                raise CommandError(str(exc))
+            with stream:
+                written = export_users(stream, **kwargs)
+
+        self.stderr.write(self.style.SUCCESS(f'Exported {written} users'))
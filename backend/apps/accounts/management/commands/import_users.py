@@ -0,0 +1,65 @@
+"""
+Management command to bulk import users from CSV or JSON Lines.
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.bulk import FORMATS, UserImporter, UserImportError, detect_format, read_records
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users and profiles from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Record format (default: from the file extension, else csv)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users inserted per batch'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Password hashing processes (default: CPU count)'
+        )
+        parser.add_argument(
+            '--role',
+            help='Role name assigned to rows without a role column'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(None if path == '-' else path, options['format'])
+        importer = UserImporter(
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            default_role=options['role'],
+        )
+        if options['role']:
+            try:
+                importer.resolve_role(options['role'])
+            except UserImportError as exc:
+                raise CommandError(str(exc))
+
+        if path == '-':
+            created = importer.run(read_records(sys.stdin, fmt))
+        else:
+            try:
+                stream = open(path, newline='', encoding='utf-8')
+            except OSError as exc:
+                raise CommandError(str(exc))
+            with stream:
+                created = importer.run(read_records(stream, fmt))
+
+        for line, reason in importer.skipped:
+            self.stderr.write(f'Record {line} skipped: {reason}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Imported {created} users, skipped {len(importer.skipped)}')
+        )
@@ -0,0 +1,61 @@
+"""
+Management command to copy simplejwt's blacklisted tokens into the revocation store.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.accounts.revocation import get_revocation_store
+
+
+class Command(BaseCommand):
+    help = 'Copy unexpired blacklisted tokens into the JWT revocation store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tokens written to the store per batch'
+        )
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help='Delete the outstanding/blacklisted token rows once migrated'
+        )
+
+    def handle(self, *args, **options):
+        if not apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+            raise CommandError(
+                "'rest_framework_simplejwt.token_blacklist' must be in INSTALLED_APPS "
+                "to read the existing blacklist."
+            )
+
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+        batch_size = options['batch_size']
+        store = get_revocation_store()
+        rows = (
+            BlacklistedToken.objects
+            .filter(token__expires_at__gt=timezone.now())
+            .values_list('token__jti', 'token__expires_at')
+            .iterator(chunk_size=batch_size)
+        )
+
+        batch = []
+        total = 0
+        for jti, expires_at in rows:
+            batch.append((jti, expires_at.timestamp()))
+            if len(batch) >= batch_size:
+                store.revoke_many(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            store.revoke_many(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Migrated {total} revoked tokens'))
+
+        if options['purge']:
+            deleted, _ = OutstandingToken.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} blacklist rows'))
@@ -0,0 +1,112 @@
+"""
+Management command to recompute UserStats counters from source tables.
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from apps.accounts.models import (
+    User, UserStats, CONTRACT_STAT_STATUSES, TRANSACTION_STAT_STATUSES
+)
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user contract and transaction statistics in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users recomputed per batch'
+        )
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='user_ids',
+            type=int,
+            help='Only reconcile the given user id (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        users = User.objects.order_by('pk').values_list('pk', flat=True)
+        if options['user_ids']:
+            users = users.filter(pk__in=options['user_ids'])
+
+        batch = []
+        total = 0
+        for user_id in users.iterator(chunk_size=batch_size):
+            batch.append(user_id)
+            if len(batch) >= batch_size:
+                total += reconcile_users(batch)
+                batch = []
+        if batch:
+            total += reconcile_users(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Reconciled statistics for {total} users')
+        )
+
+
+def reconcile_users(user_ids):
+    """Recompute and upsert UserStats rows for the given users."""
+    from apps.contracts.models import SmartContract
+    from apps.transactions.models import Transaction
+
+    # Soft-deleted contracts are not counted, but still set the last deployment
+    live = Q(is_deleted=False)
+    contract_aggregates = {
+        'contracts_total': Count('id', filter=live),
+        'last_deployment_at': Max('updated_at', filter=Q(status__in=['deployed', 'verified'])),
+    }
+    for status in CONTRACT_STAT_STATUSES:
+        contract_aggregates[f'contracts_{status}'] = Count('id', filter=live & Q(status=status))
+
+    transaction_aggregates = {
+        'transactions_total': Count('id'),
+        'total_spend': Sum('amount', filter=Q(status='completed') & ~Q(transaction_type='refund')),
+    }
+    for status in TRANSACTION_STAT_STATUSES:
+        transaction_aggregates[f'transactions_{status}'] = Count('id', filter=Q(status=status))
+
+    rows = {user_id: {} for user_id in user_ids}
+    contract_rows = (
+        SmartContract.all_objects
+        .filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(**contract_aggregates)
+        .order_by()
+    )
+    for row in contract_rows:
+        rows[row.pop('user_id')].update(row)
+
+    transaction_rows = (
+        Transaction.objects
+        .filter(user_id__in=user_ids)
+        .values('user_id')
+        .annotate(**transaction_aggregates)
+        .order_by()
+    )
+    for row in transaction_rows:
+        rows[row.pop('user_id')].update(row)
+
+    now = timezone.now()
+    stats = []
+    for user_id, values in rows.items():
+        values['total_spend'] = values.get('total_spend') or Decimal('0')
+        stats.append(UserStats(user_id=user_id, updated_at=now, **values))
+
+    update_fields = [
+        field.name for field in UserStats._meta.concrete_fields
+        if field.name != 'user'
+    ]
+    UserStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=update_fields,
+    )
+    return len(stats)
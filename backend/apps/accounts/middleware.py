@@ -0,0 +1,50 @@
+"""
+Middleware for the accounts app.
+"""
+import logging
+
+from django.conf import settings
+
+from .activity import record_activity
+from .utils import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+
+class SessionActivityMiddleware:
+    """
+    Record per-session activity for authenticated requests.
+
+    The session is identified by the ``sid`` claim of the JWT that DRF
+    authenticated the request with, or by the Django session key for
+    session-authenticated requests. Recording never fails the request.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if getattr(settings, 'SESSION_ACTIVITY_TRACKING_ENABLED', True):
+            session_key = self._get_session_key(request)
+            if session_key:
+                try:
+                    record_activity(session_key, get_client_ip(request))
+                except Exception:
+                    logger.warning('Could not record session activity', exc_info=True)
+
+        return response
+
+    def _get_session_key(self, request):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+
+        token = getattr(request, 'auth', None)
+        if token is not None and hasattr(token, 'get'):
+            session_key = token.get('sid')
+            if session_key:
+                return session_key
+
+        session = getattr(request, 'session', None)
+        return session.session_key if session is not None else None
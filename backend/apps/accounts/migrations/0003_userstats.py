@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('contracts_total', models.IntegerField(default=0)),
+                ('contracts_draft', models.IntegerField(default=0)),
+                ('contracts_pending', models.IntegerField(default=0)),
+                ('contracts_processing', models.IntegerField(default=0)),
+                ('contracts_deployed', models.IntegerField(default=0)),
+                ('contracts_verified', models.IntegerField(default=0)),
+                ('contracts_failed', models.IntegerField(default=0)),
+                ('contracts_cancelled', models.IntegerField(default=0)),
+                ('last_deployment_at', models.DateTimeField(blank=True, null=True)),
+                ('transactions_total', models.IntegerField(default=0)),
+                ('transactions_pending', models.IntegerField(default=0)),
+                ('transactions_processing', models.IntegerField(default=0)),
+                ('transactions_completed', models.IntegerField(default=0)),
+                ('transactions_failed', models.IntegerField(default=0)),
+                ('transactions_cancelled', models.IntegerField(default=0)),
+                ('transactions_refunded', models.IntegerField(default=0)),
+                ('total_spend', models.DecimalField(decimal_places=8, default=0, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Stats',
+                'verbose_name_plural': 'User Stats',
+            },
+        ),
+    ]
@@ -171,12 +171,19 @@ class User(AbstractUser, TimestampedModel):
             return self.role.get_permissions()
         return Permission.objects.none()
 
+    def get_role_permission_codenames(self):
+        """
+        Get the cached set of permission codenames for the user's role.
+        """
+        from .rbac import get_role_permission_codenames
+        return get_role_permission_codenames(self.role_id)
+
     def has_role_permission(self, permission_codename):
         """
         Check if user has a specific permission through their role.
         """
-        if self.role:
-            return self.role.permissions.filter(codename=permission_codename).exists()
+        if self.role_id:
+            return permission_codename in self.get_role_permission_codenames()
         return False
 
     def is_subscriber(self):
@@ -264,7 +271,8 @@ class UserSession(models.Model):
         related_name='sessions'
     )
     session_key = models.CharField(max_length=40, unique=True)
-    ip_address = models.GenericIPAddressField()
+    # Null when the client sent an address that is not a valid IP.
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     last_activity = models.DateTimeField(auto_now=True)
@@ -282,7 +290,8 @@ class LoginAttempt(models.Model):
     Track login attempts for security monitoring.
     """
     email = models.EmailField()
-    ip_address = models.GenericIPAddressField()
+    # Null when the client sent an address that is not a valid IP.
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField()
     success = models.BooleanField(default=False)
     failure_reason = models.CharField(max_length=100, blank=True)
@@ -299,3 +308,95 @@ class LoginAttempt(models.Model):
         status = "Success" if self.success else "Failed"
         return f"{self.email} - {status} - {self.created_at}"
 
+
+
+class UserStats(models.Model):
+    """
+    Per-user counters maintained incrementally from contract and transaction
+    lifecycle signals, so dashboard statistics never scan the user's history.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        primary_key=True
+    )
+
+    # Smart contracts (soft-deleted contracts are not counted)
+    contracts_total = models.IntegerField(default=0)
+    contracts_draft = models.IntegerField(default=0)
+    contracts_pending = models.IntegerField(default=0)
+    contracts_processing = models.IntegerField(default=0)
+    contracts_deployed = models.IntegerField(default=0)
+    contracts_verified = models.IntegerField(default=0)
+    contracts_failed = models.IntegerField(default=0)
+    contracts_cancelled = models.IntegerField(default=0)
+    last_deployment_at = models.DateTimeField(null=True, blank=True)
+
+    # Transactions
+    transactions_total = models.IntegerField(default=0)
+    transactions_pending = models.IntegerField(default=0)
+    transactions_processing = models.IntegerField(default=0)
+    transactions_completed = models.IntegerField(default=0)
+    transactions_failed = models.IntegerField(default=0)
+    transactions_cancelled = models.IntegerField(default=0)
+    transactions_refunded = models.IntegerField(default=0)
+    total_spend = models.DecimalField(max_digits=18, decimal_places=8, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('User Stats')
+        verbose_name_plural = _('User Stats')
+
+    def __str__(self):
+        return f"Stats for user {self.user_id}"
+
+    @classmethod
+    def apply_deltas(cls, user_id, deltas, create=True, **values):
+        """
+        Atomically add ``deltas`` to the user's counters and set ``values``.
+
+        With ``create=False`` a missing row is left missing. Deletion receivers
+        use that, because while a user is deleted the cascade removes the stats
+        row before the user's contracts and transactions.
+        """
+        from django.db.models import F
+        from django.utils import timezone
+
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas and not values:
+            return
+
+        changes = {field: F(field) + delta for field, delta in deltas.items()}
+        changes.update(values)
+        changes['updated_at'] = timezone.now()
+
+        if not cls.objects.filter(user_id=user_id).update(**changes) and create:
+            cls.objects.bulk_create([cls(user_id=user_id)], ignore_conflicts=True)
+            cls.objects.filter(user_id=user_id).update(**changes)
+
+    def as_dict(self):
+        """Return the statistics in the shape used by the dashboard."""
+        return {
+            'total_contracts': self.contracts_total,
+            'contracts_by_status': {
+                status: getattr(self, f'contracts_{status}')
+                for status in CONTRACT_STAT_STATUSES
+            },
+            'last_deployment_at': self.last_deployment_at,
+            'total_transactions': self.transactions_total,
+            'transactions_by_status': {
+                status: getattr(self, f'transactions_{status}')
+                for status in TRANSACTION_STAT_STATUSES
+            },
+            'total_spend': str(self.total_spend),
+        }
+
+
+CONTRACT_STAT_STATUSES = (
+    'draft', 'pending', 'processing', 'deployed', 'verified', 'failed', 'cancelled',
+)
+TRANSACTION_STAT_STATUSES = (
+    'pending', 'processing', 'completed', 'failed', 'cancelled', 'refunded',
+)
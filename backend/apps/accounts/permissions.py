@@ -0,0 +1,34 @@
+"""
+DRF permission classes backed by the cached RBAC resolver.
+"""
+from rest_framework import permissions
+
+
+class HasRolePermission(permissions.BasePermission):
+    """
+    Allow access when the user's role grants every permission the view requires.
+
+    Views declare the codenames they need with ``required_role_permissions``,
+    either as a list or as a dict keyed by HTTP method. Superusers always pass.
+    """
+    message = 'Your role does not grant permission to perform this action.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        if user.is_superuser:
+            return True
+
+        required = self.get_required_permissions(request, view)
+        if not required:
+            return True
+
+        return set(required) <= user.get_role_permission_codenames()
+
+    def get_required_permissions(self, request, view):
+        """Return the permission codenames required for this request."""
+        required = getattr(view, 'required_role_permissions', [])
+        if isinstance(required, dict):
+            return required.get(request.method, [])
+        return required
@@ -0,0 +1,132 @@
+"""
+Cached role permission resolution for the RBAC system.
+
+Each role's permission codenames are kept as a frozenset in two tiers: a
+bounded in-process LRU and the shared Django cache (django-redis). Permission
+checks on the hot path are set lookups and never touch the database once a
+role has been resolved.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CACHE_KEY_PREFIX = 'rbac:role_permissions'
+VERSION_KEY_PREFIX = 'rbac:role_version'
+
+
+class RolePermissionCache:
+    """
+    Two-tier cache of permission codenames per role.
+
+    The local tier only holds entries for ``local_ttl`` seconds so that
+    invalidations issued by other processes are picked up within that window;
+    invalidations issued by this process take effect immediately.
+    """
+    def __init__(self, maxsize=256, local_ttl=30, timeout=60 * 60):
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.timeout = timeout
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cache_key(self, role_id):
+        return f'{CACHE_KEY_PREFIX}:{role_id}'
+
+    def get(self, role_id):
+        """Return the frozenset of permission codenames for a role."""
+        if role_id is None:
+            return frozenset()
+
+        codenames = self._get_local(role_id)
+        if codenames is not None:
+            return codenames
+
+        codenames = cache.get(self.cache_key(role_id))
+        if codenames is None:
+            codenames = self._load(role_id)
+            cache.set(self.cache_key(role_id), codenames, self.timeout)
+
+        self._set_local(role_id, codenames)
+        return codenames
+
+    def invalidate(self, role_id):
+        """Drop a role from both cache tiers and bump its version."""
+        with self._lock:
+            self._local.pop(role_id, None)
+        cache.delete(self.cache_key(role_id))
+        try:
+            cache.incr(self.version_key(role_id))
+        except ValueError:
+            pass
+
+    def version_key(self, role_id):
+        return f'{VERSION_KEY_PREFIX}:{role_id}'
+
+    def get_version(self, role_id):
+        """Return a counter that changes whenever the role is invalidated."""
+        if role_id is None:
+            return 0
+        key = self.version_key(role_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, int(time.time() * 1000), None)
+            version = cache.get(key)
+        return version
+
+    def clear_local(self):
+        """Drop every entry from the in-process tier."""
+        with self._lock:
+            self._local.clear()
+
+    def _get_local(self, role_id):
+        with self._lock:
+            entry = self._local.get(role_id)
+            if entry is None:
+                return None
+            expires_at, codenames = entry
+            if expires_at < time.monotonic():
+                del self._local[role_id]
+                return None
+            self._local.move_to_end(role_id)
+            return codenames
+
+    def _set_local(self, role_id, codenames):
+        with self._lock:
+            self._local[role_id] = (time.monotonic() + self.local_ttl, codenames)
+            self._local.move_to_end(role_id)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def _load(self, role_id):
+        from .models import Role
+        return frozenset(
+            Role.permissions.through.objects
+            .filter(role_id=role_id)
+            .values_list('permission__codename', flat=True)
+        )
+
+
+role_permission_cache = RolePermissionCache(
+    maxsize=getattr(settings, 'ROLE_PERMISSION_LOCAL_CACHE_SIZE', 256),
+    local_ttl=getattr(settings, 'ROLE_PERMISSION_LOCAL_CACHE_TTL', 30),
+    timeout=getattr(settings, 'ROLE_PERMISSION_CACHE_TIMEOUT', 60 * 60),
+)
+
+
+def get_role_permission_codenames(role_id):
+    """Return the cached frozenset of permission codenames for a role."""
+    return role_permission_cache.get(role_id)
+
+
+def invalidate_role_permissions(role_id):
+    """Invalidate the cached permission codenames for a role."""
+    role_permission_cache.invalidate(role_id)
+
+
+def get_role_version(role_id):
+    """Return the current version of a role's cached data."""
+    return role_permission_cache.get_version(role_id)
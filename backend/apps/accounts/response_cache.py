@@ -0,0 +1,69 @@
+"""
+Versioned response caching for per-user payloads.
+
+The version of a user's payload is derived from ``User.updated_at``,
+``UserProfile.updated_at``, the role version and the subscription state, all
+read from the cached user snapshot. It doubles as the response ETag, so a
+client holding the current version gets a 304 without any serialization, and
+everyone else gets the serialized payload from the cache.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .rbac import get_role_version
+from .snapshots import get_user_snapshot
+
+
+def user_payload_version(user):
+    """Return the version string of a user's cached payloads."""
+    snapshot = get_user_snapshot(user.pk)
+    parts = [
+        snapshot['id'],
+        snapshot['updated_at'].isoformat() if snapshot['updated_at'] else '',
+        snapshot['profile_updated_at'].isoformat() if snapshot['profile_updated_at'] else '',
+        snapshot['role_id'],
+        get_role_version(snapshot['role_id']),
+        user.is_subscriber(),
+    ]
+    return hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    """Check the request's If-None-Match header against ``etag``."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate.strip('"') == etag:
+            return True
+    return False
+
+
+def cached_payload_response(request, name, build_payload, extra_version=''):
+    """
+    Return a response for a per-user payload, using the ETag and cache.
+
+    ``build_payload`` is only called when the current version of the payload
+    is not cached yet.
+    """
+    user = request.user
+    etag = hashlib.md5(f'{name}:{user_payload_version(user)}:{extra_version}'.encode()).hexdigest()
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'private, no-cache'}
+
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    key = f'accounts:payload:{name}:{user.pk}:{etag}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_payload()
+        cache.set(key, payload, getattr(settings, 'USER_PAYLOAD_CACHE_TIMEOUT', 15 * 60))
+
+    return Response(payload, headers=headers)
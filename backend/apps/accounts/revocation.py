@@ -0,0 +1,131 @@
+"""
+Pluggable JWT revocation store.
+
+Revoked token ids (``jti``) are recorded with a time-to-live equal to the
+token's remaining lifetime, so entries expire on their own and the store never
+grows beyond the set of still-valid revoked tokens. This replaces simplejwt's
+database-backed outstanding/blacklisted token tables.
+
+Rotating a refresh token revokes it with a single set-if-absent, so of two
+concurrent refreshes with the same token only one gets a new pair.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BaseRevocationStore:
+    """
+    Interface for revocation stores.
+    """
+    key_prefix = 'jwt:revoked'
+
+    def key(self, jti):
+        return f'{self.key_prefix}:{jti}'
+
+    def revoke(self, token):
+        """Revoke a token until it expires."""
+        self.revoke_many([(token[api_settings.JTI_CLAIM], token['exp'])])
+
+    def revoke_many(self, entries):
+        """Revoke ``(jti, exp_timestamp)`` pairs."""
+        raise NotImplementedError
+
+    def revoke_once(self, token):
+        """Atomically revoke a token; return False if it was already revoked."""
+        ttl = self.remaining_lifetime(token['exp'])
+        if ttl <= 0:
+            return True
+        return self.add(token[api_settings.JTI_CLAIM], ttl)
+
+    def add(self, jti, ttl):
+        """Record ``jti`` for ``ttl`` seconds unless it is already recorded; return whether it was added."""
+        raise NotImplementedError
+
+    def is_revoked(self, jti):
+        raise NotImplementedError
+
+    @staticmethod
+    def remaining_lifetime(exp):
+        return int(exp - time.time())
+
+
+class RedisRevocationStore(BaseRevocationStore):
+    """
+    Revocation store keeping one self-expiring Redis key per revoked ``jti``.
+    """
+    def revoke_many(self, entries):
+        pipe = self._redis().pipeline(transaction=False)
+        for jti, exp in entries:
+            ttl = self.remaining_lifetime(exp)
+            if ttl > 0:
+                pipe.set(self.key(jti), 1, ex=ttl)
+        pipe.execute()
+
+    def add(self, jti, ttl):
+        return bool(self._redis().set(self.key(jti), 1, ex=ttl, nx=True))
+
+    def is_revoked(self, jti):
+        return bool(self._redis().exists(self.key(jti)))
+
+    def _redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+
+class CacheRevocationStore(BaseRevocationStore):
+    """
+    Revocation store on the Django cache, for tests and non-Redis setups.
+    """
+    def revoke_many(self, entries):
+        for jti, exp in entries:
+            ttl = self.remaining_lifetime(exp)
+            if ttl > 0:
+                cache.set(self.key(jti), 1, ttl)
+
+    def add(self, jti, ttl):
+        return cache.add(self.key(jti), 1, ttl)
+
+    def is_revoked(self, jti):
+        return cache.get(self.key(jti)) is not None
+
+
+_store = None
+
+
+def get_revocation_store():
+    """Return the configured revocation store instance."""
+    global _store
+    if _store is None:
+        store_class = import_string(
+            getattr(settings, 'JWT_REVOCATION_STORE', 'apps.accounts.revocation.RedisRevocationStore')
+        )
+        _store = store_class()
+    return _store
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    Refresh token checked against, and revoked into, the revocation store.
+
+    ``blacklist()`` keeps simplejwt's method name so the stock refresh
+    serializer's rotate-and-blacklist flow works unchanged. It raises
+    ``TokenError`` when the token was revoked concurrently, after
+    ``check_revoked()`` passed, so a refresh token is only ever rotated once.
+    """
+    def verify(self, *args, **kwargs):
+        self.check_revoked()
+        super().verify(*args, **kwargs)
+
+    def check_revoked(self):
+        if get_revocation_store().is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self):
+        if not get_revocation_store().revoke_once(self):
+            raise TokenError('Token is blacklisted')
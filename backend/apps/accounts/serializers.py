@@ -5,7 +5,10 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from .models import User, UserProfile, Role
+from .rbac import get_role_permission_codenames
+from .revocation import RevocableRefreshToken
 
 
 class RoleSerializer(serializers.ModelSerializer):
@@ -23,7 +26,7 @@ class RoleSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_permissions_count(self, obj):
-        return obj.permissions.count()
+        return len(get_role_permission_codenames(obj.pk))
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -190,17 +193,20 @@ class LoginSerializer(serializers.Serializer):
             )
             if not user:
                 raise serializers.ValidationError(
-                    'Invalid email or password.'
+                    'Invalid email or password.',
+                    code='invalid_credentials'
                 )
             if not user.is_active:
                 raise serializers.ValidationError(
-                    'User account is disabled.'
+                    'User account is disabled.',
+                    code='account_disabled'
                 )
             attrs['user'] = user
             return attrs
         else:
             raise serializers.ValidationError(
-                'Must include "email" and "password".'
+                'Must include "email" and "password".',
+                code='invalid_request'
             )
 
 
@@ -232,3 +238,9 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
             raise serializers.ValidationError("Passwords don't match.")
         return attrs
 
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh serializer backed by the JWT revocation store.
+    """
+    token_class = RevocableRefreshToken
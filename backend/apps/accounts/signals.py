@@ -0,0 +1,85 @@
+"""
+Signal receivers for the accounts app.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Role, User, UserProfile
+from .rbac import invalidate_role_permissions
+from .snapshots import bump_user_version
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_role_permission_cache(sender, instance, **kwargs):
+    """Drop cached permissions when a role is saved or deleted."""
+    _invalidate_after_commit([instance.pk])
+
+
+@receiver(pre_delete, sender=Role)
+def invalidate_role_member_snapshots(sender, instance, **kwargs):
+    """Deleting a role nulls ``User.role`` without signals, so bump its members."""
+    user_ids = list(instance.users.values_list('pk', flat=True))
+    _bump_users_after_commit(user_ids)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """Drop cached snapshots when a user is saved or deleted."""
+    _bump_users_after_commit([instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_owner_snapshot(sender, instance, **kwargs):
+    """Profile changes are part of the cached user payloads."""
+    _bump_users_after_commit([instance.user_id])
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def invalidate_role_permission_cache_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached permissions when a role's permissions change."""
+    if action not in ('post_add', 'post_remove', 'pre_clear', 'post_clear'):
+        return
+
+    if not reverse:
+        if action == 'pre_clear':
+            return
+        _invalidate_after_commit([instance.pk])
+        return
+
+    # Changed from the Permission side: ``pk_set`` holds role ids, except on
+    # clear where every role holding this permission is affected.
+    if action == 'pre_clear':
+        role_ids = list(instance.role_set.values_list('pk', flat=True))
+        instance._cleared_role_ids = role_ids
+    elif action == 'post_clear':
+        role_ids = getattr(instance, '_cleared_role_ids', [])
+    else:
+        role_ids = pk_set or []
+
+    _invalidate_after_commit(role_ids)
+
+
+def _invalidate_after_commit(role_ids):
+    """Invalidate once the change is visible to other connections."""
+    role_ids = list(role_ids)
+
+    def invalidate():
+        for role_id in role_ids:
+            invalidate_role_permissions(role_id)
+
+    transaction.on_commit(invalidate)
+
+
+def _bump_users_after_commit(user_ids):
+    """Bump user snapshot versions once the change is committed."""
+    user_ids = list(user_ids)
+
+    def bump():
+        for user_id in user_ids:
+            bump_user_version(user_id)
+
+    transaction.on_commit(bump)
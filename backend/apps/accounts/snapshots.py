@@ -0,0 +1,172 @@
+"""
+Cached user snapshots for database-free request authentication.
+
+A snapshot is a small dict of the user fields most requests need. It is stored
+in the Django cache under the user id plus a per-user version counter, and the
+counter is bumped whenever the user row changes so stale snapshots are never
+read again and simply expire.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.base import ModelState
+
+SNAPSHOT_FIELDS = (
+    'id', 'email', 'first_name', 'last_name', 'role_id',
+    'is_active', 'is_staff', 'is_superuser', 'is_verified', 'is_kyc_verified',
+    'subscription_type', 'subscription_active', 'subscription_end_date',
+    'updated_at',
+)
+
+
+def _version_key(user_id):
+    return f'accounts:user_snapshot_version:{user_id}'
+
+
+def _snapshot_key(user_id, version):
+    return f'accounts:user_snapshot:{user_id}:{version}'
+
+
+def _initial_version():
+    # Seeded from the clock so a version key evicted from the cache can never
+    # resurrect a snapshot written under an earlier version.
+    return int(time.time() * 1000)
+
+
+def get_user_version(user_id):
+    """Return the current snapshot version for a user."""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate every cached snapshot of a user."""
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), None)
+
+
+def build_snapshot(user):
+    """Build the snapshot dict for a user instance."""
+    from rest_framework_simplejwt.utils import get_md5_hash_password
+
+    snapshot = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    profile = getattr(user, 'profile', None)
+    snapshot['profile_updated_at'] = profile.updated_at if profile else None
+    # Only a digest of the password hash is cached, for token revocation checks.
+    snapshot['password_digest'] = get_md5_hash_password(user.password)
+    return snapshot
+
+
+def get_user_snapshot(user_id):
+    """Return the snapshot for a user, loading it on a cache miss."""
+    key = _snapshot_key(user_id, get_user_version(user_id))
+    snapshot = cache.get(key)
+    if snapshot is None:
+        User = get_user_model()
+        user = (
+            User.objects.filter(pk=user_id)
+            .select_related('profile')
+            .only(*SNAPSHOT_FIELDS, 'password', 'profile__updated_at')
+            .first()
+        )
+        if user is None:
+            return None
+        snapshot = build_snapshot(user)
+        cache.set(key, snapshot, getattr(settings, 'USER_SNAPSHOT_CACHE_TIMEOUT', 15 * 60))
+    return snapshot
+
+
+class SnapshotUser:
+    """
+    Stand-in for ``User`` backed by a cached snapshot.
+
+    Snapshot fields and the cheap user helpers are answered from the snapshot.
+    Anything else, including attribute assignment, loads the full ``User`` row
+    once and delegates to it.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, snapshot):
+        state = ModelState()
+        state.adding = False
+        state.db = DEFAULT_DB_ALIAS
+        self.__dict__.update(_snapshot=snapshot, _user=None, _state=state)
+
+    @property
+    def __class__(self):
+        return get_user_model()
+
+    @property
+    def _meta(self):
+        return get_user_model()._meta
+
+    @property
+    def pk(self):
+        return self._snapshot['id']
+
+    @property
+    def permissions(self):
+        """Permission codenames granted through the user's role."""
+        return self.get_role_permission_codenames()
+
+    @property
+    def full_name(self):
+        return get_user_model().full_name.fget(self)
+
+    def get_role_permission_codenames(self):
+        from .rbac import get_role_permission_codenames
+        return get_role_permission_codenames(self.role_id)
+
+    def has_role_permission(self, permission_codename):
+        return get_user_model().has_role_permission(self, permission_codename)
+
+    def is_subscriber(self):
+        return get_user_model().is_subscriber(self)
+
+    def get_service_fee_percentage(self):
+        return get_user_model().get_service_fee_percentage(self)
+
+    def get_user(self):
+        """Load (once) and return the full ``User`` instance."""
+        user = self.__dict__['_user']
+        if user is None:
+            user = get_user_model().objects.get(pk=self.pk)
+            self.__dict__['_user'] = user
+        return user
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        user = self.__dict__['_user']
+        if user is not None:
+            return getattr(user, name)
+        snapshot = self.__dict__['_snapshot']
+        if name in snapshot:
+            return snapshot[name]
+        return getattr(self.get_user(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get_user(), name, value)
+
+    def __eq__(self, other):
+        other_pk = getattr(other, 'pk', None)
+        return isinstance(other, get_user_model()) and other_pk == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        if self.__dict__['_user'] is not None:
+            return str(self.__dict__['_user'])
+        return f"{self.first_name} {self.last_name} ({self.email})"
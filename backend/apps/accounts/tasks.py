@@ -0,0 +1,52 @@
+"""
+Celery tasks for the accounts app.
+"""
+from celery import shared_task
+
+
+@shared_task
+def flush_session_activity():
+    """Write coalesced session activity back to UserSession."""
+    from .activity import flush_activity
+    return flush_activity()
+
+
+@shared_task
+def cleanup_gdpr_exports():
+    """Delete GDPR export archives whose download window has passed."""
+    from .gdpr import cleanup_expired_exports
+    return cleanup_expired_exports()
+
+
+@shared_task
+def export_user_data(user_id):
+    """Write a user's GDPR export archive to disk and email them when it is ready."""
+    import os
+
+    from django.conf import settings
+
+    from apps.core.mail import queue_email
+
+    from .gdpr import export_path, get_export_status, set_export_status, write_export_archive
+    from .models import User
+
+    previous = get_export_status(user_id) or {}
+    try:
+        user = User.objects.get(pk=user_id)
+        path = write_export_archive(user, export_path(user))
+    except Exception:
+        # Keep the previous archive's path so the next export still removes it.
+        set_export_status(user_id, **{**previous, 'status': 'failed'})
+        raise
+
+    if previous.get('path') and previous['path'] != path and os.path.exists(previous['path']):
+        os.remove(previous['path'])
+    set_export_status(user_id, status='ready', path=path, size=os.path.getsize(path))
+
+    queue_email(
+        'Your BlockBustre data export is ready',
+        f'Your data export is ready to download at '
+        f'{settings.FRONTEND_URL}/account/data-export',
+        [user.email],
+    )
+    return path
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.authentication import CachedJWTAuthentication
+from apps.accounts.models import Role, User
+from apps.accounts.snapshots import SnapshotUser
+from apps.contracts.tests.factories import LOCAL_CACHES, UserFactory
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.user.set_password('correct horse')
+        self.user.save()
+
+    def authenticate(self, token=None):
+        token = token or AccessToken.for_user(self.user)
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def change(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.get(pk=self.user.pk)
+            for name, value in fields.items():
+                setattr(user, name, value)
+            user.save()
+        return user
+
+    def test_cached_snapshot_authenticates_without_queries(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+        self.assertIsInstance(user, SnapshotUser)
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, self.user.email)
+
+    def test_fields_outside_the_snapshot_load_the_user_once(self):
+        user = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+            self.assertEqual(user.phone_number, self.user.phone_number)
+
+    def test_saving_the_user_invalidates_the_snapshot(self):
+        self.authenticate()
+        self.change(first_name='Renamed')
+        self.assertEqual(self.authenticate().first_name, 'Renamed')
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.change(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_role_change_is_seen_by_the_next_request(self):
+        role = Role.objects.create(name='Auditor')
+        role.permissions.add(Permission.objects.first())
+        self.assertIsNone(self.authenticate().role_id)
+
+        self.change(role=role)
+
+        user = self.authenticate()
+        self.assertEqual(user.role_id, role.pk)
+        self.assertEqual(user.permissions, {Permission.objects.first().codename})
+
+    def test_deleting_a_role_invalidates_its_members(self):
+        role = Role.objects.create(name='Auditor')
+        self.change(role=role)
+        self.assertEqual(self.authenticate().role_id, role.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            role.delete()
+
+        self.assertIsNone(self.authenticate().role_id)
+
+    # simplejwt rebinds api_settings on setting_changed, which modules that
+    # imported it never see, so the flag is patched on the shared object.
+    @mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True)
+    def test_password_change_revokes_tokens_issued_before_it(self):
+        token = AccessToken.for_user(self.user)
+        self.assertIn(api_settings.REVOKE_TOKEN_CLAIM, token)
+        self.authenticate(token)
+
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('battery staple')
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        self.user = user
+        self.assertEqual(self.authenticate().pk, user.pk)
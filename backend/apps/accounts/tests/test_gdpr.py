@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.accounts.gdpr import cleanup_expired_exports, set_export_status
+from apps.contracts.tests.factories import LOCAL_CACHES
+
+TTL = 60 * 60
+
+
+@override_settings(CACHES=LOCAL_CACHES, GDPR_EXPORT_TTL=TTL)
+class CleanupExpiredExportsTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings = override_settings(GDPR_EXPORT_DIR=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def archive(self, user_id, name, age):
+        path = os.path.join(self.root, str(user_id), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as output:
+            output.write(b'PK')
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+        return path
+
+    def test_archives_older_than_the_status_ttl_are_deleted(self):
+        expired = self.archive(1, 'export-old.zip', TTL + 60)
+        abandoned = self.archive(1, 'export-crashed.zip.part', TTL + 60)
+        recent = self.archive(2, 'export-new.zip', 60)
+
+        self.assertEqual(cleanup_expired_exports(), {'deleted': 2})
+
+        self.assertFalse(os.path.exists(expired))
+        self.assertFalse(os.path.exists(abandoned))
+        self.assertTrue(os.path.exists(recent))
+        self.assertFalse(os.path.exists(os.path.dirname(expired)))
+
+    def test_archive_of_a_live_status_is_kept(self):
+        path = self.archive(1, 'export.zip', TTL + 60)
+        set_export_status(1, status='ready', path=path, size=2)
+
+        self.assertEqual(cleanup_expired_exports(), {'deleted': 0})
+        self.assertTrue(os.path.exists(path))
+
+    def test_missing_export_directory(self):
+        shutil.rmtree(self.root)
+        self.assertEqual(cleanup_expired_exports(), {'deleted': 0})
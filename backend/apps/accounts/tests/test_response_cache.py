@@ -0,0 +1,88 @@
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import Role
+from apps.accounts.response_cache import etag_matches
+from apps.contracts.tests.factories import LOCAL_CACHES, SmartContractFactory, UserFactory
+
+PROFILE_URL = '/api/v1/auth/profile/'
+UPDATE_URL = '/api/v1/auth/profile/update/'
+DASHBOARD_URL = '/api/v1/auth/dashboard/'
+
+
+class EtagMatchTests(SimpleTestCase):
+    def matches(self, header, etag='abc'):
+        return etag_matches(RequestFactory().get('/', HTTP_IF_NONE_MATCH=header), etag)
+
+    def test_header_forms(self):
+        self.assertTrue(self.matches('"abc"'))
+        self.assertTrue(self.matches('W/"abc"'))
+        self.assertTrue(self.matches('"xyz", "abc"'))
+        self.assertTrue(self.matches('*'))
+        self.assertFalse(self.matches('"xyz"'))
+        self.assertFalse(etag_matches(RequestFactory().get('/'), 'abc'))
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class CachedPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_current_etag_gets_304_without_queries(self):
+        response = self.get(PROFILE_URL)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.get(PROFILE_URL, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_payload_is_served_from_the_cache(self):
+        first = self.get(PROFILE_URL)
+        with self.assertNumQueries(0):
+            second = self.get(PROFILE_URL)
+        self.assertEqual(second.data, first.data)
+
+    def test_profile_update_changes_the_etag(self):
+        etag = self.get(PROFILE_URL)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.patch(UPDATE_URL, {'first_name': 'Renamed'}, format='json').status_code, 200)
+
+        response = self.get(PROFILE_URL, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['first_name'], 'Renamed')
+
+    def test_role_permission_change_changes_the_etag(self):
+        role = Role.objects.create(name='Auditor')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = role
+            self.user.save()
+        etag = self.get(PROFILE_URL)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            role.permissions.add(Permission.objects.first())
+
+        self.assertEqual(self.get(PROFILE_URL, etag).status_code, 200)
+
+    def test_dashboard_etag_follows_the_statistics(self):
+        etag = self.get(DASHBOARD_URL)['ETag']
+        self.assertEqual(self.get(DASHBOARD_URL, etag).status_code, 304)
+
+        SmartContractFactory(user=self.user)
+
+        response = self.get(DASHBOARD_URL, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['stats']['total_contracts'], 1)
@@ -0,0 +1,95 @@
+import time
+from unittest import mock
+
+import fakeredis
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+
+from apps.accounts.revocation import CacheRevocationStore, RedisRevocationStore, RevocableRefreshToken
+from apps.contracts.tests.factories import LOCAL_CACHES, UserFactory
+
+REFRESH_URL = '/api/v1/auth/token/refresh/'
+LOGOUT_URL = '/api/v1/auth/logout/'
+
+
+class RedisStoreMixin:
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis()
+        for patcher in (
+            mock.patch('django_redis.get_redis_connection', return_value=self.redis),
+            mock.patch('apps.accounts.revocation._store', RedisRevocationStore()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class RevocationStoreTests(SimpleTestCase):
+    def stores(self):
+        with mock.patch('django_redis.get_redis_connection', return_value=fakeredis.FakeRedis()):
+            yield RedisRevocationStore()
+        yield CacheRevocationStore()
+
+    def test_revoked_tokens_expire_with_the_token(self):
+        now = time.time()
+        for store in self.stores():
+            with self.subTest(store=type(store).__name__):
+                store.revoke_many([('live', now + 60), ('expired', now - 1)])
+                self.assertTrue(store.is_revoked('live'))
+                self.assertFalse(store.is_revoked('expired'))
+                self.assertFalse(store.is_revoked('other'))
+
+    def test_redis_entries_carry_the_remaining_lifetime(self):
+        redis = fakeredis.FakeRedis()
+        with mock.patch('django_redis.get_redis_connection', return_value=redis):
+            store = RedisRevocationStore()
+            store.revoke_many([('jti', time.time() + 120)])
+            self.assertTrue(118 <= redis.ttl(store.key('jti')) <= 120)
+
+    def test_revoke_once_succeeds_only_once(self):
+        token = {'jti': 'jti', 'exp': time.time() + 60}
+        for store in self.stores():
+            with self.subTest(store=type(store).__name__):
+                self.assertTrue(store.revoke_once(token))
+                self.assertFalse(store.revoke_once(token))
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class RefreshTokenRevocationTests(RedisStoreMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory()
+        self.refresh = RevocableRefreshToken.for_user(self.user)
+        self.client = APIClient()
+
+    def post_refresh(self, token):
+        return self.client.post(REFRESH_URL, {'refresh': str(token)}, format='json')
+
+    def test_rotation_revokes_the_old_refresh_token(self):
+        response = self.post_refresh(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], str(self.refresh))
+
+        self.assertEqual(self.post_refresh(self.refresh).status_code, 401)
+        self.assertEqual(self.post_refresh(response.data['refresh']).status_code, 200)
+
+    def test_concurrent_rotation_succeeds_once(self):
+        # Both requests passed the revocation check before either revoked the token.
+        first, second = RevocableRefreshToken(str(self.refresh)), RevocableRefreshToken(str(self.refresh))
+        first.blacklist()
+        with self.assertRaises(TokenError):
+            second.blacklist()
+
+    def test_revoked_token_cannot_be_loaded(self):
+        self.refresh.blacklist()
+        with self.assertRaises(TokenError):
+            RevocableRefreshToken(str(self.refresh))
+
+    def test_logout_revokes_the_refresh_token(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(LOGOUT_URL, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.post_refresh(self.refresh).status_code, 401)
+        self.assertEqual(self.client.post(LOGOUT_URL, {'refresh': str(self.refresh)}, format='json').status_code, 400)
@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import User, UserStats
+from apps.contracts.models import SmartContract
+from apps.contracts.tests.factories import LOCAL_CACHES, SmartContractFactory, UserFactory
+from apps.transactions.models import Transaction
+
+
+def create_transaction(user, **kwargs):
+    values = {
+        'user': user,
+        'transaction_type': 'service_fee',
+        'payment_method': 'stripe',
+        'amount': Decimal('10'),
+        'status': 'completed',
+    }
+    values.update(kwargs)
+    return Transaction.objects.create(**values)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class UserStatsSignalTests(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+
+    def stats(self, user=None):
+        return UserStats.objects.get(user=user or self.user)
+
+    def test_deleting_a_user_with_contracts_and_transactions(self):
+        contract = SmartContractFactory(user=self.user)
+        create_transaction(self.user, contract=contract)
+        create_transaction(self.user, status='pending')
+
+        self.user.delete()
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(UserStats.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(SmartContract.all_objects.filter(pk=contract.pk).exists())
+
+    def test_deleting_a_contract_or_transaction_updates_the_counters(self):
+        contract = SmartContractFactory(user=self.user)
+        transaction = create_transaction(self.user)
+
+        contract.delete()
+        transaction.delete()
+
+        stats = self.stats()
+        self.assertEqual((stats.contracts_total, stats.contracts_pending), (0, 0))
+        self.assertEqual((stats.transactions_total, stats.transactions_completed), (0, 0))
+        self.assertEqual(stats.total_spend, 0)
+
+    def test_deletion_does_not_recreate_a_missing_row(self):
+        transaction = create_transaction(self.user)
+        UserStats.objects.filter(user=self.user).delete()
+        transaction.delete()
+        self.assertFalse(UserStats.objects.filter(user=self.user).exists())
+
+    def test_reassigned_transaction_moves_between_owners(self):
+        other = UserFactory()
+        transaction = create_transaction(self.user, amount=Decimal('25'))
+
+        transaction.user = other
+        transaction.save()
+
+        old, new = self.stats(), self.stats(other)
+        self.assertEqual((old.transactions_total, old.transactions_completed, old.total_spend), (0, 0, 0))
+        self.assertEqual((new.transactions_total, new.transactions_completed, new.total_spend), (1, 1, 25))
+
+    def test_reassigned_deferred_transaction_moves_between_owners(self):
+        other = UserFactory()
+        create_transaction(self.user, status='pending')
+
+        transaction = Transaction.objects.only('pk').get()
+        transaction.user = other
+        transaction.status = 'failed'
+        transaction.save()
+
+        old, new = self.stats(), self.stats(other)
+        self.assertEqual((old.transactions_total, old.transactions_pending), (0, 0))
+        self.assertEqual((new.transactions_total, new.transactions_failed), (1, 1))
+
+    def test_reassigned_contract_moves_between_owners(self):
+        other = UserFactory()
+        contract = SmartContractFactory(user=self.user)
+
+        contract.user = other
+        contract.save()
+
+        self.assertEqual((self.stats().contracts_total, self.stats().contracts_pending), (0, 0))
+        self.assertEqual((self.stats(other).contracts_total, self.stats(other).contracts_pending), (1, 1))
@@ -0,0 +1,118 @@
+from unittest import mock
+
+import fakeredis
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.audit import login_audit
+from apps.accounts.models import LoginAttempt
+from apps.accounts.throttling import LoginRateLimiter, SlidingWindow, acquire
+from apps.accounts.utils import get_client_ip
+from apps.contracts.tests.factories import LOCAL_CACHES, UserFactory
+
+LOGIN_URL = '/api/v1/auth/login/'
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('django_redis.get_redis_connection', return_value=fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_window_admits_up_to_its_limit(self):
+        window = SlidingWindow('test', limit=3, window=60)
+        self.assertEqual([window.acquire('a', now=1000 + i) for i in range(3)], [None, None, None])
+        self.assertEqual(window.acquire('a', now=1010), 51)
+        self.assertIsNone(window.acquire('b', now=1010))
+
+    def test_rejected_events_do_not_count(self):
+        window = SlidingWindow('test', limit=2, window=60)
+        window.acquire('a', now=1000)
+        window.acquire('a', now=1001)
+        for now in range(1002, 1050):
+            self.assertIsNotNone(window.acquire('a', now=now))
+        # Only the two admitted events age out, so the window reopens on time.
+        self.assertIsNone(window.acquire('a', now=1061))
+
+    def test_events_count_in_every_window_or_none(self):
+        ip_window = SlidingWindow('ip', limit=10, window=60)
+        email_window = SlidingWindow('email', limit=1, window=60)
+        self.assertIsNone(acquire([(ip_window, 'ip'), (email_window, 'email')], now=1000))
+        self.assertEqual(acquire([(ip_window, 'ip'), (email_window, 'email')], now=1001), 60)
+        self.assertEqual(ip_window._redis().zcard(ip_window.key('ip')), 1)
+
+    def test_email_failures_are_keyed_case_insensitively(self):
+        limiter = LoginRateLimiter(ip_limit=100, email_limit=2, window=60)
+        limiter.acquire('10.0.0.1', 'User@Example.com')
+        limiter.acquire('10.0.0.2', ' user@example.com')
+        self.assertIsNotNone(limiter.acquire('10.0.0.3', 'USER@example.com'))
+        limiter.reset_failures('user@example.com')
+        self.assertIsNone(limiter.acquire('10.0.0.4', 'user@example.com'))
+
+
+@override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+class ClientIPTests(SimpleTestCase):
+    def ip(self, remote_addr, forwarded_for=None):
+        meta = {'REMOTE_ADDR': remote_addr}
+        if forwarded_for:
+            meta['HTTP_X_FORWARDED_FOR'] = forwarded_for
+        return get_client_ip(RequestFactory().get('/', **meta))
+
+    def test_forwarded_for_is_ignored_from_untrusted_peers(self):
+        self.assertEqual(self.ip('203.0.113.9', '198.51.100.1'), '203.0.113.9')
+
+    def test_forwarded_for_is_read_from_the_right_behind_trusted_proxies(self):
+        self.assertEqual(self.ip('10.0.0.1', '198.51.100.1, 203.0.113.9, 10.0.0.2'), '203.0.113.9')
+
+
+@override_settings(CACHES=LOCAL_CACHES, LOGIN_RATE_LIMIT_ENABLED=True)
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+        patcher = mock.patch(
+            'django_redis.get_redis_connection', return_value=fakeredis.FakeRedis(server=self.server)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        audit = mock.patch.object(login_audit, 'backend', 'sync')
+        audit.start()
+        self.addCleanup(audit.stop)
+
+        self.user = UserFactory()
+        self.user.set_password('correct horse')
+        self.user.save()
+        self.client = APIClient()
+
+    def login(self, password, email=None, ip='198.51.100.7'):
+        return self.client.post(
+            LOGIN_URL, {'email': email or self.user.email, 'password': password}, format='json', REMOTE_ADDR=ip
+        )
+
+    def test_email_is_locked_out_after_repeated_failures(self):
+        for _ in range(5):
+            self.assertEqual(self.login('wrong').status_code, 400)
+
+        response = self.login('correct horse', ip='198.51.100.8')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(LoginAttempt.objects.filter(email=self.user.email, success=False).count(), 5)
+
+    def test_successful_login_clears_the_failures(self):
+        for _ in range(4):
+            self.login('wrong')
+        self.assertEqual(self.login('correct horse').status_code, 200)
+        for _ in range(4):
+            self.assertEqual(self.login('wrong').status_code, 400)
+
+    def test_ip_is_limited_across_emails(self):
+        for n in range(20):
+            self.login('wrong', email=f'other{n}@example.com')
+        self.assertEqual(self.login('correct horse').status_code, 429)
+        self.assertEqual(self.login('correct horse', ip='198.51.100.8').status_code, 200)
+
+    def test_login_fails_open_when_redis_is_unreachable(self):
+        self.server.connected = False
+        with self.assertLogs('apps.accounts.throttling', 'WARNING'):
+            response = self.login('correct horse')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.login('wrong').status_code, 400)
@@ -0,0 +1,151 @@
+"""
+Login rate limiting backed by Redis sorted-set sliding windows.
+
+Every login request counts against the client IP and the submitted email,
+and a successful login clears the email's window, so only failures keep
+counting against it. Once either window is full the request is rejected by
+``LoginRateThrottle`` before the credentials are checked, so throttled
+traffic never reaches the password hasher.
+
+Checking and counting is one atomic step: a request is added to its windows
+in a single MULTI pipeline and removed again if that overfilled any of them,
+so concurrent bursts cannot exceed the limits. The client IP comes from
+``get_client_ip``, which only trusts ``X-Forwarded-For`` behind
+``TRUSTED_PROXIES``.
+
+When Redis is unreachable the limiter fails open: the request is let through
+to the credential check and the outage is logged, rather than every login
+failing while the cache is down.
+"""
+import hashlib
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from redis.exceptions import RedisError
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindow:
+    """
+    Sliding window counter stored as a Redis sorted set scored by timestamp.
+    """
+    def __init__(self, prefix, limit, window):
+        self.prefix = prefix
+        self.limit = limit
+        self.window = window
+
+    def key(self, identifier):
+        return f'ratelimit:{self.prefix}:{identifier}'
+
+    def acquire(self, identifier, now=None):
+        """Count one event unless the window is full; return the retry-after delay if it is."""
+        return acquire([(self, identifier)], now)
+
+    def reset(self, identifier):
+        self._redis().delete(self.key(identifier))
+
+    def _redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+
+def acquire(windows, now=None):
+    """
+    Count one event in every ``(window, identifier)`` pair, atomically.
+
+    The event is added everywhere in one transaction. If any window then holds
+    more than its limit the event is removed from all of them and the longest
+    retry-after delay is returned; otherwise returns None.
+    """
+    now = now or time.time()
+    member = f'{now}:{uuid.uuid4().hex}'
+    keys = [window.key(identifier) for window, identifier in windows]
+    redis = windows[0][0]._redis()
+
+    pipe = redis.pipeline()
+    for (window, _), key in zip(windows, keys):
+        pipe.zremrangebyscore(key, 0, now - window.window)
+        pipe.zadd(key, {member: now})
+        pipe.zcard(key)
+        pipe.expire(key, int(window.window) + 1)
+    results = pipe.execute()
+    counts = results[2::4]
+
+    full = [(window, key) for (window, _), key, count in zip(windows, keys, counts) if count > window.limit]
+    if not full:
+        return None
+
+    pipe = redis.pipeline()
+    for key in keys:
+        pipe.zrem(key, member)
+    for _, key in full:
+        pipe.zrange(key, 0, 0, withscores=True)
+    oldest = pipe.execute()[len(keys):]
+    return max(
+        max(1, int((entries[0][1] if entries else now) + window.window - now) + 1)
+        for (window, _), entries in zip(full, oldest)
+    )
+
+
+class LoginRateLimiter:
+    """
+    Per-IP attempt and per-email failure limits for the login endpoint.
+    """
+    def __init__(self, ip_limit=20, email_limit=5, window=300):
+        self.ip_window = SlidingWindow('login:ip', ip_limit, window)
+        self.email_window = SlidingWindow('login:email', email_limit, window)
+
+    @staticmethod
+    def email_key(email):
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+    def acquire(self, ip_address, email=None):
+        """Count a login request unless a window is full; return the retry-after delay if one is."""
+        windows = [(self.ip_window, ip_address)]
+        if email:
+            windows.append((self.email_window, self.email_key(email)))
+        return acquire(windows)
+
+    def reset_failures(self, email):
+        try:
+            self.email_window.reset(self.email_key(email))
+        except RedisError as exc:
+            logger.warning('Could not reset login failures: %s', exc)
+
+
+login_rate_limiter = LoginRateLimiter(
+    ip_limit=getattr(settings, 'LOGIN_RATE_LIMIT_IP_ATTEMPTS', 20),
+    email_limit=getattr(settings, 'LOGIN_RATE_LIMIT_EMAIL_FAILURES', 5),
+    window=getattr(settings, 'LOGIN_RATE_LIMIT_WINDOW', 300),
+)
+
+
+class LoginRateThrottle(BaseThrottle):
+    """
+    DRF throttle applying ``login_rate_limiter`` to the login view.
+    """
+    def __init__(self):
+        self.wait_seconds = None
+
+    def allow_request(self, request, view):
+        if not getattr(settings, 'LOGIN_RATE_LIMIT_ENABLED', True):
+            return True
+
+        ip_address = view._get_client_ip(request)
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str):
+            email = None
+
+        try:
+            self.wait_seconds = login_rate_limiter.acquire(ip_address, email)
+        except RedisError as exc:
+            logger.error('Login rate limiter unavailable, allowing the request: %s', exc)
+            self.wait_seconds = None
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
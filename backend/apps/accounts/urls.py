@@ -33,6 +33,11 @@ urlpatterns = [
     # KYC and verification
     path('kyc/request/', views.kyc_verification_request, name='kyc_request'),
     
+    # GDPR data export
+    path('gdpr/export/', views.gdpr_export, name='gdpr_export'),
+    path('gdpr/export/request/', views.gdpr_export_request, name='gdpr_export_request'),
+    path('gdpr/export/download/', views.gdpr_export_download, name='gdpr_export_download'),
+    
     # Admin status check
     path('admin-status/', views.check_admin_status, name='admin_status'),
     
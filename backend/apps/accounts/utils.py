@@ -0,0 +1,55 @@
+"""
+Helpers shared by the accounts app.
+"""
+import ipaddress
+from functools import lru_cache
+
+from django.conf import settings
+
+
+def get_client_ip(request):
+    """
+    Get client IP address.
+
+    ``X-Forwarded-For`` is client-controlled, so it is only read when the
+    request comes from one of ``TRUSTED_PROXIES`` (addresses or networks).
+    The client is then the right-most forwarded address that is not itself
+    a trusted proxy.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR')
+    proxies = _trusted_proxies(tuple(getattr(settings, 'TRUSTED_PROXIES', ())))
+    if not _is_trusted(remote_addr, proxies):
+        return remote_addr
+
+    forwarded = [entry.strip() for entry in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+    ip = remote_addr
+    for entry in reversed([entry for entry in forwarded if entry]):
+        if normalize_ip(entry) is None:
+            break
+        ip = entry
+        if not _is_trusted(entry, proxies):
+            break
+    return ip
+
+
+@lru_cache(maxsize=8)
+def _trusted_proxies(proxies):
+    return tuple(ipaddress.ip_network(proxy.strip(), strict=False) for proxy in proxies if proxy.strip())
+
+
+def _is_trusted(ip, proxies):
+    ip = normalize_ip(ip)
+    if ip is None or not proxies:
+        return False
+    address = ipaddress.ip_address(ip)
+    return any(address in network for network in proxies)
+
+
+def normalize_ip(value):
+    """Return ``value`` as a canonical IP address string, or None if it is not one."""
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
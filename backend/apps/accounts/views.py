@@ -3,25 +3,37 @@ Authentication and user management views.
 """
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import login, logout
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.contrib.sessions.backends.base import VALID_KEY_CHARS
 from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
 
-from .models import User, UserProfile, Role, UserSession, LoginAttempt
+from apps.core.mail import queue_email
+
+from .audit import login_audit
+from .gdpr import (
+    export_filename, get_export_status, is_export_pending, iter_export_archive, set_export_status
+)
+from .models import User, UserProfile, Role, UserSession, UserStats
+from .response_cache import cached_payload_response
+from .revocation import RevocableRefreshToken
+from .throttling import LoginRateThrottle, login_rate_limiter
+from .utils import get_client_ip
 from .serializers import (
     UserRegistrationSerializer, UserSerializer, UserUpdateSerializer,
     LoginSerializer, PasswordChangeSerializer, PasswordResetSerializer,
-    PasswordResetConfirmSerializer, RoleSerializer
+    PasswordResetConfirmSerializer, RoleSerializer, RevocableTokenRefreshSerializer
 )
 
 
@@ -29,20 +41,29 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom JWT token view with additional user data.
     """
+    throttle_classes = [LoginRateThrottle]
+
     def post(self, request, *args, **kwargs):
         serializer = LoginSerializer(data=request.data, context={'request': request})
-        serializer.is_valid(raise_exception=True)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except ValidationError as exc:
+            self._handle_failed_login(request, exc)
+            raise
         
         user = serializer.validated_data['user']
         
         # Log login attempt
         self._log_login_attempt(request, user.email, True)
+        if getattr(settings, 'LOGIN_RATE_LIMIT_ENABLED', True):
+            login_rate_limiter.reset_failures(user.email)
         
         # Create or update user session
-        self._create_user_session(request, user)
+        session_key = self._create_user_session(request, user)
         
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = RevocableRefreshToken.for_user(user)
+        refresh['sid'] = session_key
         
         return Response({
             'refresh': str(refresh),
@@ -50,48 +71,58 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             'user': UserSerializer(user).data
         })
 
-    def _log_login_attempt(self, request, email, success):
+    def _handle_failed_login(self, request, exc):
+        """Audit a failed login."""
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email or not isinstance(email, str):
+            return
+
+        codes = exc.get_codes()
+        if isinstance(codes, dict):
+            codes = codes.get('non_field_errors', ['invalid_request'])
+        failure_reason = codes[0] if isinstance(codes, list) and codes else 'invalid_request'
+
+        # The attempt already counts against the email: LoginRateThrottle
+        # added it, and only a successful login clears the window.
+        self._log_login_attempt(request, email.strip(), False, failure_reason)
+
+    def _log_login_attempt(self, request, email, success, failure_reason=''):
         """Log login attempt for security monitoring."""
-        LoginAttempt.objects.create(
+        login_audit.record_attempt(
             email=email,
             ip_address=self._get_client_ip(request),
             user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            success=success
+            success=success,
+            failure_reason=failure_reason
         )
 
     def _get_client_ip(self, request):
         """Get client IP address."""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
 
     def _create_user_session(self, request, user):
-        """Create or update user session."""
-        session_key = request.session.session_key
-        if not session_key:
-            request.session.create()
-            session_key = request.session.session_key
+        """
+        Create or update user session.
+
+        The session key is carried in the tokens as the ``sid`` claim, so no
+        Django session row has to be written at login.
+        """
+        session_key = request.session.session_key or get_random_string(32, VALID_KEY_CHARS)
         
-        UserSession.objects.update_or_create(
+        login_audit.record_session(
             session_key=session_key,
-            defaults={
-                'user': user,
-                'ip_address': self._get_client_ip(request),
-                'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-                'last_activity': timezone.now(),
-                'is_active': True
-            }
+            user_id=user.pk,
+            ip_address=self._get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', '')
         )
+        return session_key
 
 
 class CustomTokenRefreshView(TokenRefreshView):
     """
     Custom token refresh view.
     """
-    pass
+    serializer_class = RevocableTokenRefreshSerializer
 
 
 class UserRegistrationView(APIView):
@@ -117,7 +148,7 @@ class UserRegistrationView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def _send_verification_email(self, user):
-        """Send email verification."""
+        """Queue email verification for delivery after commit."""
         token = default_token_generator.make_token(user)
         uid = urlsafe_base64_encode(force_bytes(user.pk))
         
@@ -136,13 +167,7 @@ class UserRegistrationView(APIView):
         The BlockBustre Team
         """
         
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        queue_email(subject, message, [user.email])
 
 
 class EmailVerificationView(APIView):
@@ -182,6 +207,11 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
+    def retrieve(self, request, *args, **kwargs):
+        return cached_payload_response(
+            request, 'profile', lambda: _serialize_user(request.user.pk)
+        )
+
 
 class UserUpdateView(generics.UpdateAPIView):
     """
@@ -247,13 +277,7 @@ class PasswordResetView(APIView):
             The BlockBustre Team
             """
             
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-                fail_silently=False,
-            )
+            queue_email(subject, message, [email])
             
             return Response({
                 'message': 'Password reset email sent successfully.'
@@ -302,11 +326,11 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
-            token = RefreshToken(refresh_token)
+            token = RevocableRefreshToken(refresh_token)
             token.blacklist()
             
             # Deactivate user session
-            session_key = request.session.session_key
+            session_key = token.get('sid') or request.session.session_key
             if session_key:
                 UserSession.objects.filter(session_key=session_key).update(is_active=False)
             
@@ -327,6 +351,12 @@ class RoleListView(generics.ListAPIView):
     permission_classes = [permissions.IsAdminUser]
 
 
+def _serialize_user(user_id):
+    """Serialize a user with its role and profile fetched in one query."""
+    user = User.objects.select_related('role', 'profile').get(pk=user_id)
+    return UserSerializer(user).data
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_dashboard(request):
@@ -336,19 +366,26 @@ def user_dashboard(request):
     user = request.user
     
     try:
-        # Get user statistics safely
-        stats = {
-            'total_contracts': 0,  # Will be implemented when contracts app is ready
-            'total_transactions': 0,  # Will be implemented when transactions app is ready
-            'kyc_verified': user.is_kyc_verified,
-            'subscription_active': user.is_subscriber(),
-            'service_fee_percentage': user.get_service_fee_percentage(),
-        }
+        # Counters are maintained incrementally, so this is a single-row read
+        user_stats = UserStats.objects.filter(user_id=user.pk).first() or UserStats(user_id=user.pk)
+
+        def build_payload():
+            # Get user statistics safely
+            stats = user_stats.as_dict()
+            stats.update({
+                'kyc_verified': user.is_kyc_verified,
+                'subscription_active': user.is_subscriber(),
+                'service_fee_percentage': user.get_service_fee_percentage(),
+            })
+            return {
+                'user': _serialize_user(user.pk),
+                'stats': stats
+            }
         
-        return Response({
-            'user': UserSerializer(user).data,
-            'stats': stats
-        })
+        return cached_payload_response(
+            request, 'dashboard', build_payload,
+            extra_version=user_stats.updated_at.isoformat() if user_stats.updated_at else ''
+        )
     except Exception as e:
         return Response(
             {'error': f'Dashboard data error: {str(e)}'},
@@ -387,3 +424,67 @@ def check_admin_status(request):
         'email': user.email
     })
 
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def gdpr_export(request):
+    """
+    Stream the current user's data export as a ZIP archive.
+    """
+    user = request.user
+    response = StreamingHttpResponse(iter_export_archive(user), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(user)}"'
+    return response
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def gdpr_export_request(request):
+    """
+    Request a background data export, or check the latest one's status.
+    """
+    from .tasks import export_user_data
+
+    user_id = request.user.pk
+    export = get_export_status(user_id)
+    if request.method == 'GET':
+        if export is None:
+            return Response({'status': 'none'})
+        export_status = export['status']
+        if export_status == 'pending' and not is_export_pending(export):
+            export_status = 'failed'
+        return Response({'status': export_status, 'size': export.get('size')})
+
+    if is_export_pending(export):
+        return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+
+    export = {**(export or {}), 'status': 'pending', 'requested_at': timezone.now().timestamp()}
+    set_export_status(user_id, **export)
+
+    def queue_export():
+        try:
+            export_user_data.delay(user_id)
+        except Exception:
+            set_export_status(user_id, **{**export, 'status': 'failed'})
+            raise
+
+    transaction.on_commit(queue_export)
+    return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def gdpr_export_download(request):
+    """
+    Download the archive produced by the latest background export.
+    """
+    export = get_export_status(request.user.pk) or {}
+    path = export.get('path')
+    if not path or export.get('status') != 'ready':
+        return Response({'error': 'No export is ready'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        archive = open(path, 'rb')
+    except FileNotFoundError:
+        return Response({'error': 'No export is ready'}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(archive, as_attachment=True, filename=path.rsplit('/', 1)[-1])
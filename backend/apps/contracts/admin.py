@@ -2,7 +2,7 @@
 Admin configuration for contracts app.
 """
 from django.contrib import admin
-from .models import SmartContract, ContractCategory, ContractTemplate, ContractDeploymentLog
+from .models import SmartContract, ContractCategory, ContractTemplate, ContractDeploymentLog, DocumentUpload
 
 
 @admin.register(ContractCategory)
@@ -45,6 +45,21 @@ class SmartContractAdmin(admin.ModelAdmin):
         'gas_used', 'gas_price', 'verification_timestamp', 'created_at', 'updated_at'
     ]
     ordering = ['-created_at']
+    actions = ['soft_delete_contracts', 'restore_contracts']
+
+    def get_queryset(self, request):
+        # Soft-deleted contracts stay visible here, filterable by is_deleted.
+        return SmartContract.all_objects.select_related('user', 'category')
+
+    @admin.action(description='Soft delete selected contracts')
+    def soft_delete_contracts(self, request, queryset):
+        count = queryset.soft_delete()
+        self.message_user(request, f'{count} contracts soft deleted.')
+
+    @admin.action(description='Restore selected contracts')
+    def restore_contracts(self, request, queryset):
+        count = queryset.restore()
+        self.message_user(request, f'{count} contracts restored.')
 
 
 @admin.register(ContractDeploymentLog)
@@ -55,3 +70,15 @@ class ContractDeploymentLogAdmin(admin.ModelAdmin):
     readonly_fields = ['contract', 'deployment_attempt', 'status', 'message', 'transaction_hash', 'gas_used', 'created_at']
     ordering = ['-created_at']
 
+
+
+@admin.register(DocumentUpload)
+class DocumentUploadAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'user', 'status', 'received_bytes', 'total_size', 'contract', 'updated_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['filename', 'user__email', 'document_hash']
+    readonly_fields = [
+        'id', 'user', 'contract', 'filename', 'total_size', 'received_bytes', 'expected_hash',
+        'document_hash', 'document_name', 'status', 'created_at', 'updated_at'
+    ]
+    ordering = ['-created_at']
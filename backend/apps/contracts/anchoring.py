@@ -0,0 +1,128 @@
+"""
+Merkle-batched anchoring of contract documents.
+
+Instead of one transaction per contract, pending contracts of a network are
+claimed in batches of up to ``ANCHOR_BATCH_SIZE``, their ``document_hash``
+values become the leaves of a Merkle tree and only the 32-byte root is
+published, in a single transaction. Each contract stores its inclusion
+proof in ``contract_metadata['anchor']`` next to the shared
+``transaction_hash``, so thousands of documents are registered for the cost
+of one transaction.
+
+Batches are claimed and retried by the deployment pipeline in
+``deployment.py`` and confirmed by ``confirmations.py``.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .blockchain import get_chain_client
+from .merkle import MerkleTree, verify_proof
+from .state import transition
+
+logger = logging.getLogger(__name__)
+
+
+def claim_pending(network, limit):
+    """Move up to ``limit`` due pending contracts of a network to ``processing``."""
+    from .models import SmartContract
+
+    return transition(
+        SmartContract.objects
+        .filter(blockchain_network=network)
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=timezone.now()))
+        .exclude(document_hash='')
+        .order_by('created_at', 'id'),
+        'pending', 'processing', limit=limit,
+    )
+
+
+def anchor_contracts(network, claimed):
+    """
+    Publish one Merkle root for the claimed contracts.
+
+    The transaction hash and the inclusion proofs are stored on the contracts
+    before the transaction is broadcast, and nothing waits for it to be
+    mined: the contracts stay in ``processing`` until the confirmation
+    tracker sees it buried deep enough, and the signer pool bumps it if it is
+    stuck. Returns the number of contracts anchored. Raises ``ChainError``
+    when the transaction cannot be published; the contracts are then left
+    for the caller to retry.
+    """
+    from .models import ContractDeploymentLog, SmartContract
+
+    document_hashes = sorted(set(
+        SmartContract.objects.filter(pk__in=claimed).values_list('document_hash', flat=True)
+    ))
+    if not document_hashes:
+        return 0
+    tree = MerkleTree(document_hashes)
+    contracts = []
+
+    def record(transaction_hash):
+        now = timezone.now()
+        with transaction.atomic():
+            contracts[:] = (
+                SmartContract.objects
+                .filter(pk__in=claimed, status='processing')
+                .select_for_update()
+                .only('pk', 'document_hash', 'contract_metadata', 'retry_count')
+            )
+            for contract in contracts:
+                contract.transaction_hash = transaction_hash
+                contract.block_number = None
+                contract.error_message = ''
+                contract.next_attempt_at = None
+                contract.updated_at = now
+                contract.contract_metadata = {
+                    **(contract.contract_metadata or {}),
+                    'anchor': {
+                        'network': network,
+                        'root': tree.root_hex,
+                        'proof': tree.proof(contract.document_hash),
+                        'leaf_count': len(document_hashes),
+                        'transaction_hash': transaction_hash,
+                        'anchored_at': now.isoformat(),
+                    },
+                }
+            SmartContract.objects.bulk_update(
+                contracts,
+                ['transaction_hash', 'block_number', 'error_message', 'next_attempt_at',
+                 'updated_at', 'contract_metadata'],
+                batch_size=500,
+            )
+
+    transaction_hash = get_chain_client(network).anchor(tree.root, on_signed=record)['transaction_hash']
+
+    ContractDeploymentLog.objects.bulk_create([
+        ContractDeploymentLog(
+            contract=contract,
+            deployment_attempt=contract.retry_count + 1,
+            status='submitted',
+            message=f'Anchored in Merkle root {tree.root_hex} with {len(document_hashes)} documents',
+            transaction_hash=transaction_hash,
+        )
+        for contract in contracts
+    ], batch_size=500)
+
+    logger.info('Anchored %d contracts on %s in %s', len(contracts), network, transaction_hash)
+    return len(contracts)
+
+
+def verify_anchor(contract, check_chain=False):
+    """
+    Return True if the contract's stored proof links its document to the anchored root.
+
+    With ``check_chain`` the root is also read back from the anchoring transaction.
+    """
+    anchor = (contract.contract_metadata or {}).get('anchor')
+    if not anchor or not contract.document_hash:
+        return False
+    if not verify_proof(contract.document_hash, anchor.get('proof', []), anchor.get('root')):
+        return False
+    if check_chain:
+        client = get_chain_client(anchor.get('network', contract.blockchain_network))
+        return client.get_anchored_root(anchor['transaction_hash']) == anchor['root']
+    return True
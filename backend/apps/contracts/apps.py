@@ -6,3 +6,5 @@ class ContractsConfig(AppConfig):
     name = 'apps.contracts'
     verbose_name = 'Smart Contracts'
 
+    def ready(self):
+        from . import signals  # noqa: F401
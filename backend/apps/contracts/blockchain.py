@@ -0,0 +1,393 @@
+"""
+Blockchain clients used to publish anchoring transactions.
+
+``get_chain_client(network)`` returns the client configured by
+``BLOCKCHAIN_CLIENT``:
+
+* ``web3`` - JSON-RPC node from ``BLOCKCHAIN_NETWORKS[network]['rpc_url']``,
+  signing through a pool of the network's ``private_keys`` (or
+  ``BLOCKCHAIN_PRIVATE_KEYS``), see ``signers.py``.
+* ``eth_tester`` - in-process EVM (``eth-tester`` with py-evm), for tests.
+* ``local`` - in-memory ledger with no dependencies, for development.
+"""
+import hashlib
+import threading
+
+from django.conf import settings
+
+# Prefix marking anchoring payloads in transaction data ("BBA" + version 1).
+ANCHOR_MAGIC = b'BBA\x01'
+
+# Gas of one anchoring transaction: the base cost plus 16 per (non-zero) data byte.
+ANCHOR_GAS = 21000 + 16 * (len(ANCHOR_MAGIC) + 32)
+
+# Gas price of the development ledger (1 gwei).
+LOCAL_GAS_PRICE = 10 ** 9
+
+
+class ChainError(Exception):
+    """Raised when a transaction cannot be published or read."""
+
+
+class BaseChainClient:
+    """
+    Interface for publishing and reading anchoring transactions.
+    """
+    def __init__(self, network):
+        self.network = network
+
+    def anchor(self, root, on_signed=None):
+        """
+        Publish a 32-byte Merkle root in one transaction, without waiting for it to be mined.
+
+        ``on_signed(transaction_hash)`` is called before the transaction is
+        broadcast, so the caller can record the hash first; if it raises,
+        nothing is sent. Returns a dict with ``transaction_hash``.
+        """
+        raise NotImplementedError
+
+    def get_anchored_root(self, transaction_hash):
+        """Return the hex root published by a transaction, or None."""
+        raise NotImplementedError
+
+    def block_number(self):
+        """Return the number of the latest block."""
+        raise NotImplementedError
+
+    def get_receipts(self, transaction_hashes):
+        """
+        Return ``{transaction_hash: receipt}`` for many transactions at once.
+
+        Receipts are dicts with ``transaction_hash``, ``block_number``,
+        ``gas_used``, ``gas_price``, ``contract_address`` and ``status``;
+        unmined transactions map to None. A transaction replaced by a gas bump
+        maps to the receipt of whichever version was mined, whose hash is
+        the receipt's ``transaction_hash``.
+        """
+        raise NotImplementedError
+
+    def get_known_transactions(self, transaction_hashes):
+        """Return the subset of transactions known to the node, mined or pending, or replaced by one that is."""
+        raise NotImplementedError
+
+    def fee_history(self, block_count, percentiles):
+        """
+        Return the fee history of the latest ``block_count`` blocks.
+
+        The dict holds ``base_fee``, the base fee of the next block in wei,
+        and ``rewards``, one list of priority fees per block with one value per
+        percentile. Networks without EIP-1559 fees raise ``ChainError``.
+        """
+        raise NotImplementedError
+
+    def gas_price(self):
+        """Return the node's legacy gas price in wei."""
+        raise NotImplementedError
+
+    @staticmethod
+    def encode_payload(root):
+        if len(root) != 32:
+            raise ChainError('Merkle roots must be 32 bytes')
+        return ANCHOR_MAGIC + root
+
+    @staticmethod
+    def decode_payload(data):
+        data = bytes(data or b'')
+        if len(data) != len(ANCHOR_MAGIC) + 32 or not data.startswith(ANCHOR_MAGIC):
+            return None
+        return data[len(ANCHOR_MAGIC):].hex()
+
+
+class LocalChainClient(BaseChainClient):
+    """
+    In-memory ledger shared by every client in the process.
+
+    Gas is priced at a flat ``LOCAL_GAS_PRICE`` so quotes work in development.
+    """
+    _ledgers = {}
+    _lock = threading.Lock()
+
+    def anchor(self, root, on_signed=None):
+        payload = self.encode_payload(root)
+        with self._lock:
+            ledger = self._ledgers.setdefault(self.network, {})
+            block_number = len(ledger) + 1
+            transaction_hash = '0x' + hashlib.sha256(
+                f'{self.network}:{block_number}:'.encode() + payload
+            ).hexdigest()
+            if on_signed is not None:
+                on_signed(transaction_hash)
+            ledger[transaction_hash] = {
+                'block_number': block_number,
+                'data': payload,
+                'gas_used': ANCHOR_GAS,
+            }
+        return {'transaction_hash': transaction_hash}
+
+    def get_anchored_root(self, transaction_hash):
+        entry = self._ledgers.get(self.network, {}).get(transaction_hash)
+        return self.decode_payload(entry['data']) if entry else None
+
+    def block_number(self):
+        ledger = self._ledgers.get(self.network, {})
+        return max((entry['block_number'] for entry in ledger.values()), default=0)
+
+    def get_receipts(self, transaction_hashes):
+        ledger = self._ledgers.get(self.network, {})
+        receipts = {}
+        for transaction_hash in transaction_hashes:
+            entry = ledger.get(transaction_hash)
+            receipts[transaction_hash] = entry and {
+                'transaction_hash': transaction_hash,
+                'block_number': entry['block_number'],
+                'gas_used': entry['gas_used'],
+                'gas_price': 0,
+                'contract_address': None,
+                'status': 1,
+            }
+        return receipts
+
+    def get_known_transactions(self, transaction_hashes):
+        ledger = self._ledgers.get(self.network, {})
+        return {transaction_hash for transaction_hash in transaction_hashes if transaction_hash in ledger}
+
+    def fee_history(self, block_count, percentiles):
+        return {
+            'base_fee': LOCAL_GAS_PRICE,
+            'rewards': [[0] * len(percentiles) for _ in range(block_count)],
+        }
+
+    def gas_price(self):
+        return LOCAL_GAS_PRICE
+
+
+class Web3ChainClient(BaseChainClient):
+    """
+    Client publishing zero-value self-transactions through web3.py.
+
+    Transactions are signed by a SignerPool over ``private_keys``. Without
+    keys the node's first unlocked account sends them, which is how the
+    in-process ``eth_tester`` EVM is used; the node then chooses the hash, so
+    ``on_signed`` only runs after the transaction is sent.
+    """
+    def __init__(self, network, web3, private_keys=(), chain_id=None):
+        from .signers import SignerPool
+
+        super().__init__(network)
+        self.web3 = web3
+        self.chain_id = chain_id
+        self.signers = SignerPool(network, web3, private_keys, chain_id=chain_id) if private_keys else None
+
+    @classmethod
+    def from_rpc_url(cls, network, rpc_url, **kwargs):
+        from web3 import Web3
+        return cls(network, Web3(Web3.HTTPProvider(rpc_url)), **kwargs)
+
+    @classmethod
+    def eth_tester(cls, network, private_keys=(), **kwargs):
+        """Client on a fresh in-process EVM, funding ``private_keys`` from its test account."""
+        from web3 import EthereumTesterProvider, Web3
+
+        web3 = Web3(EthereumTesterProvider())
+        for key in private_keys:
+            web3.eth.send_transaction({
+                'from': web3.eth.accounts[0],
+                'to': web3.eth.account.from_key(key).address,
+                'value': 10 ** 20,
+            })
+        return cls(network, web3, private_keys=private_keys, **kwargs)
+
+    def anchor(self, root, on_signed=None):
+        payload = self.encode_payload(root)
+        callback_errors = []
+
+        def signed(transaction_hash):
+            try:
+                on_signed(transaction_hash)
+            except Exception as exc:
+                callback_errors.append(exc)
+                raise
+
+        try:
+            if self.signers is None:
+                address = self.web3.eth.accounts[0]
+                transaction_hash = self.web3.eth.send_transaction(
+                    {'from': address, 'to': address, 'value': 0, 'data': payload}
+                ).hex()
+                if on_signed is not None:
+                    signed(transaction_hash)
+            else:
+                _, _, transaction_hash = self.signers.send(
+                    {'value': 0, 'data': payload},
+                    on_signed=signed if on_signed is not None else None,
+                )
+        except Exception as exc:
+            if callback_errors:
+                raise
+            raise ChainError(f'Anchoring transaction failed on {self.network}: {exc}') from exc
+        return {'transaction_hash': transaction_hash}
+
+    def block_number(self):
+        try:
+            return self.web3.eth.block_number
+        except Exception as exc:
+            raise ChainError(f'Cannot read the latest block on {self.network}: {exc}') from exc
+
+    def get_receipts(self, transaction_hashes):
+        chains = self._replacements(transaction_hashes)
+        hashes = [transaction_hash for chain in chains.values() for transaction_hash in chain]
+        found = {
+            transaction_hash: _normalize_receipt(receipt, transaction_hash)
+            for transaction_hash, receipt in zip(hashes, self._batch('eth_getTransactionReceipt', hashes))
+        }
+        return {
+            transaction_hash: next((found[h] for h in chain if found[h] is not None), None)
+            for transaction_hash, chain in chains.items()
+        }
+
+    def get_known_transactions(self, transaction_hashes):
+        chains = self._replacements(transaction_hashes)
+        hashes = [transaction_hash for chain in chains.values() for transaction_hash in chain]
+        known = {
+            transaction_hash
+            for transaction_hash, transaction in zip(hashes, self._batch('eth_getTransactionByHash', hashes))
+            if transaction
+        }
+        return {transaction_hash for transaction_hash, chain in chains.items() if known.intersection(chain)}
+
+    def _replacements(self, transaction_hashes):
+        """Return each hash with the gas-bumped replacements sent after it."""
+        if self.signers is None:
+            return {transaction_hash: [transaction_hash] for transaction_hash in transaction_hashes}
+        return self.signers.replacements(transaction_hashes)
+
+    def fee_history(self, block_count, percentiles):
+        try:
+            history = self.web3.eth.fee_history(block_count, 'latest', list(percentiles))
+        except Exception as exc:
+            raise ChainError(f'eth_feeHistory failed on {self.network}: {exc}') from exc
+        base_fees = history.get('baseFeePerGas') or []
+        rewards = history.get('reward') or []
+        if not base_fees or not rewards:
+            raise ChainError(f'No fee history on {self.network}')
+        return {
+            'base_fee': _quantity(base_fees[-1]),
+            'rewards': [[_quantity(value) for value in block] for block in rewards],
+        }
+
+    def gas_price(self):
+        try:
+            return self.web3.eth.gas_price
+        except Exception as exc:
+            raise ChainError(f'eth_gasPrice failed on {self.network}: {exc}') from exc
+
+    def _batch(self, method, transaction_hashes):
+        """
+        Call ``method`` once per hash, as JSON-RPC batch requests over HTTP.
+
+        Providers without an HTTP endpoint (such as eth_tester) are called
+        one request at a time.
+        """
+        endpoint = getattr(self.web3.provider, 'endpoint_uri', None)
+        try:
+            if not endpoint:
+                return [
+                    self.web3.manager.request_blocking(method, [transaction_hash])
+                    for transaction_hash in transaction_hashes
+                ]
+
+            import requests
+
+            size = getattr(settings, 'BLOCKCHAIN_RPC_BATCH_SIZE', 100)
+            results = []
+            for start in range(0, len(transaction_hashes), size):
+                chunk = transaction_hashes[start:start + size]
+                response = requests.post(
+                    endpoint,
+                    json=[
+                        {'jsonrpc': '2.0', 'id': i, 'method': method, 'params': [transaction_hash]}
+                        for i, transaction_hash in enumerate(chunk)
+                    ],
+                    timeout=30,
+                )
+                response.raise_for_status()
+                body = response.json()
+                if not isinstance(body, list):
+                    raise ChainError(f'Batch request rejected: {body}')
+                by_id = {item.get('id'): item.get('result') for item in body}
+                results.extend(by_id.get(i) for i in range(len(chunk)))
+            return results
+        except ChainError:
+            raise
+        except Exception as exc:
+            raise ChainError(f'{method} batch failed on {self.network}: {exc}') from exc
+
+    def get_anchored_root(self, transaction_hash):
+        try:
+            transaction = self.web3.eth.get_transaction(transaction_hash)
+        except Exception:
+            return None
+        # JSON-RPC nodes return the payload as ``input``; eth-tester as ``data``.
+        data = transaction.get('input', transaction.get('data'))
+        if isinstance(data, str):
+            data = bytes.fromhex(data[2:] if data.startswith('0x') else data)
+        return self.decode_payload(data)
+
+
+def _quantity(value):
+    return int(value, 16) if isinstance(value, str) else value
+
+
+def _normalize_receipt(receipt, transaction_hash):
+    """Convert a raw or web3-formatted receipt to the client receipt dict."""
+    if not receipt or receipt.get('blockNumber') is None:
+        return None
+    return {
+        'transaction_hash': transaction_hash,
+        'block_number': _quantity(receipt['blockNumber']),
+        'gas_used': _quantity(receipt['gasUsed']),
+        'gas_price': _quantity(receipt.get('effectiveGasPrice') or 0),
+        'contract_address': receipt.get('contractAddress'),
+        'status': _quantity(receipt.get('status', 1)),
+    }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_chain_client(network):
+    """Return the (process-wide) client for a network."""
+    with _clients_lock:
+        client = _clients.get(network)
+        if client is None:
+            client = _clients[network] = _build_client(network)
+        return client
+
+
+def _build_client(network):
+    backend = getattr(settings, 'BLOCKCHAIN_CLIENT', 'web3')
+    config = getattr(settings, 'BLOCKCHAIN_NETWORKS', {}).get(network, {})
+    if backend == 'local':
+        return LocalChainClient(network)
+    if backend == 'eth_tester':
+        return Web3ChainClient.eth_tester(network, private_keys=get_private_keys(network))
+    if backend != 'web3':
+        raise ChainError(f'Unknown BLOCKCHAIN_CLIENT {backend!r}')
+    if not config.get('rpc_url'):
+        raise ChainError(f'No RPC URL configured for {network}')
+    return Web3ChainClient.from_rpc_url(
+        network,
+        config['rpc_url'],
+        private_keys=get_private_keys(network),
+        chain_id=config.get('chain_id'),
+    )
+
+
+def get_private_keys(network):
+    """Return the signing keys of a network, falling back to the shared keys."""
+    config = getattr(settings, 'BLOCKCHAIN_NETWORKS', {}).get(network, {})
+    keys = config.get('private_keys') or getattr(settings, 'BLOCKCHAIN_PRIVATE_KEYS', [])
+    if not keys and getattr(settings, 'BLOCKCHAIN_PRIVATE_KEY', ''):
+        keys = [settings.BLOCKCHAIN_PRIVATE_KEY]
+    return list(keys)
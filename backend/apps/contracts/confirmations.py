@@ -0,0 +1,236 @@
+"""
+Batched confirmation tracking of anchoring transactions.
+
+Anchoring transactions are recorded on their contracts before they are
+broadcast, and the contracts stay in ``processing`` while they are mined.
+Once per new block and network, the tracker collects the distinct
+``transaction_hash`` values of those contracts and fetches their receipts
+with JSON-RPC batch requests. Thousands of contracts share one transaction,
+so RPC cost per tick depends on the number of networks and transactions, not
+contracts.
+
+* A receipt buried under the network's ``confirmations`` depth moves its
+  contracts to ``deployed`` with the final block, gas and address data.
+* A receipt in a different block than recorded (first inclusion, or a reorg
+  re-included the transaction) updates ``block_number``. All such changes are
+  written with one UPDATE.
+* A transaction the signer pool replaced with a gas bump is followed to the
+  replacement that was mined, and the contracts adopt its hash.
+* A transaction without a receipt is still pending or lost its block; its
+  contracts keep waiting. If the node no longer knows it at all after
+  ``DEPLOYMENT_PROCESSING_TIMEOUT``, the contracts are retried.
+* A reverted transaction is retried.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, CharField, PositiveIntegerField, Q, Value, When
+from django.utils import timezone
+
+from .blockchain import ChainError, get_chain_client
+from .deployment import retry_or_fail
+from .state import record_transitions
+from .verification import invalidate_documents
+
+logger = logging.getLogger(__name__)
+
+
+def _head_key(network):
+    return f'contracts:confirmations:head:{network}'
+
+
+def confirmation_depth(network):
+    config = getattr(settings, 'BLOCKCHAIN_NETWORKS', {}).get(network, {})
+    return config.get('confirmations', getattr(settings, 'DEPLOYMENT_CONFIRMATIONS', 12))
+
+
+def track_network(network):
+    """
+    Check the anchoring transactions of one network against its latest block.
+
+    Returns counts of ``deployed``, ``moved``, ``unmined`` and ``retried``
+    contracts, or None if no new block was mined since the last check.
+    """
+    from .models import SmartContract
+
+    client = get_chain_client(network)
+    head = client.block_number()
+    if cache.get(_head_key(network)) == head:
+        return None
+
+    hashes = list(
+        SmartContract.objects
+        .filter(blockchain_network=network, status='processing')
+        .exclude(transaction_hash='')
+        .order_by()
+        .values_list('transaction_hash', flat=True)
+        .distinct()
+    )
+    counts = {'deployed': 0, 'moved': 0, 'unmined': 0, 'retried': 0}
+    if hashes:
+        receipts = client.get_receipts(hashes)
+        depth = confirmation_depth(network)
+        confirmed, included, reverted, unmined = {}, {}, [], []
+        for transaction_hash, receipt in receipts.items():
+            if receipt is None:
+                unmined.append(transaction_hash)
+            elif receipt['status'] == 0:
+                reverted.append(transaction_hash)
+            elif head - receipt['block_number'] + 1 >= depth:
+                confirmed[transaction_hash] = receipt
+            else:
+                included[transaction_hash] = receipt
+
+        if included:
+            counts['moved'] = _record_inclusion(included)
+        if confirmed:
+            counts['deployed'] = _mark_deployed(network, confirmed, head)
+        if reverted:
+            counts['retried'] += _retry(reverted, ChainError('Anchoring transaction reverted'))
+        if unmined:
+            counts['unmined'] = (
+                SmartContract.objects
+                .filter(transaction_hash__in=unmined, status='processing')
+                .exclude(block_number=None)
+                .update(block_number=None)
+            )
+            # Only transactions pending for longer than the timeout can count as dropped.
+            timeout = getattr(settings, 'DEPLOYMENT_PROCESSING_TIMEOUT', 15 * 60)
+            stale = list(
+                SmartContract.objects
+                .filter(transaction_hash__in=unmined, status='processing')
+                .filter(updated_at__lt=timezone.now() - timedelta(seconds=timeout))
+                .order_by()
+                .values_list('transaction_hash', flat=True)
+                .distinct()
+            )
+            if stale:
+                known = client.get_known_transactions(stale)
+                dropped = [transaction_hash for transaction_hash in stale if transaction_hash not in known]
+                if dropped:
+                    counts['retried'] += _retry(dropped, ChainError('Anchoring transaction was dropped'), stale_only=True)
+
+    cache.set(_head_key(network), head, None)
+    return counts
+
+
+def _record_inclusion(receipts):
+    """
+    Store the block, and the mined replacement's hash, of included transactions.
+
+    One UPDATE covers every transaction whose recorded block or hash changed.
+    The anchor metadata is brought up to date when the contracts are deployed.
+    """
+    from .models import SmartContract
+
+    block_numbers, transaction_hashes, changed = [], [], Q()
+    for transaction_hash, receipt in receipts.items():
+        block_numbers.append(When(transaction_hash=transaction_hash, then=Value(receipt['block_number'])))
+        transaction_hashes.append(When(transaction_hash=transaction_hash, then=Value(receipt['transaction_hash'])))
+        if receipt['transaction_hash'] == transaction_hash:
+            changed |= Q(transaction_hash=transaction_hash) & ~Q(block_number=receipt['block_number'])
+        else:
+            changed |= Q(transaction_hash=transaction_hash)
+    return (
+        SmartContract.objects
+        .filter(status='processing')
+        .filter(changed)
+        .update(
+            block_number=Case(*block_numbers, output_field=PositiveIntegerField()),
+            transaction_hash=Case(*transaction_hashes, output_field=CharField()),
+        )
+    )
+
+
+def _mark_deployed(network, receipts, head):
+    from .models import ContractDeploymentLog, SmartContract
+
+    now = timezone.now()
+    with transaction.atomic():
+        contracts = list(
+            SmartContract.objects
+            .filter(transaction_hash__in=list(receipts), status='processing')
+            .select_for_update()
+            .only('pk', 'user_id', 'document_hash', 'transaction_hash', 'contract_metadata', 'retry_count')
+        )
+        shares = {}
+        for contract in contracts:
+            shares[contract.transaction_hash] = shares.get(contract.transaction_hash, 0) + 1
+        for contract in contracts:
+            receipt = receipts[contract.transaction_hash]
+            # The transaction cost is shared by every contract it anchors.
+            contract.gas_used = receipt['gas_used'] // shares[contract.transaction_hash]
+            contract.transaction_hash = receipt['transaction_hash']
+            contract.status = 'deployed'
+            contract.block_number = receipt['block_number']
+            contract.gas_price = receipt['gas_price']
+            contract.contract_address = receipt['contract_address'] or ''
+            contract.updated_at = now
+            anchor = (contract.contract_metadata or {}).get('anchor')
+            if anchor:
+                anchor.update({
+                    'transaction_hash': receipt['transaction_hash'],
+                    'block_number': receipt['block_number'],
+                    'gas_used': receipt['gas_used'],
+                    'gas_price': receipt['gas_price'],
+                    'confirmed_at_block': head,
+                })
+        SmartContract.objects.bulk_update(
+            contracts,
+            ['status', 'transaction_hash', 'block_number', 'gas_used', 'gas_price',
+             'contract_address', 'updated_at', 'contract_metadata'],
+            batch_size=500,
+        )
+        record_transitions([contract.user_id for contract in contracts], 'processing', 'deployed')
+        invalidate_documents(contract.document_hash for contract in contracts)
+        ContractDeploymentLog.objects.bulk_create([
+            ContractDeploymentLog(
+                contract=contract,
+                deployment_attempt=contract.retry_count + 1,
+                status='deployed',
+                message=f'Confirmed in block {contract.block_number} on {network}',
+                transaction_hash=contract.transaction_hash,
+                gas_used=contract.gas_used,
+            )
+            for contract in contracts
+        ], batch_size=500)
+    return len(contracts)
+
+
+def _retry(transaction_hashes, error, stale_only=False):
+    from .models import SmartContract
+
+    contracts = SmartContract.objects.filter(transaction_hash__in=transaction_hashes, status='processing')
+    if stale_only:
+        timeout = getattr(settings, 'DEPLOYMENT_PROCESSING_TIMEOUT', 15 * 60)
+        contracts = contracts.filter(updated_at__lt=timezone.now() - timedelta(seconds=timeout))
+    pks = list(contracts.values_list('pk', flat=True))
+    if not pks:
+        return 0
+    logger.warning('Retrying %d contracts on %s: %s', len(pks), ', '.join(transaction_hashes), error)
+    counts = retry_or_fail(pks, error)
+    return counts['retried'] + counts['failed']
+
+
+def track_confirmations():
+    """Run ``track_network`` for every network with anchoring transactions in flight."""
+    from .models import SmartContract
+
+    networks = (
+        SmartContract.objects
+        .filter(status='processing')
+        .exclude(transaction_hash='')
+        .order_by()
+        .values_list('blockchain_network', flat=True)
+        .distinct()
+    )
+    results = {}
+    for network in networks:
+        try:
+            results[network] = track_network(network)
+        except ChainError as exc:
+            logger.warning('Confirmation tracking failed on %s: %s', network, exc)
+    return results
@@ -0,0 +1,236 @@
+"""
+Celery-driven deployment pipeline for smart contracts.
+
+Contracts move through the guarded transitions of ``state.TRANSITIONS``::
+
+    draft -> pending -> processing -> deployed -> verified
+               ^            |
+               +-- retry ---+--> failed
+
+The ``dispatch_deployments`` beat task queues ``deploy_network`` tasks for
+networks with contracts due for deployment. Each task holds one slot of a
+per-network Redis semaphore, so at most ``DEPLOYMENT_CONCURRENCY`` batches
+(or one per signing key, if more) are in flight per network however many
+workers run. Batches are claimed with ``SKIP LOCKED``, so workers never share
+contracts and throughput grows with the number of workers up to that limit.
+
+Published batches stay in ``processing`` until the confirmation tracker
+(``confirmations.py``) sees their transaction deep enough to deploy them.
+A batch that cannot be published goes back to ``pending`` with
+``next_attempt_at`` pushed out exponentially in ``retry_count``; after
+``DEPLOYMENT_MAX_RETRIES`` retries the contract fails. Every attempt is
+recorded as a ContractDeploymentLog row.
+"""
+import logging
+import math
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .anchoring import anchor_contracts, claim_pending
+from .blockchain import ChainError, get_private_keys
+from .state import check_transition, record_transitions
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkSemaphore:
+    """
+    Counting semaphore per network, stored as a Redis sorted set of leases.
+
+    A network gets ``limit`` slots, or one per signing key if it has more
+    keys, so deployment throughput grows with the signer pool. Leases expire
+    after ``timeout`` seconds so a crashed worker cannot hold a slot forever.
+    """
+    def __init__(self, limit=2, timeout=15 * 60):
+        self.limit = limit
+        self.timeout = timeout
+
+    def key(self, network):
+        return f'contracts:deploy_slots:{network}'
+
+    def limit_for(self, network):
+        return max(self.limit, len(get_private_keys(network)))
+
+    def acquire(self, network):
+        """Return a lease token, or None if every slot is taken."""
+        now = time.time()
+        key = self.key(network)
+        token = uuid.uuid4().hex
+
+        pipe = self._redis().pipeline()
+        pipe.zremrangebyscore(key, 0, now - self.timeout)
+        pipe.zadd(key, {token: now})
+        pipe.zrank(key, token)
+        pipe.expire(key, int(self.timeout) + 1)
+        _, _, rank, _ = pipe.execute()
+
+        if rank is not None and rank < self.limit_for(network):
+            return token
+        self.release(network, token)
+        return None
+
+    def release(self, network, token):
+        self._redis().zrem(self.key(network), token)
+
+    @contextmanager
+    def slot(self, network):
+        """Hold a slot for the block; yields None if none was free."""
+        token = self.acquire(network)
+        try:
+            yield token
+        finally:
+            if token is not None:
+                self.release(network, token)
+
+    def _redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+
+deployment_slots = NetworkSemaphore(
+    limit=getattr(settings, 'DEPLOYMENT_CONCURRENCY', 2),
+    timeout=getattr(settings, 'DEPLOYMENT_PROCESSING_TIMEOUT', 15 * 60),
+)
+
+
+def retry_delay(retry_count):
+    """Seconds to wait before the attempt following ``retry_count`` failures."""
+    base = getattr(settings, 'DEPLOYMENT_RETRY_BACKOFF', 60)
+    maximum = getattr(settings, 'DEPLOYMENT_RETRY_BACKOFF_MAX', 6 * 60 * 60)
+    return min(base * 2 ** retry_count, maximum)
+
+
+def retry_or_fail(contract_ids, error):
+    """
+    Return processing contracts to ``pending`` with backoff, or fail them.
+
+    Returns a dict with the number of contracts ``retried`` and ``failed``.
+    """
+    from .models import ContractDeploymentLog, SmartContract
+
+    max_retries = getattr(settings, 'DEPLOYMENT_MAX_RETRIES', 5)
+    now = timezone.now()
+    counts = {'retried': 0, 'failed': 0}
+    with transaction.atomic():
+        rows = (
+            SmartContract.objects
+            .filter(pk__in=contract_ids, status='processing')
+            .select_for_update()
+            .values_list('pk', 'user_id', 'retry_count')
+        )
+        by_retry_count = defaultdict(list)
+        for pk, user_id, retry_count in rows:
+            by_retry_count[retry_count].append((pk, user_id))
+
+        logs = []
+        for retry_count, group in by_retry_count.items():
+            if retry_count >= max_retries:
+                to_status, next_attempt_at = 'failed', None
+            else:
+                to_status = 'pending'
+                next_attempt_at = now + timedelta(seconds=retry_delay(retry_count))
+            check_transition('processing', to_status)
+
+            pks = [pk for pk, _ in group]
+            SmartContract.objects.filter(pk__in=pks).update(
+                status=to_status,
+                retry_count=retry_count + 1,
+                error_message=str(error),
+                next_attempt_at=next_attempt_at,
+                transaction_hash='',
+                block_number=None,
+                updated_at=now,
+            )
+            record_transitions([user_id for _, user_id in group], 'processing', to_status)
+            counts['retried' if to_status == 'pending' else 'failed'] += len(pks)
+
+            logs.extend(
+                ContractDeploymentLog(
+                    contract_id=pk,
+                    deployment_attempt=retry_count + 1,
+                    status='retrying' if to_status == 'pending' else 'failed',
+                    message=str(error),
+                    error_details={
+                        'error': type(error).__name__,
+                        'next_attempt_at': next_attempt_at.isoformat() if next_attempt_at else None,
+                    },
+                )
+                for pk in pks
+            )
+        ContractDeploymentLog.objects.bulk_create(logs, batch_size=500)
+    return counts
+
+
+def deploy_batch(network, batch_size=None):
+    """Claim, publish and record one batch of due contracts. Returns the batch size."""
+    batch_size = batch_size or getattr(settings, 'ANCHOR_BATCH_SIZE', 5000)
+    claimed = claim_pending(network, batch_size)
+    if not claimed:
+        return 0
+    try:
+        anchor_contracts(network, claimed)
+    except ChainError as exc:
+        logger.warning('Deploying %d contracts on %s failed: %s', len(claimed), network, exc)
+        retry_or_fail(claimed, exc)
+    return len(claimed)
+
+
+def recover_stale_deployments():
+    """
+    Retry contracts left in ``processing`` by a worker that died mid-batch.
+
+    Transaction hashes are stored before anything is broadcast, so contracts
+    without one were never published and are safe to anchor again. Contracts
+    with a transaction are followed by the confirmation tracker instead.
+    """
+    from .models import SmartContract
+
+    timeout = getattr(settings, 'DEPLOYMENT_PROCESSING_TIMEOUT', 15 * 60)
+    stale = list(
+        SmartContract.objects
+        .filter(status='processing', transaction_hash='')
+        .filter(updated_at__lt=timezone.now() - timedelta(seconds=timeout))
+        .values_list('pk', flat=True)
+    )
+    if not stale:
+        return {'retried': 0, 'failed': 0}
+    return retry_or_fail(stale, ChainError('Deployment timed out'))
+
+
+def due_contract_counts():
+    """Return the number of contracts due for deployment per network."""
+    from .models import SmartContract
+
+    rows = (
+        SmartContract.objects
+        .filter(status='pending')
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=timezone.now()))
+        .exclude(document_hash='')
+        .order_by()
+        .values('blockchain_network')
+        .annotate(count=Count('pk'))
+    )
+    return {row['blockchain_network']: row['count'] for row in rows}
+
+
+def dispatch_deployments():
+    """Queue enough ``deploy_network`` tasks to drain every network's due contracts."""
+    from .tasks import deploy_network
+
+    recovered = recover_stale_deployments()
+    batch_size = getattr(settings, 'ANCHOR_BATCH_SIZE', 5000)
+    queued = {}
+    for network, count in due_contract_counts().items():
+        tasks = min(deployment_slots.limit_for(network), math.ceil(count / batch_size))
+        for _ in range(tasks):
+            deploy_network.delay(network)
+        queued[network] = tasks
+    return {'queued': queued, **recovered}
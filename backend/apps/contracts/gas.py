@@ -0,0 +1,166 @@
+"""
+Per-network gas price oracle.
+
+A Celery beat task samples every network every ``GAS_ORACLE_INTERVAL``
+seconds. It reads ``eth_feeHistory`` over the last ``GAS_ORACLE_BLOCKS``
+blocks, or falls back to ``eth_gasPrice`` on networks without EIP-1559 fees.
+The slow, standard and fast prices go to the cache:
+
+* The fee-history price is the next block's base fee plus the median
+  priority fee paid at the 10th, 50th and 90th percentile.
+* The ``eth_gasPrice`` fallback gives all three speeds the same price.
+
+Quotes only read the cache, so pricing never waits on an RPC node:
+
+* A sample is fresh for ``GAS_ORACLE_TTL`` seconds.
+* A sample older than that is still served for up to
+  ``GAS_ORACLE_STALE_TTL`` seconds, while one background refresh is queued
+  (stale-while-revalidate). If that refresh fails, the next one is queued
+  no sooner than ``GAS_ORACLE_TTL`` seconds later, so an unreachable node is
+  not hit on every read.
+* Without any sample a quote is unavailable until a refresh lands.
+"""
+import logging
+import time
+from decimal import ROUND_UP, Decimal
+from statistics import median
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .blockchain import ANCHOR_GAS, ChainError, get_chain_client
+
+logger = logging.getLogger(__name__)
+
+SPEEDS = ('slow', 'standard', 'fast')
+FEE_PERCENTILES = (10, 50, 90)
+
+WEI_PER_COIN = Decimal(10) ** 18
+FEE_QUANTUM = Decimal('0.00000001')
+
+
+class GasOracle:
+    """
+    Cached gas prices per network with stale-while-revalidate reads.
+    """
+    def __init__(self, ttl=30, stale_ttl=300, blocks=20):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.blocks = blocks
+
+    def key(self, network):
+        return f'contracts:gas:{network}'
+
+    def refresh_key(self, network):
+        return f'contracts:gas:{network}:refreshing'
+
+    def sample(self, network):
+        """Read the network's current gas prices from its node. Raises ``ChainError``."""
+        client = get_chain_client(network)
+        try:
+            history = client.fee_history(self.blocks, FEE_PERCENTILES)
+        except ChainError as exc:
+            logger.debug('Falling back to eth_gasPrice on %s: %s', network, exc)
+        else:
+            base_fee = history['base_fee']
+            return {
+                'network': network,
+                'source': 'fee_history',
+                'base_fee': base_fee,
+                **{
+                    speed: base_fee + int(median(block[index] for block in history['rewards']))
+                    for index, speed in enumerate(SPEEDS)
+                },
+                'sampled_at': time.time(),
+            }
+
+        gas_price = client.gas_price()
+        return {
+            'network': network,
+            'source': 'gas_price',
+            'base_fee': None,
+            **{speed: gas_price for speed in SPEEDS},
+            'sampled_at': time.time(),
+        }
+
+    def refresh(self, network):
+        """Sample a network and cache its prices. Returns the new entry."""
+        entry = self.sample(network)
+        cache.set(self.key(network), entry, self.ttl + self.stale_ttl)
+        # Only cleared on success: after a failure the flag expires on its
+        # own, which spaces out retries against a failing node.
+        cache.delete(self.refresh_key(network))
+        return entry
+
+    def get(self, network):
+        """
+        Return the cached prices of a network, or None if it was never sampled.
+
+        A stale entry is returned as is, with one refresh queued in the background.
+        """
+        entry = cache.get(self.key(network))
+        if entry is None or self.is_stale(entry):
+            self.revalidate(network)
+        return entry
+
+    def get_many(self, networks):
+        """Return ``{network: entry or None}`` with one cache read."""
+        keys = {self.key(network): network for network in networks}
+        entries = cache.get_many(list(keys))
+        results = {}
+        for key, network in keys.items():
+            entry = entries.get(key)
+            if entry is None or self.is_stale(entry):
+                self.revalidate(network)
+            results[network] = entry
+        return results
+
+    def revalidate(self, network):
+        """Queue a refresh of the network unless one is already queued."""
+        from .tasks import refresh_gas_price
+
+        if cache.add(self.refresh_key(network), True, self.ttl):
+            refresh_gas_price.delay(network)
+
+    def is_stale(self, entry):
+        return time.time() - entry['sampled_at'] >= self.ttl
+
+
+gas_oracle = GasOracle(
+    ttl=getattr(settings, 'GAS_ORACLE_TTL', 30),
+    stale_ttl=getattr(settings, 'GAS_ORACLE_STALE_TTL', 300),
+    blocks=getattr(settings, 'GAS_ORACLE_BLOCKS', 20),
+)
+
+
+def fee_from_price(gas_price, gas_units=ANCHOR_GAS):
+    """Return the cost of ``gas_units`` at ``gas_price`` wei, in the network's coin."""
+    return (Decimal(gas_units * gas_price) / WEI_PER_COIN).quantize(FEE_QUANTUM, rounding=ROUND_UP)
+
+
+def estimate_gas_fee(network, speed='standard', gas_units=ANCHOR_GAS):
+    """
+    Return the cached gas fee of anchoring a contract on a network, or None.
+
+    Contracts are quoted as if they paid for a whole anchoring transaction;
+    their actual share of a batched transaction is lower.
+    """
+    if speed not in SPEEDS:
+        raise ValueError(f'Unknown gas speed {speed!r}')
+    entry = gas_oracle.get(network)
+    if entry is None:
+        return None
+    return fee_from_price(entry[speed], gas_units)
+
+
+def refresh_gas_prices(networks=None):
+    """Sample every configured network, returning ``{network: entry}`` for those that answered."""
+    if networks is None:
+        networks = list(getattr(settings, 'BLOCKCHAIN_NETWORKS', {}))
+    results = {}
+    for network in networks:
+        try:
+            results[network] = gas_oracle.refresh(network)
+        except ChainError as exc:
+            logger.warning('Gas price sampling failed on %s: %s', network, exc)
+    return results
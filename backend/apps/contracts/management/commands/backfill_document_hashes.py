@@ -0,0 +1,72 @@
+"""
+Management command to move legacy contract documents into content-addressed storage.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.contracts.models import SmartContract
+from apps.contracts.storage import digest_from_name, document_storage
+
+
+class Command(BaseCommand):
+    help = 'Hash existing contract documents and move them into content-addressed storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of contracts updated per batch'
+        )
+        parser.add_argument(
+            '--keep-originals',
+            action='store_true',
+            help='Leave the original files in place after moving them'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        contracts = (
+            SmartContract.all_objects
+            .filter(document_hash='')
+            .exclude(document_file='')
+            .exclude(document_file__isnull=True)
+            .only('pk', 'document_file', 'document_hash')
+            .order_by('pk')
+            .iterator(chunk_size=batch_size)
+        )
+
+        batch = []
+        originals = []
+        moved = missing = 0
+        for contract in contracts:
+            name = contract.document_file.name
+            digest = digest_from_name(name)
+            if not digest:
+                try:
+                    with document_storage.open(name, 'rb') as original:
+                        stored_name = document_storage.save(name, original)
+                except FileNotFoundError:
+                    missing += 1
+                    continue
+                digest = digest_from_name(stored_name)
+                contract.document_file.name = stored_name
+                originals.append(name)
+            contract.document_hash = digest
+            batch.append(contract)
+
+            if len(batch) >= batch_size:
+                moved += self._flush(batch, originals, options['keep_originals'])
+                batch, originals = [], []
+        if batch:
+            moved += self._flush(batch, originals, options['keep_originals'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Hashed {moved} documents ({missing} files missing)'
+        ))
+
+    def _flush(self, contracts, originals, keep_originals):
+        SmartContract.all_objects.bulk_update(contracts, ['document_file', 'document_hash'])
+        if not keep_originals:
+            for name in originals:
+                document_storage.delete(name)
+        return len(contracts)
@@ -0,0 +1,78 @@
+"""
+Management command running the document metadata extraction worker.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+
+from apps.contracts.metadata import ExtractionPool, process_queue, queue_contracts
+from apps.contracts.models import SmartContract
+
+
+class Command(BaseCommand):
+    help = 'Extract metadata for queued contract documents in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'DOCUMENT_METADATA_WORKERS', 2),
+            help='Number of extraction processes'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of queued contracts processed per batch'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue once and exit instead of running continuously'
+        )
+        parser.add_argument(
+            '--enqueue-missing',
+            action='store_true',
+            help='Queue every contract with a document but no extracted metadata, or a failed extraction, first'
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue_missing']:
+            missing = (
+                SmartContract.objects
+                .exclude(document_hash='')
+                .filter(Q(document_metadata={}) | Q(document_metadata__has_key='error'))
+                .values_list('pk', flat=True)
+                .iterator(chunk_size=5000)
+            )
+            batch = []
+            for contract_id in missing:
+                batch.append(contract_id)
+                if len(batch) >= 5000:
+                    queue_contracts(batch)
+                    batch = []
+            queue_contracts(batch)
+
+        total = 0
+        with ExtractionPool(options['workers']) as pool:
+            while True:
+                close_old_connections()
+                processed = process_queue(pool, options['batch_size'])
+                if processed is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+                total += processed
+                self.stdout.write(f'Extracted metadata for {processed} contracts')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {total} contracts'))
@@ -0,0 +1,39 @@
+"""
+Management command to reprice open contracts from the cached gas prices.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.contracts.gas import SPEEDS
+from apps.contracts.models import SmartContract
+from apps.contracts.pricing import reprice_open_contracts
+
+
+class Command(BaseCommand):
+    help = 'Recompute gas fee estimates, service fees and total costs of contracts not yet deployed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--network',
+            choices=[code for code, _ in SmartContract.BLOCKCHAIN_NETWORK_CHOICES],
+            help='Only reprice contracts on this network'
+        )
+        parser.add_argument(
+            '--speed',
+            choices=SPEEDS,
+            default='standard',
+            help='Gas price speed to quote at'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of contracts priced and updated per batch'
+        )
+
+    def handle(self, *args, **options):
+        updated = reprice_open_contracts(
+            network=options['network'],
+            speed=options['speed'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Repriced {updated} contracts'))
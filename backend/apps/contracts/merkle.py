@@ -0,0 +1,70 @@
+"""
+SHA-256 Merkle trees over document hashes.
+
+Leaves and internal nodes are domain-separated (``0x00`` and ``0x01``
+prefixes) and each pair is hashed in sorted order, so a proof is just the
+list of sibling hashes: verifying it needs no left/right flags. An unpaired
+node is carried up to the next level unchanged.
+"""
+import hashlib
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+
+def leaf_hash(document_hash):
+    """Return the leaf node for a hex SHA-256 document hash."""
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(document_hash)).digest()
+
+
+def node_hash(left, right):
+    first, second = sorted((left, right))
+    return hashlib.sha256(NODE_PREFIX + first + second).digest()
+
+
+class MerkleTree:
+    """
+    Merkle tree over a list of hex document hashes.
+    """
+    def __init__(self, document_hashes):
+        if not document_hashes:
+            raise ValueError('A Merkle tree needs at least one leaf')
+        self.document_hashes = list(document_hashes)
+        self.index = {document_hash: i for i, document_hash in enumerate(self.document_hashes)}
+        self.levels = [[leaf_hash(document_hash) for document_hash in self.document_hashes]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    @property
+    def root_hex(self):
+        return self.root.hex()
+
+    def proof(self, document_hash):
+        """Return the sibling hashes (hex) from the document's leaf up to the root."""
+        position = self.index[document_hash]
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = position ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling].hex())
+            position //= 2
+        return proof
+
+
+def verify_proof(document_hash, proof, root_hex):
+    """Return True if ``proof`` links ``document_hash`` to the Merkle root."""
+    try:
+        node = leaf_hash(document_hash)
+        for sibling in proof:
+            node = node_hash(node, bytes.fromhex(sibling))
+    except (TypeError, ValueError):
+        return False
+    return node.hex() == (root_hex or '').lower()
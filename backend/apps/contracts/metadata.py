@@ -0,0 +1,314 @@
+"""
+Background metadata extraction for contract documents.
+
+Contracts whose document changes are queued in a Redis set after commit. The
+``process_document_metadata`` worker drains the queue in batches, extracts
+page count, word count, title, author and language in a bounded process pool,
+and writes the results back with one ``bulk_update`` per batch. Text is
+streamed page by page (PDF), paragraph by paragraph (DOCX) or line by line
+(TXT) and never held in memory as a whole. Successful results are cached by
+``document_hash``, so re-uploaded documents are never parsed twice.
+
+Failures are not cached. An extraction that times out after
+``DOCUMENT_METADATA_TIMEOUT`` seconds, or whose worker process dies, is
+transient: the contract is queued again, up to ``DOCUMENT_METADATA_RETRIES``
+times, before the error is stored. A running extraction cannot be cancelled,
+so the pool's workers are killed and the pool rebuilt, and the other
+unfinished extractions of the batch are resubmitted. Parse errors are stored on the contract
+right away, and ``process_document_metadata --enqueue-missing`` retries them.
+Formats without an extractor (legacy ``.doc``) are recorded as unsupported.
+"""
+import logging
+import os
+import re
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'contracts:metadata_queue'
+RETRIES_KEY = 'contracts:metadata_retries'
+EXTRACTOR_VERSION = 1
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+LANGUAGE_SAMPLE_WORDS = 2000
+
+STOPWORDS = {
+    'en': {'the', 'and', 'of', 'to', 'in', 'is', 'that', 'for', 'with', 'shall', 'this', 'be', 'by', 'or'},
+    'es': {'el', 'la', 'de', 'que', 'y', 'en', 'los', 'del', 'las', 'por', 'con', 'para', 'una', 'se'},
+    'fr': {'le', 'la', 'de', 'et', 'les', 'des', 'en', 'du', 'un', 'une', 'est', 'pour', 'que', 'dans'},
+    'de': {'der', 'die', 'und', 'das', 'den', 'von', 'zu', 'mit', 'ist', 'des', 'nicht', 'ein', 'eine', 'im'},
+    'pt': {'de', 'que', 'e', 'do', 'da', 'em', 'os', 'para', 'com', 'uma', 'no', 'na', 'por', 'se'},
+    'it': {'il', 'di', 'che', 'e', 'la', 'per', 'del', 'della', 'un', 'una', 'sono', 'con', 'non', 'gli'},
+    'nl': {'de', 'het', 'een', 'van', 'en', 'in', 'is', 'dat', 'op', 'te', 'voor', 'met', 'zijn', 'niet'},
+}
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+EP_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+
+
+class _TextStats:
+    """
+    Running word count and language sample over streamed text.
+    """
+    def __init__(self):
+        self.words = 0
+        self.sample = Counter()
+        self.sampled = 0
+
+    def feed(self, text):
+        words = WORD_RE.findall(text)
+        self.words += len(words)
+        room = LANGUAGE_SAMPLE_WORDS - self.sampled
+        if room > 0:
+            sample = [word.lower() for word in words[:room]]
+            self.sample.update(sample)
+            self.sampled += len(sample)
+
+    def language(self):
+        scores = {
+            code: sum(self.sample[word] for word in words)
+            for code, words in STOPWORDS.items()
+        }
+        code, score = max(scores.items(), key=lambda item: item[1])
+        # Require stopwords to make up a meaningful share of the sample.
+        return code if self.sampled and score / self.sampled >= 0.05 else ''
+
+
+def _extract_pdf(path, stats):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    info = reader.metadata
+    for page in reader.pages:
+        stats.feed(page.extract_text() or '')
+    return {
+        'pages': len(reader.pages),
+        'title': (info.title if info else None) or '',
+        'author': (info.author if info else None) or '',
+    }
+
+
+def _extract_docx(path, stats):
+    metadata = {'pages': None, 'title': '', 'author': ''}
+    with zipfile.ZipFile(path) as archive:
+        names = set(archive.namelist())
+        if 'docProps/core.xml' in names:
+            core = ElementTree.fromstring(archive.read('docProps/core.xml'))
+            metadata['title'] = core.findtext(f'{DC_NS}title') or ''
+            metadata['author'] = core.findtext(f'{DC_NS}creator') or ''
+        if 'docProps/app.xml' in names:
+            pages = ElementTree.fromstring(archive.read('docProps/app.xml')).findtext(f'{EP_NS}Pages')
+            metadata['pages'] = int(pages) if pages and pages.isdigit() else None
+
+        with archive.open('word/document.xml') as document:
+            paragraph = []
+            for _, element in ElementTree.iterparse(document, events=('end',)):
+                if element.tag == f'{W_NS}t':
+                    paragraph.append(element.text or '')
+                elif element.tag == f'{W_NS}p':
+                    stats.feed(''.join(paragraph))
+                    paragraph = []
+                    element.clear()
+    return metadata
+
+
+def _extract_txt(path, stats):
+    title = ''
+    with open(path, encoding='utf-8', errors='replace') as document:
+        for line in document:
+            if not title and line.strip():
+                title = line.strip()[:200]
+            stats.feed(line)
+    return {'pages': None, 'title': title, 'author': ''}
+
+
+EXTRACTORS = {
+    '.pdf': _extract_pdf,
+    '.docx': _extract_docx,
+    '.txt': _extract_txt,
+}
+
+
+def extract_metadata(path):
+    """Extract metadata from the document at ``path``. Runs in a pool process."""
+    extension = os.path.splitext(path)[1].lower()
+    extractor = EXTRACTORS.get(extension)
+    metadata = {'format': extension.lstrip('.'), 'size': os.path.getsize(path)}
+    if extractor is None:
+        metadata['supported'] = False
+        return metadata
+
+    stats = _TextStats()
+    try:
+        metadata.update(extractor(path, stats))
+    except Exception as exc:
+        metadata['error'] = f'{type(exc).__name__}: {exc}'
+        return metadata
+    metadata['words'] = stats.words
+    metadata['language'] = stats.language()
+    return metadata
+
+
+class ExtractionPool:
+    """
+    Bounded process pool whose workers can be killed and replaced.
+
+    ``ProcessPoolExecutor`` cannot interrupt a running job, so a hung
+    extraction would otherwise hold its worker for the life of the pool.
+    """
+    def __init__(self, workers):
+        self.workers = workers
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, fn, *args):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor.submit(fn, *args)
+
+    def restart(self):
+        """Kill every worker; the next submit starts a fresh pool."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # The executor exposes no public way to stop a busy worker.
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _cache_key(document_hash):
+    return f'contracts:document_metadata:v{EXTRACTOR_VERSION}:{document_hash}'
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def queue_contracts(contract_ids):
+    """Queue contracts for metadata extraction once the transaction commits."""
+    contract_ids = [str(contract_id) for contract_id in contract_ids]
+    if contract_ids:
+        transaction.on_commit(lambda: _redis().sadd(QUEUE_KEY, *contract_ids))
+
+
+def process_queue(pool, batch_size=100):
+    """
+    Extract metadata for one batch of queued contracts.
+
+    Returns the number of contracts updated, or ``None`` if the queue was empty.
+    """
+    redis = _redis()
+    contract_ids = [int(contract_id) for contract_id in redis.spop(QUEUE_KEY, batch_size) or []]
+    if not contract_ids:
+        return None
+    try:
+        updated, retry = process_contracts(contract_ids, pool)
+    except Exception:
+        redis.sadd(QUEUE_KEY, *contract_ids)
+        raise
+    if retry:
+        redis.sadd(QUEUE_KEY, *retry)
+    return updated
+
+
+def process_contracts(contract_ids, pool):
+    """
+    Extract and store metadata for the given contracts.
+
+    Returns ``(updated, retry)``: the number of contracts updated and the ids
+    of those whose extraction failed transiently and should be queued again.
+    """
+    from .models import SmartContract
+
+    contracts = [
+        contract for contract in
+        SmartContract.all_objects.filter(pk__in=contract_ids)
+        .only('pk', 'document_file', 'document_hash', 'document_metadata')
+        if contract.document_hash and contract.document_file
+    ]
+    by_hash = {}
+    for contract in contracts:
+        by_hash.setdefault(contract.document_hash, contract.document_file)
+
+    cached = cache.get_many([_cache_key(digest) for digest in by_hash])
+    results = {digest: cached[_cache_key(digest)] for digest in by_hash if _cache_key(digest) in cached}
+
+    pending = {
+        digest: pool.submit(extract_metadata, document.path)
+        for digest, document in by_hash.items() if digest not in results
+    }
+    cache_timeout = getattr(settings, 'DOCUMENT_METADATA_CACHE_TIMEOUT', 30 * 24 * 60 * 60)
+    timeout = getattr(settings, 'DOCUMENT_METADATA_TIMEOUT', 120)
+    transient = {}
+    digests = list(pending)
+    for position, digest in enumerate(digests):
+        try:
+            metadata = pending[digest].result(timeout=timeout)
+        except (TimeoutError, BrokenProcessPool) as exc:
+            logger.warning('Metadata extraction of document %s failed: %r', digest, exc)
+            error = f'Timed out after {timeout} seconds' if isinstance(exc, TimeoutError) else str(exc)
+            transient[digest] = {'error': f'{type(exc).__name__}: {error}'}
+            # Free the stuck (or dead) worker; extractions that had not
+            # finished yet die with the pool, so start them again.
+            pool.restart()
+            for other in digests[position + 1:]:
+                future = pending[other]
+                if not future.done() or future.cancelled() or future.exception() is not None:
+                    pending[other] = pool.submit(extract_metadata, by_hash[other].path)
+            continue
+        except Exception as exc:
+            logger.exception('Metadata extraction failed for document %s', digest)
+            metadata = {'error': f'{type(exc).__name__}: {exc}'}
+        else:
+            if 'error' not in metadata:
+                cache.set(_cache_key(digest), metadata, cache_timeout)
+        results[digest] = metadata
+
+    retry = []
+    if transient:
+        exhausted = _count_retries(transient)
+        for digest in exhausted:
+            results[digest] = transient[digest]
+        retry = [
+            contract.pk for contract in contracts
+            if contract.document_hash in transient and contract.document_hash not in exhausted
+        ]
+    if results:
+        _redis().hdel(RETRIES_KEY, *results)
+
+    updated = [contract for contract in contracts if contract.document_hash in results]
+    for contract in updated:
+        contract.document_metadata = {**results[contract.document_hash], 'document_hash': contract.document_hash}
+    SmartContract.all_objects.bulk_update(updated, ['document_metadata'], batch_size=500)
+    return len(updated), retry
+
+
+def _count_retries(digests):
+    """Count one more transient failure per document; return those out of retries."""
+    max_retries = getattr(settings, 'DOCUMENT_METADATA_RETRIES', 3)
+    pipe = _redis().pipeline()
+    for digest in digests:
+        pipe.hincrby(RETRIES_KEY, digest, 1)
+    attempts = pipe.execute()
+    return {digest for digest, count in zip(digests, attempts) if count > max_retries}
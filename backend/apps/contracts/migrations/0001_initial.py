@@ -0,0 +1,104 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:55
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField()),
+                ('icon', models.CharField(blank=True, max_length=50)),
+                ('is_active', models.BooleanField(default=True)),
+                ('sort_order', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Contract Categories',
+                'ordering': ['sort_order', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SmartContract',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('document_file', models.FileField(blank=True, null=True, upload_to='contracts/documents/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx', 'txt'])])),
+                ('document_hash', models.CharField(blank=True, max_length=64)),
+                ('document_metadata', models.JSONField(blank=True, default=dict)),
+                ('blockchain_network', models.CharField(choices=[('ethereum_mainnet', 'Ethereum Mainnet'), ('ethereum_sepolia', 'Ethereum Sepolia'), ('polygon_mainnet', 'Polygon Mainnet'), ('polygon_mumbai', 'Polygon Mumbai'), ('bsc_mainnet', 'BSC Mainnet'), ('bsc_testnet', 'BSC Testnet')], default='ethereum_sepolia', max_length=20)),
+                ('contract_address', models.CharField(blank=True, max_length=42)),
+                ('transaction_hash', models.CharField(blank=True, max_length=66)),
+                ('block_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('gas_used', models.PositiveIntegerField(blank=True, null=True)),
+                ('gas_price', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('pending', 'Pending'), ('processing', 'Processing'), ('deployed', 'Deployed'), ('verified', 'Verified'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='draft', max_length=20)),
+                ('gas_fee_estimate', models.DecimalField(blank=True, decimal_places=8, max_digits=18, null=True)),
+                ('service_fee', models.DecimalField(blank=True, decimal_places=8, max_digits=18, null=True)),
+                ('total_cost', models.DecimalField(blank=True, decimal_places=8, max_digits=18, null=True)),
+                ('verification_status', models.BooleanField(default=False)),
+                ('verification_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('contract_metadata', models.JSONField(blank=True, default=dict)),
+                ('error_message', models.TextField(blank=True)),
+                ('retry_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='contracts', to='contracts.contractcategory')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contracts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContractTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('template_code', models.TextField()),
+                ('variables', models.JSONField(default=list)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='templates', to='contracts.contractcategory')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContractDeploymentLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('deployment_attempt', models.PositiveIntegerField(default=1)),
+                ('status', models.CharField(max_length=20)),
+                ('message', models.TextField()),
+                ('transaction_hash', models.CharField(blank=True, max_length=66)),
+                ('gas_used', models.PositiveIntegerField(blank=True, null=True)),
+                ('error_details', models.JSONField(blank=True, default=dict)),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deployment_logs', to='contracts.smartcontract')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
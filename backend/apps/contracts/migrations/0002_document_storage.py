@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:56
+
+import apps.contracts.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='smartcontract',
+            name='document_file',
+            field=models.FileField(blank=True, null=True, storage=apps.contracts.storage.ContentAddressedStorage(), upload_to='contracts/documents/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx', 'txt'])]),
+        ),
+        migrations.AlterField(
+            model_name='smartcontract',
+            name='document_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
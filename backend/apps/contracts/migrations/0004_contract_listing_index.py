@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0003_documentupload'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='smartcontract',
+            index=models.Index(fields=['user', 'is_deleted', 'created_at', 'id'], name='contracts_user_created_idx'),
+        ),
+    ]
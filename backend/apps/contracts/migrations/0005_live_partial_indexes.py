@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0004_contract_listing_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='smartcontract',
+            name='contracts_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='smartcontract',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['user', 'created_at', 'id'], name='contracts_live_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smartcontract',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['status', 'updated_at'], name='contracts_live_status_idx'),
+        ),
+    ]
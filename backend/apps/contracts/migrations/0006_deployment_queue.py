@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0005_live_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='smartcontract',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='smartcontract',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status', 'pending')), fields=['blockchain_network', 'created_at', 'id'], name='contracts_deploy_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contracts', '0006_deployment_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='smartcontract',
+            name='gas_price',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,11 +1,16 @@
 """
 Smart contract models for blockchain registration.
 """
+import uuid
+
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 from apps.core.models import TimestampedModel, SoftDeleteModel
 from apps.accounts.models import User
 
+from .storage import digest_from_name, document_storage
+
 
 class ContractCategory(models.Model):
     """
@@ -66,11 +71,12 @@ class SmartContract(TimestampedModel, SoftDeleteModel):
     # Document information
     document_file = models.FileField(
         upload_to='contracts/documents/',
+        storage=document_storage,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx', 'txt'])],
         null=True,
         blank=True
     )
-    document_hash = models.CharField(max_length=64, blank=True)
+    document_hash = models.CharField(max_length=64, blank=True, db_index=True)
     document_metadata = models.JSONField(default=dict, blank=True)
 
     # Blockchain information
@@ -83,7 +89,7 @@ class SmartContract(TimestampedModel, SoftDeleteModel):
     transaction_hash = models.CharField(max_length=66, blank=True)
     block_number = models.PositiveIntegerField(null=True, blank=True)
     gas_used = models.PositiveIntegerField(null=True, blank=True)
-    gas_price = models.PositiveIntegerField(null=True, blank=True)
+    gas_price = models.PositiveBigIntegerField(null=True, blank=True)
 
     # Status and pricing
     status = models.CharField(
@@ -103,13 +109,69 @@ class SmartContract(TimestampedModel, SoftDeleteModel):
     # Error handling
     error_message = models.TextField(blank=True)
     retry_count = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Partial indexes only cover live rows, so they stay small and
+            # fast however many soft-deleted contracts accumulate.
+            models.Index(
+                fields=['user', 'created_at', 'id'],
+                name='contracts_live_user_idx',
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=['status', 'updated_at'],
+                name='contracts_live_status_idx',
+                condition=models.Q(is_deleted=False)
+            ),
+            # Deployment queue: pending live contracts per network, oldest first.
+            models.Index(
+                fields=['blockchain_network', 'created_at', 'id'],
+                name='contracts_deploy_queue_idx',
+                condition=models.Q(status='pending', is_deleted=False)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.user.email}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'document_file' in instance.__dict__:
+            instance._stored_document_name = instance.__dict__['document_file'] or ''
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Store a newly attached document and record its content hash.
+
+        The hash is only derived when the document differs from the one
+        loaded, so saving a contract whose file was not loaded or not
+        touched keeps its hash.
+        """
+        update_fields = kwargs.get('update_fields')
+        document_saved = update_fields is None or 'document_file' in update_fields
+        if 'document_file' in self.__dict__ and document_saved:
+            document = self.document_file
+            if document and not document._committed:
+                document.save(document.name, document.file, save=False)
+            name = document.name if document else ''
+            # None when the stored name is unknown (the field was deferred).
+            stored = getattr(self, '_stored_document_name', '' if self._state.adding else None)
+            if name != stored:
+                digest = digest_from_name(name)
+                if digest or (not name and stored is not None):
+                    self.document_hash = digest
+                    if update_fields is not None:
+                        kwargs['update_fields'] = {*update_fields, 'document_hash'}
+            super().save(*args, **kwargs)
+            self._stored_document_name = name
+        else:
+            super().save(*args, **kwargs)
+
     @property
     def is_deployed(self):
         return self.status == 'deployed' and bool(self.contract_address)
@@ -122,13 +184,27 @@ class SmartContract(TimestampedModel, SoftDeleteModel):
         """
         Calculate total cost including gas fees and service charges.
         """
+        from .pricing import apply_service_fee
+
         if self.gas_fee_estimate:
-            service_fee_percentage = self.user.get_service_fee_percentage()
-            service_fee = self.gas_fee_estimate * (service_fee_percentage / 100)
-            self.service_fee = service_fee
-            self.total_cost = self.gas_fee_estimate + service_fee
+            self.service_fee, self.total_cost = apply_service_fee(
+                self.gas_fee_estimate, self.user.get_service_fee_percentage()
+            )
             self.save(update_fields=['service_fee', 'total_cost'])
 
+    def update_gas_fee_estimate(self, speed='standard'):
+        """
+        Price the contract from its network's cached gas prices and update its total cost.
+        """
+        from .gas import estimate_gas_fee
+
+        estimate = estimate_gas_fee(self.blockchain_network, speed)
+        if estimate is not None:
+            self.gas_fee_estimate = estimate
+            self.save(update_fields=['gas_fee_estimate'])
+            self.calculate_total_cost()
+        return estimate
+
 
 class ContractTemplate(models.Model):
     """
@@ -153,6 +229,13 @@ class ContractTemplate(models.Model):
     def __str__(self):
         return self.name
 
+    def clean(self):
+        from .rendering import CompiledTemplate, TemplateRenderError
+        try:
+            CompiledTemplate(self.template_code, self.variables)
+        except TemplateRenderError as e:
+            raise ValidationError({'template_code': str(e)})
+
 
 class ContractDeploymentLog(TimestampedModel):
     """
@@ -176,3 +259,52 @@ class ContractDeploymentLog(TimestampedModel):
     def __str__(self):
         return f"{self.contract.title} - Attempt {self.deployment_attempt}"
 
+
+
+class DocumentUpload(TimestampedModel):
+    """
+    Resumable chunked upload of a contract document.
+
+    Chunks are appended in order to a partial file on disk; ``received_bytes``
+    is the offset the next chunk must start at.
+    """
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='document_uploads'
+    )
+    contract = models.ForeignKey(
+        SmartContract,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='document_uploads'
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    expected_hash = models.CharField(max_length=64, blank=True)
+    document_hash = models.CharField(max_length=64, blank=True)
+    document_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+    @property
+    def partial_path(self):
+        from .uploads import partial_path
+        return partial_path(self.pk)
@@ -0,0 +1,180 @@
+"""
+Batched pricing of smart contracts.
+
+A contract's total cost is its ``gas_fee_estimate`` plus a service fee set by
+its owner's subscription (``User.get_service_fee_percentage``).
+``reprice_contracts`` prices any number of contracts in batches:
+
+* the fee percentage of each owner is resolved once, with one query per batch
+  of owners not seen yet, instead of loading the user of every contract;
+* gas fee estimates come from the gas oracle's cache, read once per network;
+* fees are computed with Decimal arithmetic and only changed rows are written,
+  with ``bulk_update``.
+
+``quote`` prices hypothetical contracts for the pricing page from the same
+cached gas prices, without touching the database.
+"""
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+
+from .gas import FEE_QUANTUM, SPEEDS, fee_from_price, gas_oracle
+
+# Contracts whose price can still change: not yet handed to the chain.
+OPEN_STATUSES = ('draft', 'pending', 'failed')
+
+PRICE_FIELDS = ['gas_fee_estimate', 'service_fee', 'total_cost']
+
+
+def apply_service_fee(gas_fee, percentage):
+    """Return ``(service_fee, total_cost)`` for a gas fee and a service fee percentage."""
+    service_fee = (gas_fee * Decimal(percentage) / 100).quantize(FEE_QUANTUM)
+    return service_fee, gas_fee + service_fee
+
+
+def service_fee_percentages(user_ids):
+    """Return ``{user_id: percentage}`` for many users with one query."""
+    users = (
+        get_user_model().objects
+        .filter(pk__in=set(user_ids))
+        .only('pk', 'subscription_type', 'subscription_active', 'subscription_end_date')
+        .order_by()
+    )
+    return {user.pk: user.get_service_fee_percentage() for user in users}
+
+
+def default_service_fee_percentage():
+    """Return the pay-as-you-go percentage charged to users without a subscription."""
+    return get_user_model()(subscription_type='pay_as_you_go').get_service_fee_percentage()
+
+
+def gas_fees(networks, speed='standard'):
+    """Return ``{network: gas fee or None}`` from the gas oracle's cache."""
+    if speed not in SPEEDS:
+        raise ValueError(f'Unknown gas speed {speed!r}')
+    return {
+        network: entry and fee_from_price(entry[speed])
+        for network, entry in gas_oracle.get_many(networks).items()
+    }
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def reprice_contracts(contracts, speed='standard', refresh_gas=True, batch_size=500):
+    """
+    Recompute the gas fee estimate, service fee and total cost of many contracts.
+
+    ``contracts`` is a SmartContract queryset or list. With ``refresh_gas`` the
+    gas fee estimate is replaced by the network's cached price, where the gas
+    oracle has one; contracts without any estimate are skipped. Returns the
+    number of contracts whose price changed.
+    """
+    from .models import SmartContract
+
+    if isinstance(contracts, QuerySet):
+        contracts = (
+            contracts
+            .only('pk', 'user_id', 'blockchain_network', *PRICE_FIELDS)
+            .order_by('pk')
+            .iterator(chunk_size=batch_size)
+        )
+
+    percentages, network_fees = {}, {}
+    updated = 0
+    for batch in _batches(contracts, batch_size):
+        new_users = {contract.user_id for contract in batch} - percentages.keys()
+        if new_users:
+            percentages.update(service_fee_percentages(new_users))
+        if refresh_gas:
+            new_networks = {contract.blockchain_network for contract in batch} - network_fees.keys()
+            if new_networks:
+                network_fees.update(gas_fees(new_networks, speed))
+
+        changed = []
+        for contract in batch:
+            gas_fee = (refresh_gas and network_fees[contract.blockchain_network]) or contract.gas_fee_estimate
+            if not gas_fee:
+                continue
+            service_fee, total_cost = apply_service_fee(gas_fee, percentages[contract.user_id])
+            if (contract.gas_fee_estimate, contract.service_fee, contract.total_cost) != (gas_fee, service_fee, total_cost):
+                contract.gas_fee_estimate = gas_fee
+                contract.service_fee = service_fee
+                contract.total_cost = total_cost
+                changed.append(contract)
+        if changed:
+            # updated_at is left alone: the deployment timeouts are measured from it.
+            SmartContract.all_objects.bulk_update(changed, PRICE_FIELDS)
+            updated += len(changed)
+    return updated
+
+
+def reprice_open_contracts(network=None, speed='standard', batch_size=500):
+    """Reprice every contract not yet handed to the chain, optionally on one network."""
+    from .models import SmartContract
+
+    contracts = SmartContract.objects.filter(status__in=OPEN_STATUSES)
+    if network:
+        contracts = contracts.filter(blockchain_network=network)
+    return reprice_contracts(contracts, speed=speed, batch_size=batch_size)
+
+
+def quote(items, user=None, speed='standard'):
+    """
+    Price hypothetical contracts from cached gas prices.
+
+    ``items`` is a list of dicts with ``blockchain_network`` and ``quantity``.
+    Returns a dict with the ``service_fee_percentage`` applied, one priced
+    entry per item and the ``total`` of the items that could be priced. Items
+    on networks the gas oracle has no price for yet are returned unpriced.
+    """
+    if user is not None and user.is_authenticated:
+        percentage = user.get_service_fee_percentage()
+    else:
+        percentage = default_service_fee_percentage()
+
+    if speed not in SPEEDS:
+        raise ValueError(f'Unknown gas speed {speed!r}')
+    entries = gas_oracle.get_many({item['blockchain_network'] for item in items})
+
+    results, total = [], Decimal(0)
+    for item in items:
+        entry = entries[item['blockchain_network']]
+        result = {
+            'blockchain_network': item['blockchain_network'],
+            'quantity': item['quantity'],
+            'gas_price': None,
+            'gas_fee_estimate': None,
+            'service_fee': None,
+            'total_cost': None,
+            'subtotal': None,
+            'stale': None,
+        }
+        if entry is not None:
+            gas_fee = fee_from_price(entry[speed])
+            service_fee, total_cost = apply_service_fee(gas_fee, percentage)
+            subtotal = total_cost * item['quantity']
+            total += subtotal
+            result.update({
+                'gas_price': entry[speed],
+                'gas_fee_estimate': gas_fee,
+                'service_fee': service_fee,
+                'total_cost': total_cost,
+                'subtotal': subtotal,
+                'stale': gas_oracle.is_stale(entry),
+            })
+        results.append(result)
+    return {
+        'speed': speed,
+        'service_fee_percentage': percentage,
+        'items': results,
+        'total': total,
+    }
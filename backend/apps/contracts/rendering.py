@@ -0,0 +1,280 @@
+"""
+Compiled rendering of contract templates.
+
+``ContractTemplate.template_code`` is Django template syntax and
+``ContractTemplate.variables`` declares the values it expects, either as
+plain names or as objects::
+
+    {"name": "rent", "type": "number", "required": true, "default": null,
+     "choices": null, "max_length": null}
+
+Each template is compiled once into a template node list plus a validator
+holding one coercion function per variable. Both are kept in a bounded
+in-process LRU keyed by ``(template id, updated_at)`` and dropped when the
+template is saved, so rendering a batch costs one validation pass and one
+node-list render per item.
+"""
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.template import Context, Engine, TemplateSyntaxError
+
+ADDRESS_RE = re.compile(r'^0x[0-9a-fA-F]{40}$')
+
+# Contract text is not HTML, so values are inserted unescaped.
+engine = Engine(autoescape=False)
+
+
+class TemplateRenderError(Exception):
+    """Raised when a template cannot be compiled or its variables are invalid."""
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+
+def _to_string(value):
+    if isinstance(value, (dict, list)):
+        raise ValueError('Must be a string')
+    return str(value)
+
+
+def _to_integer(value):
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError('Must be an integer')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError('Must be an integer')
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        raise ValueError('Must be a number')
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError('Must be a number')
+    if not number.is_finite():
+        raise ValueError('Must be a number')
+    return number
+
+
+def _to_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ('true', '1', 'yes'):
+        return True
+    if str(value).lower() in ('false', '0', 'no'):
+        return False
+    raise ValueError('Must be a boolean')
+
+
+def _to_date(value):
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError('Must be a date (YYYY-MM-DD)')
+
+
+def _to_email(value):
+    value = _to_string(value).strip()
+    try:
+        validate_email(value)
+    except ValidationError:
+        raise ValueError('Must be an email address')
+    return value
+
+
+def _to_address(value):
+    value = _to_string(value).strip()
+    if not ADDRESS_RE.match(value):
+        raise ValueError('Must be a 0x-prefixed 20-byte address')
+    return value
+
+
+VARIABLE_TYPES = {
+    'string': _to_string,
+    'text': _to_string,
+    'integer': _to_integer,
+    'number': _to_number,
+    'boolean': _to_boolean,
+    'date': _to_date,
+    'email': _to_email,
+    'address': _to_address,
+}
+
+
+def _compile_field(spec):
+    """Return ``(name, coerce, required, default)`` for one variable declaration."""
+    if isinstance(spec, str):
+        spec = {'name': spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get('name'), str) or not spec['name']:
+        raise TemplateRenderError(f'Invalid variable declaration: {spec!r}')
+
+    name = spec['name']
+    kind = spec.get('type', 'string')
+    convert = VARIABLE_TYPES.get(kind)
+    if convert is None:
+        raise TemplateRenderError(f'Unknown type {kind!r} for variable {name!r}')
+    choices = spec.get('choices')
+    max_length = spec.get('max_length')
+
+    def coerce(value):
+        value = convert(value)
+        if choices and value not in choices:
+            raise ValueError(f'Must be one of: {", ".join(map(str, choices))}')
+        if max_length and len(str(value)) > max_length:
+            raise ValueError(f'Must be at most {max_length} characters')
+        return value
+
+    required = spec.get('required', 'default' not in spec)
+    return name, coerce, required, spec.get('default')
+
+
+class CompiledTemplate:
+    """
+    A template's compiled node list and variable validator.
+    """
+    def __init__(self, template_code, variables):
+        try:
+            self.template = engine.from_string(template_code)
+        except TemplateSyntaxError as exc:
+            raise TemplateRenderError(f'Template syntax error: {exc}')
+        self.fields = [_compile_field(spec) for spec in variables or []]
+
+    def validate(self, values):
+        """Return ``(cleaned, errors)`` for a dict of variable values."""
+        if not isinstance(values, dict):
+            return {}, {'variables': 'Must be an object'}
+        cleaned, errors = {}, {}
+        for name, coerce, required, default in self.fields:
+            value = values.get(name)
+            if value is None or value == '':
+                if required:
+                    errors[name] = 'This variable is required'
+                else:
+                    cleaned[name] = default
+                continue
+            try:
+                cleaned[name] = coerce(value)
+            except ValueError as exc:
+                errors[name] = str(exc)
+        return cleaned, errors
+
+    def render(self, values):
+        """Validate ``values`` and return the rendered text."""
+        cleaned, errors = self.validate(values)
+        if errors:
+            raise TemplateRenderError('Invalid template variables', errors)
+        return self.template.render(Context(cleaned, autoescape=False))
+
+    def render_many(self, items):
+        """Render a list of value dicts, returning ``(index, text, errors)`` per item."""
+        results = []
+        for index, values in enumerate(items):
+            cleaned, errors = self.validate(values)
+            text = None if errors else self.template.render(Context(cleaned, autoescape=False))
+            results.append((index, text, errors))
+        return results
+
+
+class CompiledTemplateCache:
+    """
+    Bounded in-process LRU of compiled templates.
+
+    Entries are keyed by template id and tagged with ``updated_at``, so a
+    template edited by another process is recompiled on its next use.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, template):
+        """Return the compiled form of a ContractTemplate instance."""
+        with self._lock:
+            entry = self._local.get(template.pk)
+            if entry is not None and entry[0] == template.updated_at:
+                self._local.move_to_end(template.pk)
+                return entry[1]
+
+        compiled = CompiledTemplate(template.template_code, template.variables)
+        with self._lock:
+            self._local[template.pk] = (template.updated_at, compiled)
+            self._local.move_to_end(template.pk)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+        return compiled
+
+    def invalidate(self, template_id):
+        with self._lock:
+            self._local.pop(template_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+
+compiled_templates = CompiledTemplateCache(
+    maxsize=getattr(settings, 'CONTRACT_TEMPLATE_CACHE_SIZE', 128),
+)
+
+
+def get_compiled_template(template):
+    """Return the cached compiled form of a ContractTemplate."""
+    return compiled_templates.get(template)
+
+
+def render_template(template, values):
+    """Render a ContractTemplate with one dict of variable values."""
+    return get_compiled_template(template).render(values)
+
+
+def create_contracts_from_template(template, user, items, blockchain_network=None):
+    """
+    Render ``items`` and create one draft contract per item in a single insert.
+
+    Each item is a dict with ``variables`` and an optional ``title``. Nothing is
+    created unless every item is valid; errors are reported by item index.
+    """
+    from django.db import transaction
+
+    from apps.accounts.models import UserStats
+    from .models import SmartContract
+
+    results = get_compiled_template(template).render_many([item['variables'] for item in items])
+    errors = {index: item_errors for index, _, item_errors in results if item_errors}
+    if errors:
+        raise TemplateRenderError('Invalid template variables', errors)
+
+    extra = {'blockchain_network': blockchain_network} if blockchain_network else {}
+    contracts = [
+        SmartContract(
+            title=item.get('title') or template.name,
+            description=text,
+            category_id=template.category_id,
+            user=user,
+            contract_metadata={
+                'template': {
+                    'id': template.pk,
+                    'updated_at': template.updated_at.isoformat(),
+                    'variables': item['variables'],
+                },
+            },
+            **extra,
+        )
+        for item, (_, text, _) in zip(items, results)
+    ]
+    with transaction.atomic():
+        contracts = SmartContract.objects.bulk_create(contracts, batch_size=500)
+        # bulk_create sends no post_save signals, so count the drafts here.
+        UserStats.apply_deltas(user.pk, {'contracts_total': len(contracts), 'contracts_draft': len(contracts)})
+    return contracts
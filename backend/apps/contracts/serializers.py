@@ -0,0 +1,194 @@
+"""
+Serializers for contracts app.
+"""
+from django.conf import settings
+from rest_framework import serializers
+
+from .gas import SPEEDS
+from .models import ContractCategory, ContractTemplate, DocumentUpload, SmartContract
+from .uploads import DOCUMENT_EXTENSIONS
+from .verification import normalize_hash
+
+
+class ContractCategorySerializer(serializers.ModelSerializer):
+    """
+    Serializer for ContractCategory model.
+    """
+    class Meta:
+        model = ContractCategory
+        fields = ['id', 'name', 'icon']
+
+
+class SmartContractListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight serializer for contract listings.
+    """
+    category = ContractCategorySerializer(read_only=True)
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+
+    class Meta:
+        model = SmartContract
+        fields = [
+            'id', 'title', 'category', 'user_email', 'status', 'blockchain_network',
+            'document_hash', 'contract_address', 'total_cost', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class SmartContractSerializer(serializers.ModelSerializer):
+    """
+    Serializer for SmartContract model.
+    """
+    category = ContractCategorySerializer(read_only=True)
+    category_id = serializers.PrimaryKeyRelatedField(
+        source='category', queryset=ContractCategory.objects.filter(is_active=True), write_only=True
+    )
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+    is_deployed = serializers.ReadOnlyField()
+    is_verified = serializers.ReadOnlyField()
+
+    class Meta:
+        model = SmartContract
+        fields = [
+            'id', 'title', 'description', 'category', 'category_id', 'user_email',
+            'document_file', 'document_hash', 'document_metadata',
+            'blockchain_network', 'contract_address', 'transaction_hash', 'block_number',
+            'gas_used', 'gas_price', 'status', 'gas_fee_estimate', 'service_fee', 'total_cost',
+            'verification_status', 'verification_timestamp', 'contract_metadata',
+            'error_message', 'retry_count', 'next_attempt_at', 'is_deployed', 'is_verified',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'document_hash', 'document_metadata', 'contract_address', 'transaction_hash',
+            'block_number', 'gas_used', 'gas_price', 'status', 'gas_fee_estimate', 'service_fee',
+            'total_cost', 'verification_status', 'verification_timestamp', 'contract_metadata',
+            'error_message', 'retry_count', 'next_attempt_at', 'created_at', 'updated_at'
+        ]
+
+
+class DocumentUploadSerializer(serializers.ModelSerializer):
+    """
+    Serializer for resumable document upload sessions.
+    """
+    class Meta:
+        model = DocumentUpload
+        fields = [
+            'id', 'filename', 'total_size', 'received_bytes', 'status',
+            'expected_hash', 'document_hash', 'contract', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class DocumentUploadCreateSerializer(serializers.Serializer):
+    """
+    Serializer for starting a resumable document upload.
+    """
+    filename = serializers.CharField(max_length=255)
+    total_size = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+
+    def validate_filename(self, value):
+        extension = value.rsplit('.', 1)[-1].lower() if '.' in value else ''
+        if extension not in DOCUMENT_EXTENSIONS:
+            raise serializers.ValidationError(
+                f"Allowed document types: {', '.join(DOCUMENT_EXTENSIONS)}."
+            )
+        return value
+
+
+class DocumentUploadCompleteSerializer(serializers.Serializer):
+    """
+    Serializer for completing an upload, optionally attaching it to a contract.
+    """
+    contract = serializers.IntegerField(required=False, allow_null=True)
+
+
+class DocumentVerificationSerializer(serializers.Serializer):
+    """
+    Serializer for verifying a document by SHA-256 hash or by uploaded file.
+    """
+    document_hash = serializers.CharField(required=False)
+    file = serializers.FileField(required=False)
+
+    def validate_document_hash(self, value):
+        document_hash = normalize_hash(value)
+        if document_hash is None:
+            raise serializers.ValidationError('Must be a hex SHA-256 digest')
+        return document_hash
+
+    def validate_file(self, value):
+        max_size = getattr(settings, 'DOCUMENT_VERIFICATION_MAX_SIZE', 50 * 1024 * 1024)
+        if value.size > max_size:
+            raise serializers.ValidationError(f'File must not exceed {max_size} bytes')
+        return value
+
+    def validate(self, attrs):
+        if bool(attrs.get('document_hash')) == bool(attrs.get('file')):
+            raise serializers.ValidationError('Provide either document_hash or file')
+        return attrs
+
+
+class ContractTemplateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for ContractTemplate model.
+    """
+    category = ContractCategorySerializer(read_only=True)
+
+    class Meta:
+        model = ContractTemplate
+        fields = ['id', 'name', 'category', 'description', 'template_code', 'variables', 'updated_at']
+        read_only_fields = fields
+
+
+class TemplateRenderItemSerializer(serializers.Serializer):
+    """
+    One contract to render: its variable values and an optional title.
+    """
+    title = serializers.CharField(max_length=200, required=False)
+    variables = serializers.DictField()
+
+
+class TemplateRenderSerializer(serializers.Serializer):
+    """
+    Serializer for rendering many contracts from one template.
+    """
+    items = TemplateRenderItemSerializer(many=True, allow_empty=False)
+    blockchain_network = serializers.ChoiceField(
+        choices=SmartContract.BLOCKCHAIN_NETWORK_CHOICES, required=False
+    )
+
+    def validate_items(self, value):
+        max_items = getattr(settings, 'CONTRACT_TEMPLATE_MAX_BATCH', 1000)
+        if len(value) > max_items:
+            raise serializers.ValidationError(f'At most {max_items} items can be rendered at once')
+        return value
+
+
+class QuoteItemSerializer(serializers.Serializer):
+    """
+    Contracts to price on one network, and their price once quoted.
+    """
+    blockchain_network = serializers.ChoiceField(choices=SmartContract.BLOCKCHAIN_NETWORK_CHOICES)
+    quantity = serializers.IntegerField(min_value=1, max_value=100000, default=1)
+    gas_price = serializers.IntegerField(read_only=True)
+    gas_fee_estimate = serializers.DecimalField(max_digits=18, decimal_places=8, read_only=True)
+    service_fee = serializers.DecimalField(max_digits=18, decimal_places=8, read_only=True)
+    total_cost = serializers.DecimalField(max_digits=18, decimal_places=8, read_only=True)
+    subtotal = serializers.DecimalField(max_digits=24, decimal_places=8, read_only=True)
+    stale = serializers.BooleanField(read_only=True, allow_null=True)
+
+
+class QuoteSerializer(serializers.Serializer):
+    """
+    Serializer for pricing many hypothetical contracts from cached gas prices.
+    """
+    items = QuoteItemSerializer(many=True, allow_empty=False)
+    speed = serializers.ChoiceField(choices=SPEEDS, default='standard')
+    service_fee_percentage = serializers.IntegerField(read_only=True)
+    total = serializers.DecimalField(max_digits=24, decimal_places=8, read_only=True)
+
+    def validate_items(self, value):
+        max_items = getattr(settings, 'PRICING_QUOTE_MAX_ITEMS', 100)
+        if len(value) > max_items:
+            raise serializers.ValidationError(f'At most {max_items} items can be quoted at once')
+        return value
@@ -0,0 +1,169 @@
+"""
+Signal receivers for the contracts app.
+"""
+from collections import defaultdict
+
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.accounts.models import UserStats
+from apps.core.signals import pre_restore, pre_soft_delete
+
+from .metadata import queue_contracts
+from .models import ContractTemplate, SmartContract
+from .rendering import compiled_templates
+from .verification import REGISTERED_STATUSES, invalidate_documents
+
+_UNKNOWN = object()
+
+
+def _stats_state(instance):
+    """Return the status a contract is counted under, or None if not counted."""
+    if instance.is_deleted:
+        return None
+    return instance.status
+
+
+def _state_deltas(deltas, state, sign):
+    """Add (``sign`` = 1) or remove (-1) one contract counted under ``state``."""
+    if state is None:
+        return
+    deltas['contracts_total'] = deltas.get('contracts_total', 0) + sign
+    deltas[f'contracts_{state}'] = deltas.get(f'contracts_{state}', 0) + sign
+
+
+@receiver(post_init, sender=SmartContract)
+def remember_contract_stats_state(sender, instance, **kwargs):
+    """Remember the owner and counted status as loaded, to diff against on save."""
+    loaded = instance.__dict__
+    if instance.pk is None:
+        instance._stats_state = None
+        instance._stats_user_id = None
+    elif 'status' in loaded and 'is_deleted' in loaded and 'user_id' in loaded:
+        instance._stats_state = _stats_state(instance)
+        instance._stats_user_id = instance.user_id
+    else:
+        instance._stats_state = _UNKNOWN
+
+
+@receiver(pre_save, sender=SmartContract)
+def load_contract_stats_state(sender, instance, **kwargs):
+    """Fetch the stored owner and status when they were deferred at load time."""
+    if getattr(instance, '_stats_state', None) is not _UNKNOWN:
+        return
+    stored = (
+        SmartContract.all_objects.filter(pk=instance.pk)
+        .values('user_id', 'status', 'is_deleted').first()
+    )
+    if stored is None:
+        instance._stats_state = None
+        instance._stats_user_id = None
+    else:
+        instance._stats_state = None if stored['is_deleted'] else stored['status']
+        instance._stats_user_id = stored['user_id']
+
+
+def _invalidate_registered(queryset):
+    invalidate_documents(
+        queryset.filter(status__in=REGISTERED_STATUSES)
+        .exclude(document_hash='')
+        .values_list('document_hash', flat=True)
+    )
+
+
+@receiver(post_save, sender=SmartContract)
+def invalidate_document_verification(sender, instance, created, **kwargs):
+    """Drop the cached public lookup when a contract is registered or unregistered."""
+    # Runs before the stats receiver below replaces the remembered state.
+    old_state = None if created else getattr(instance, '_stats_state', None)
+    new_state = _stats_state(instance)
+    if old_state == new_state or 'document_hash' not in instance.__dict__:
+        return
+    if old_state in REGISTERED_STATUSES or new_state in REGISTERED_STATUSES:
+        invalidate_documents([instance.document_hash])
+
+
+@receiver(post_save, sender=SmartContract)
+def update_user_stats_on_contract_save(sender, instance, created, **kwargs):
+    """Move the contract between per-status counters, and between owners if reassigned."""
+    old_state = None if created else getattr(instance, '_stats_state', None)
+    old_user_id = None if created else getattr(instance, '_stats_user_id', instance.user_id)
+    new_state = _stats_state(instance)
+    instance._stats_state = new_state
+    instance._stats_user_id = instance.user_id
+    if old_state == new_state and old_user_id == instance.user_id:
+        return
+
+    per_user = defaultdict(dict)
+    _state_deltas(per_user[old_user_id], old_state, -1)
+    _state_deltas(per_user[instance.user_id], new_state, 1)
+
+    values = {}
+    if new_state == 'deployed' and old_state != 'deployed':
+        values['last_deployment_at'] = timezone.now()
+
+    for user_id, deltas in per_user.items():
+        if user_id is not None:
+            UserStats.apply_deltas(user_id, deltas, **(values if user_id == instance.user_id else {}))
+
+
+@receiver(post_save, sender=SmartContract)
+def queue_document_metadata(sender, instance, **kwargs):
+    """Queue metadata extraction when the contract's document changes."""
+    loaded = instance.__dict__
+    if 'document_hash' not in loaded or 'document_metadata' not in loaded:
+        return
+    if not instance.document_hash:
+        return
+    if (instance.document_metadata or {}).get('document_hash') != instance.document_hash:
+        queue_contracts([instance.pk])
+
+
+@receiver(post_delete, sender=SmartContract)
+def update_user_stats_on_contract_delete(sender, instance, **kwargs):
+    """Remove a hard-deleted contract from the owner's counters."""
+    state = getattr(instance, '_stats_state', None)
+    if state is _UNKNOWN:
+        state = _stats_state(instance)
+    if state is None:
+        return
+    UserStats.apply_deltas(
+        instance.user_id, {'contracts_total': -1, f'contracts_{state}': -1}, create=False
+    )
+    if state in REGISTERED_STATUSES:
+        invalidate_documents([instance.document_hash])
+
+
+def _apply_bulk_state_change(queryset, sign):
+    """Apply UserStats deltas for contracts entering (+1) or leaving (-1) the counters."""
+    per_user = defaultdict(dict)
+    rows = queryset.order_by().values('user_id', 'status').annotate(count=Count('pk'))
+    for row in rows:
+        deltas = per_user[row['user_id']]
+        deltas['contracts_total'] = deltas.get('contracts_total', 0) + sign * row['count']
+        deltas[f"contracts_{row['status']}"] = sign * row['count']
+    for user_id, deltas in per_user.items():
+        UserStats.apply_deltas(user_id, deltas)
+
+
+@receiver(pre_soft_delete, sender=SmartContract)
+def update_user_stats_on_bulk_soft_delete(sender, queryset, **kwargs):
+    """Remove bulk soft-deleted contracts from their owners' counters."""
+    _apply_bulk_state_change(queryset, -1)
+    _invalidate_registered(queryset)
+
+
+@receiver(pre_restore, sender=SmartContract)
+def update_user_stats_on_bulk_restore(sender, queryset, **kwargs):
+    """Count bulk restored contracts again."""
+    _apply_bulk_state_change(queryset, 1)
+    _invalidate_registered(queryset)
+
+
+@receiver(post_save, sender=ContractTemplate)
+@receiver(post_delete, sender=ContractTemplate)
+def invalidate_compiled_template(sender, instance, **kwargs):
+    """Drop the compiled form of a changed template."""
+    compiled_templates.invalidate(instance.pk)
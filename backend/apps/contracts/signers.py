@@ -0,0 +1,344 @@
+"""
+Hot-wallet signer pool and Redis nonce allocation.
+
+Each network can sign with several keys. A transaction is assigned to the
+least-loaded key (fewest transactions in flight, ties broken round-robin) and
+takes the key's next nonce from an atomic Redis counter, so workers sending
+in parallel never reuse or wait on each other's nonces and throughput grows
+with the number of keys.
+
+Sending never waits for mining. A transaction is signed and stored with its
+nonce in Redis before it is broadcast, and the caller can record its hash
+first (``on_signed``), so a crash at any point leaves a transaction that is
+either tracked or never sent. ``SignerPool.recover()``, run periodically by
+Celery beat, then does the waiting: it drops mined entries, re-sends
+transactions that are still unmined after ``SIGNER_STUCK_TIMEOUT`` at the
+same nonce with their gas price raised by ``SIGNER_GAS_BUMP_PERCENT`` (at
+most ``SIGNER_MAX_BUMPS`` times), fills nonce gaps with zero-value
+self-transactions and resynchronises counters with the chain. Each
+replacement is recorded against the hash it replaces, so readers holding
+the original hash can find the one that was mined (``replacements()``).
+"""
+import json
+import logging
+import math
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class NonceManager:
+    """
+    Per-account nonce counters and in-flight transactions stored in Redis.
+    """
+    def __init__(self, network):
+        self.network = network
+
+    def counter_key(self, address):
+        return f'chain:{self.network}:{address}:nonce'
+
+    def inflight_key(self, address):
+        return f'chain:{self.network}:{address}:inflight'
+
+    def replacement_key(self, transaction_hash):
+        return f'chain:{self.network}:replaced:{transaction_hash}'
+
+    def allocate(self, address, chain_nonce):
+        """
+        Return the next nonce for ``address``.
+
+        ``chain_nonce`` is a callable returning the account's pending
+        transaction count, used to seed the counter the first time.
+        """
+        redis = self._redis()
+        key = self.counter_key(address)
+        if not redis.exists(key):
+            redis.set(key, chain_nonce(), nx=True)
+        nonce = redis.incr(key) - 1
+        redis.hset(self.inflight_key(address), nonce, json.dumps({'hashes': [], 'allocated_at': time.time()}))
+        return nonce
+
+    def record(self, address, nonce, transaction, transaction_hash):
+        """Store a broadcast transaction so it can be bumped or re-sent."""
+        entry = self.get(address, nonce) or {'hashes': []}
+        entry.update({
+            'transaction': {
+                key: value.hex() if isinstance(value, bytes) else value
+                for key, value in transaction.items()
+            },
+            'hashes': entry['hashes'] + [transaction_hash],
+            'sent_at': time.time(),
+        })
+        self.put(address, nonce, entry)
+
+    def put(self, address, nonce, entry):
+        self._redis().hset(self.inflight_key(address), nonce, json.dumps(entry))
+
+    def get(self, address, nonce):
+        entry = self._redis().hget(self.inflight_key(address), nonce)
+        return json.loads(entry) if entry else None
+
+    def complete(self, address, nonce):
+        self._redis().hdel(self.inflight_key(address), nonce)
+
+    def inflight(self, address):
+        """Return ``{nonce: entry}`` for the account's unmined transactions."""
+        return {
+            int(nonce): json.loads(entry)
+            for nonce, entry in self._redis().hgetall(self.inflight_key(address)).items()
+        }
+
+    def loads(self, addresses):
+        """Return the number of in-flight transactions per address."""
+        pipe = self._redis().pipeline(transaction=False)
+        for address in addresses:
+            pipe.hlen(self.inflight_key(address))
+        return dict(zip(addresses, pipe.execute()))
+
+    def current(self, address):
+        value = self._redis().get(self.counter_key(address))
+        return int(value) if value is not None else None
+
+    def reset(self, address, nonce):
+        self._redis().set(self.counter_key(address), nonce)
+
+    def replace(self, transaction_hash, replacement_hash, timeout=7 * 24 * 60 * 60):
+        """Record that ``replacement_hash`` re-sent ``transaction_hash`` at the same nonce."""
+        self._redis().set(self.replacement_key(transaction_hash), replacement_hash, ex=timeout)
+
+    def replacements(self, transaction_hashes):
+        """Return ``{transaction_hash: replacement_hash}`` for the hashes that were replaced."""
+        if not transaction_hashes:
+            return {}
+        values = self._redis().mget([self.replacement_key(h) for h in transaction_hashes])
+        return {
+            transaction_hash: value.decode() if isinstance(value, bytes) else value
+            for transaction_hash, value in zip(transaction_hashes, values)
+            if value is not None
+        }
+
+    def _redis(self):
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+
+class SignerPool:
+    """
+    Signing keys of one network with least-loaded assignment and gas bumping.
+    """
+    def __init__(self, network, web3, private_keys, chain_id=None, stuck_timeout=None,
+                 bump_percent=None, max_bumps=None, poll_interval=1):
+        self.network = network
+        self.web3 = web3
+        self.chain_id = chain_id
+        self.accounts = [web3.eth.account.from_key(key) for key in private_keys]
+        self.by_address = {account.address: account for account in self.accounts}
+        self.nonces = NonceManager(network)
+        self.stuck_timeout = stuck_timeout or getattr(settings, 'SIGNER_STUCK_TIMEOUT', 90)
+        self.bump_percent = bump_percent or getattr(settings, 'SIGNER_GAS_BUMP_PERCENT', 15)
+        self.max_bumps = max_bumps if max_bumps is not None else getattr(settings, 'SIGNER_MAX_BUMPS', 3)
+        self.poll_interval = poll_interval
+
+    @property
+    def addresses(self):
+        return list(self.by_address)
+
+    def choose(self):
+        """Return the address with the fewest transactions in flight."""
+        loads = self.nonces.loads(self.addresses)
+        start = self.nonces._redis().incr(f'chain:{self.network}:signer_rr') % len(self.accounts)
+        order = self.addresses[start:] + self.addresses[:start]
+        return min(order, key=lambda address: loads[address])
+
+    def chain_nonce(self, address, block='pending'):
+        return self.web3.eth.get_transaction_count(address, block)
+
+    def gas_price(self):
+        return self.web3.eth.gas_price
+
+    def send(self, transaction, address=None, nonce=None, on_signed=None):
+        """
+        Sign and broadcast ``transaction`` (without ``from``/``nonce``) without waiting for it.
+
+        A transaction without ``to`` is sent to the signing address itself.
+        ``on_signed(transaction_hash)`` is called after the transaction is
+        signed and tracked but before it is broadcast; if it raises, the
+        transaction is dropped unsent. Returns ``(address, nonce, transaction_hash)``.
+        """
+        address = address or self.choose()
+        transaction = {'to': address, **transaction}
+        retry_nonce = nonce is None
+        # A re-send at a fixed nonce must leave the entry as it was if it fails.
+        previous = None if retry_nonce else self.nonces.get(address, nonce)
+        for attempt in range(2):
+            if nonce is None:
+                nonce = self.nonces.allocate(address, lambda: self.chain_nonce(address))
+            signed_transaction = {
+                **transaction,
+                'nonce': nonce,
+                'chainId': self.chain_id or self.web3.eth.chain_id,
+            }
+            try:
+                signed_transaction.setdefault('gasPrice', self.gas_price())
+                if 'gas' not in signed_transaction:
+                    signed_transaction['gas'] = self.web3.eth.estimate_gas({**signed_transaction, 'from': address})
+                signed = self.by_address[address].sign_transaction(signed_transaction)
+            except Exception as exc:
+                if attempt or not retry_nonce or 'nonce' not in str(exc).lower():
+                    self._discard(address, nonce, retry_nonce, previous)
+                    raise
+                nonce = self._resync(address, nonce, exc)
+                continue
+
+            transaction_hash = signed.hash.hex()
+            self.nonces.record(address, nonce, signed_transaction, transaction_hash)
+            if on_signed is not None:
+                try:
+                    on_signed(transaction_hash)
+                except Exception:
+                    self._discard(address, nonce, retry_nonce, previous)
+                    raise
+
+            try:
+                self.web3.eth.send_raw_transaction(signed.rawTransaction)
+            except Exception as exc:
+                if self._is_known(transaction_hash):
+                    # The node accepted it even though the call failed (e.g. a timeout).
+                    return address, nonce, transaction_hash
+                if attempt or not retry_nonce or 'nonce' not in str(exc).lower():
+                    self._discard(address, nonce, retry_nonce, previous)
+                    raise
+                nonce = self._resync(address, nonce, exc)
+                continue
+            return address, nonce, transaction_hash
+
+    def _resync(self, address, nonce, exc):
+        # The counter drifted from the chain (e.g. Redis was flushed):
+        # resynchronise once so the next allocation is valid.
+        logger.warning('Nonce %s rejected for %s on %s: %s', nonce, address, self.network, exc)
+        self.nonces.complete(address, nonce)
+        self.nonces.reset(address, self.chain_nonce(address))
+        return None
+
+    def _discard(self, address, nonce, allocated, previous=None):
+        """Forget a transaction that was never broadcast; ``recover()`` fills its nonce."""
+        if allocated or previous is None:
+            self.nonces.complete(address, nonce)
+        else:
+            self.nonces.put(address, nonce, previous)
+
+    def _is_known(self, transaction_hash):
+        try:
+            return self.web3.manager.request_blocking('eth_getTransactionByHash', [transaction_hash]) is not None
+        except Exception:
+            return False
+
+    def bump(self, address, nonce):
+        """Re-send an in-flight transaction at the same nonce with a higher gas price."""
+        entry = self.nonces.get(address, nonce)
+        if not entry or 'transaction' not in entry:
+            return None
+        transaction = dict(entry['transaction'])
+        previous_hash = entry['hashes'][-1]
+        if isinstance(transaction.get('data'), str):
+            transaction['data'] = bytes.fromhex(transaction['data'])
+        transaction['gasPrice'] = max(
+            math.ceil(transaction['gasPrice'] * (100 + self.bump_percent) / 100),
+            self.gas_price(),
+        )
+        for key in ('nonce', 'chainId'):
+            transaction.pop(key, None)
+        logger.info('Bumping nonce %s of %s on %s to gas price %s', nonce, address, self.network, transaction['gasPrice'])
+        transaction_hash = self.send(transaction, address=address, nonce=nonce)[2]
+        self.nonces.replace(previous_hash, transaction_hash)
+        return transaction_hash
+
+    def receipt(self, transaction_hashes):
+        """Return the receipt of whichever hash was mined, or None."""
+        from web3.exceptions import TransactionNotFound
+
+        for transaction_hash in transaction_hashes:
+            try:
+                return self.web3.eth.get_transaction_receipt(transaction_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    def replacements(self, transaction_hashes):
+        """
+        Return ``{transaction_hash: [transaction_hash, replacement, ...]}``.
+
+        Each list follows the gas bumps of a transaction in order; one of its
+        hashes at most is ever mined.
+        """
+        chains = {transaction_hash: [transaction_hash] for transaction_hash in transaction_hashes}
+        frontier = {transaction_hash: transaction_hash for transaction_hash in transaction_hashes}
+        # Bounded by the bump limit; the margin covers bumps from an earlier limit.
+        for _ in range(self.max_bumps + 2):
+            replaced = self.nonces.replacements(list(frontier.values()))
+            if not replaced:
+                break
+            frontier = {
+                original: replaced[current]
+                for original, current in frontier.items()
+                if current in replaced
+            }
+            for original, replacement in frontier.items():
+                chains[original].append(replacement)
+        return chains
+
+    def recover(self):
+        """
+        Repair nonce state for every key after crashes.
+
+        Returns a dict with the number of entries ``completed``, ``bumped``
+        and ``filled``.
+        """
+        counts = {'completed': 0, 'bumped': 0, 'filled': 0}
+        now = time.time()
+        for address in self.addresses:
+            mined = self.chain_nonce(address, 'latest')
+            inflight = self.nonces.inflight(address)
+            for nonce in [nonce for nonce in inflight if nonce < mined]:
+                self.nonces.complete(address, nonce)
+                del inflight[nonce]
+                counts['completed'] += 1
+
+            counter = self.nonces.current(address)
+            if counter is None or counter < mined:
+                self.nonces.reset(address, max(mined, self.chain_nonce(address)))
+                counter = self.nonces.current(address)
+
+            # Nonces below the pending count are known to the node; the rest
+            # are gaps unless a worker is still about to broadcast them.
+            pending = self.chain_nonce(address)
+            for nonce in range(mined, counter):
+                entry = inflight.get(nonce)
+                if entry and 'transaction' in entry:
+                    if now - entry['sent_at'] < self.stuck_timeout or self.receipt(entry['hashes']) is not None:
+                        continue
+                    if len(entry['hashes']) > self.max_bumps:
+                        logger.warning(
+                            'Nonce %s of %s on %s is still unmined after %d gas bumps',
+                            nonce, address, self.network, self.max_bumps
+                        )
+                        continue
+                    try:
+                        self.bump(address, nonce)
+                    except Exception as exc:
+                        # Usually the transaction was mined meanwhile.
+                        logger.warning('Gas bump of nonce %s of %s on %s failed: %s', nonce, address, self.network, exc)
+                        continue
+                    counts['bumped'] += 1
+                elif nonce >= pending and (entry is None or now - entry['allocated_at'] >= self.stuck_timeout):
+                    # The nonce was allocated but never broadcast: fill the gap
+                    # so later transactions of this key can be mined.
+                    try:
+                        self.send({'to': address, 'value': 0, 'gas': 21000}, address=address, nonce=nonce)
+                    except Exception as exc:
+                        logger.warning('Filling nonce %s of %s on %s failed: %s', nonce, address, self.network, exc)
+                        continue
+                    counts['filled'] += 1
+        return counts
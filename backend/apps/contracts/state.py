@@ -0,0 +1,74 @@
+"""
+Guarded bulk status transitions for smart contracts.
+
+``TRANSITIONS`` is the contract status state machine; every bulk change of
+status is checked against it. ``QuerySet.update`` and ``bulk_update`` do not
+send model signals, so helpers that change many contracts at once record the
+matching UserStats deltas here.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.models import UserStats
+
+TRANSITIONS = {
+    'draft': {'pending', 'cancelled'},
+    'pending': {'processing', 'cancelled'},
+    'processing': {'deployed', 'pending', 'failed'},
+    'deployed': {'verified'},
+    'failed': {'pending'},
+    'verified': set(),
+    'cancelled': set(),
+}
+
+
+class InvalidTransition(ValueError):
+    """Raised for a status change the state machine does not allow."""
+
+
+def check_transition(from_status, to_status):
+    if to_status not in TRANSITIONS.get(from_status, ()):
+        raise InvalidTransition(f'Contracts cannot move from {from_status} to {to_status}')
+
+
+def record_transitions(user_ids, from_status, to_status):
+    """Move one contract per entry of ``user_ids`` between status counters."""
+    now = timezone.now()
+    for user_id, count in Counter(user_ids).items():
+        deltas = {}
+        if from_status:
+            deltas[f'contracts_{from_status}'] = -count
+        if to_status:
+            deltas[f'contracts_{to_status}'] = deltas.get(f'contracts_{to_status}', 0) + count
+        values = {'last_deployment_at': now} if to_status == 'deployed' else {}
+        UserStats.apply_deltas(user_id, deltas, **values)
+
+
+def transition(queryset, from_status, to_status, limit=None, **values):
+    """
+    Move the live contracts of ``queryset`` currently in ``from_status`` to ``to_status``.
+
+    Rows are locked first, skipping rows locked by others, so concurrent
+    callers never move the same contract twice. At most ``limit`` contracts
+    are moved. Returns the primary keys that were moved.
+    """
+    from .models import SmartContract
+
+    check_transition(from_status, to_status)
+    with transaction.atomic():
+        rows = (
+            queryset.filter(status=from_status, is_deleted=False)
+            .select_for_update(skip_locked=True)
+            .values_list('pk', 'user_id')
+        )
+        rows = list(rows[:limit] if limit else rows)
+        if not rows:
+            return []
+        pks = [pk for pk, _ in rows]
+        SmartContract.objects.filter(pk__in=pks).update(
+            status=to_status, updated_at=timezone.now(), **values
+        )
+        record_transitions([user_id for _, user_id in rows], from_status, to_status)
+    return pks
@@ -0,0 +1,129 @@
+"""
+Content-addressed storage for contract documents.
+
+Uploads are streamed to a temporary file in fixed-size chunks while their
+SHA-256 digest is computed, then moved to a path derived from the digest.
+Identical documents, whoever uploads them, share a single blob on disk, so a
+blob is only deleted once no row references it any more.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+DIGEST_RE = re.compile(r'(?:^|/)([0-9a-f]{64})(?:\.[^/]*)?$')
+
+
+def hash_file(file, chunk_size=CHUNK_SIZE):
+    """Return the SHA-256 hex digest of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    for chunk in (file if isinstance(file, File) else File(file)).chunks(chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def digest_from_name(name):
+    """Return the SHA-256 digest encoded in a stored blob name, or ''."""
+    match = DIGEST_RE.search(name or '')
+    return match.group(1) if match else ''
+
+
+def blob_name(directory, digest, extension):
+    return os.path.join(directory, digest[:2], f'{digest}{extension.lower()}')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming every saved file after its SHA-256 digest.
+
+    The requested name only contributes its directory and extension; saving
+    content that is already stored returns the existing blob's name. Deleting
+    a name that any file field using this storage still points at does
+    nothing, so rows must be detached from a blob before it is deleted.
+    """
+    chunk_size = CHUNK_SIZE
+
+    def delete(self, name):
+        if self.is_referenced(name):
+            logger.info('Keeping %s: still referenced', name)
+            return
+        super().delete(name)
+
+    def is_referenced(self, name):
+        """Return whether any row's file field stored in this storage points at ``name``."""
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if getattr(field, 'storage', None) is self and field.concrete:
+                    if model._base_manager.filter(**{field.attname: name}).exists():
+                        return True
+        return False
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content, so an existing name is a duplicate
+        # rather than a collision.
+        return name
+
+    def _save(self, name, content):
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1]
+        target_dir = self.path(directory)
+        os.makedirs(target_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=target_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    temp.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return self._commit(temp_path, directory, digest.hexdigest(), extension)
+
+    def save_local_file(self, path, name, digest=None):
+        """
+        Move a file already on this file system into storage.
+
+        The file is hashed in chunks unless ``digest`` is given, then renamed
+        into place without copying. Returns the stored name.
+        """
+        directory, basename = os.path.split(name)
+        if digest is None:
+            with open(path, 'rb') as local:
+                digest = hash_file(local, self.chunk_size)
+        return self._commit(path, directory, digest, os.path.splitext(basename)[1])
+
+    def _commit(self, temp_path, directory, digest, extension):
+        stored_name = blob_name(directory, digest, extension)
+        full_path = self.path(stored_name)
+        try:
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                # Same file system, so this is an atomic rename; a concurrent
+                # upload of the same content simply replaces identical bytes.
+                file_move_safe(temp_path, full_path, allow_overwrite=True)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return stored_name.replace('\\', '/')
+
+
+document_storage = ContentAddressedStorage()
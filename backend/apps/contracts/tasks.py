@@ -0,0 +1,80 @@
+"""
+Celery tasks for the contracts app.
+"""
+from celery import shared_task
+
+
+@shared_task
+def cleanup_document_uploads():
+    """Abort idle resumable uploads and remove old upload sessions."""
+    from .uploads import cleanup_stale_uploads
+    return cleanup_stale_uploads()
+
+
+@shared_task
+def dispatch_deployments():
+    """Queue deployment batches for every network with contracts due."""
+    from .deployment import dispatch_deployments as dispatch
+    return dispatch()
+
+
+@shared_task
+def deploy_network(network):
+    """Deploy one batch of a network's due contracts within its concurrency limit."""
+    from django.conf import settings
+    from .deployment import deploy_batch, deployment_slots
+
+    batch_size = getattr(settings, 'ANCHOR_BATCH_SIZE', 5000)
+    with deployment_slots.slot(network) as token:
+        if token is None:
+            # Every slot for the network is busy; their tasks keep draining it.
+            return 0
+        count = deploy_batch(network, batch_size)
+    if count >= batch_size:
+        deploy_network.delay(network)
+    return count
+
+
+@shared_task
+def recover_signer_nonces():
+    """Drop mined, bump stuck and fill missing nonces of every signing key."""
+    from django.conf import settings
+    from .blockchain import ChainError, get_chain_client
+
+    recovered = {}
+    for network in getattr(settings, 'BLOCKCHAIN_NETWORKS', {}):
+        try:
+            signers = getattr(get_chain_client(network), 'signers', None)
+        except ChainError:
+            continue
+        if signers is not None:
+            recovered[network] = signers.recover()
+    return recovered
+
+
+@shared_task
+def track_confirmations():
+    """Confirm anchoring transactions with one batch of receipt lookups per network."""
+    from .confirmations import track_confirmations as track
+    return track()
+
+
+@shared_task
+def refresh_gas_prices():
+    """Sample and cache the gas prices of every network."""
+    from .gas import refresh_gas_prices as refresh
+    return {network: entry['standard'] for network, entry in refresh().items()}
+
+
+@shared_task(ignore_result=True)
+def refresh_gas_price(network):
+    """Re-sample one network whose cached gas prices went stale."""
+    from .gas import refresh_gas_prices as refresh
+    refresh([network])
+
+
+@shared_task
+def reprice_open_contracts(network=None, speed='standard'):
+    """Reprice every contract not yet handed to the chain from the cached gas prices."""
+    from .pricing import reprice_open_contracts as reprice
+    return reprice(network=network, speed=speed)
@@ -0,0 +1,47 @@
+"""
+Test factories and settings shared by the contracts tests.
+"""
+import hashlib
+
+import factory
+
+from apps.accounts.models import User
+from apps.contracts.models import ContractCategory, SmartContract
+
+# The pipeline caches block heads and lookups; tests must not need Redis for that.
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def document_hash(n):
+    return hashlib.sha256(f'document {n}'.encode()).hexdigest()
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = User
+
+    email = factory.Sequence(lambda n: f'user{n}@example.com')
+    first_name = 'Test'
+    last_name = 'User'
+
+
+class ContractCategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ContractCategory
+        django_get_or_create = ('name',)
+
+    name = 'General'
+    description = 'General contracts'
+
+
+class SmartContractFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = SmartContract
+
+    title = factory.Sequence(lambda n: f'Contract {n}')
+    description = 'Test contract'
+    category = factory.SubFactory(ContractCategoryFactory)
+    user = factory.SubFactory(UserFactory)
+    blockchain_network = 'ethereum_sepolia'
+    status = 'pending'
+    document_hash = factory.Sequence(document_hash)
@@ -0,0 +1,162 @@
+import time
+from unittest import mock
+
+import fakeredis
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.contracts import blockchain
+from apps.contracts.anchoring import verify_anchor
+from apps.contracts.blockchain import Web3ChainClient
+from apps.contracts.confirmations import track_network
+from apps.contracts.deployment import deploy_batch
+from apps.contracts.merkle import verify_proof
+from apps.contracts.models import ContractDeploymentLog, SmartContract
+
+from .factories import LOCAL_CACHES, SmartContractFactory, UserFactory
+
+NETWORK = 'ethereum_sepolia'
+PRIVATE_KEYS = ['0x' + '%064x' % (i + 1) for i in range(2)]
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES,
+    BLOCKCHAIN_CLIENT='eth_tester',
+    BLOCKCHAIN_NETWORKS={NETWORK: {'confirmations': 3}},
+    BLOCKCHAIN_PRIVATE_KEYS=[],
+    BLOCKCHAIN_PRIVATE_KEY='',
+)
+class EthTesterAnchoringTests(TestCase):
+    """
+    Anchoring through the in-process EVM, from the node's unlocked account.
+    """
+    def setUp(self):
+        cache.clear()
+        blockchain._clients.clear()
+        self.addCleanup(blockchain._clients.clear)
+        self.user = UserFactory()
+        self.contracts = SmartContractFactory.create_batch(5, user=self.user, blockchain_network=NETWORK)
+        self.client = blockchain.get_chain_client(NETWORK)
+
+    def anchored(self):
+        return list(SmartContract.objects.filter(pk__in=[contract.pk for contract in self.contracts]))
+
+    def test_batch_is_anchored_in_one_transaction(self):
+        self.assertEqual(deploy_batch(NETWORK), 5)
+
+        contracts = self.anchored()
+        transaction_hashes = {contract.transaction_hash for contract in contracts}
+        self.assertEqual(len(transaction_hashes), 1)
+        self.assertEqual({contract.status for contract in contracts}, {'processing'})
+
+        root = contracts[0].contract_metadata['anchor']['root']
+        self.assertEqual(self.client.get_anchored_root(transaction_hashes.pop()), root)
+        for contract in contracts:
+            anchor = contract.contract_metadata['anchor']
+            self.assertEqual(anchor['root'], root)
+            self.assertEqual(anchor['leaf_count'], 5)
+            self.assertTrue(verify_proof(contract.document_hash, anchor['proof'], root))
+            self.assertTrue(verify_anchor(contract, check_chain=True))
+        self.assertEqual(
+            ContractDeploymentLog.objects.filter(contract__in=contracts, status='submitted').count(), 5
+        )
+
+    def test_tampered_proof_does_not_verify(self):
+        deploy_batch(NETWORK)
+        contract = self.anchored()[0]
+        contract.contract_metadata['anchor']['proof'].reverse()
+        contract.contract_metadata['anchor']['proof'][0] = '00' * 32
+        self.assertFalse(verify_anchor(contract))
+
+    def test_anchored_batch_is_deployed_once_confirmed(self):
+        deploy_batch(NETWORK)
+
+        counts = track_network(NETWORK)
+        self.assertEqual(counts['moved'], 5)
+        self.assertEqual({contract.status for contract in self.anchored()}, {'processing'})
+
+        self.client.web3.testing.mine(2)
+        self.assertEqual(track_network(NETWORK)['deployed'], 5)
+
+        contracts = self.anchored()
+        receipt = self.client.web3.eth.get_transaction_receipt(contracts[0].transaction_hash)
+        for contract in contracts:
+            self.assertEqual(contract.status, 'deployed')
+            self.assertEqual(contract.block_number, receipt['blockNumber'])
+            self.assertEqual(contract.gas_used, receipt['gasUsed'] // 5)
+            self.assertTrue(verify_anchor(contract, check_chain=True))
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES,
+    BLOCKCHAIN_CLIENT='eth_tester',
+    BLOCKCHAIN_NETWORKS={NETWORK: {'confirmations': 3, 'private_keys': PRIVATE_KEYS}},
+    DEPLOYMENT_MAX_RETRIES=5,
+)
+class SignerPoolAnchoringTests(TestCase):
+    """
+    Anchoring through the signer pool, whose nonces and replacements live in Redis.
+    """
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('django_redis.get_redis_connection', return_value=fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        blockchain._clients.clear()
+        self.addCleanup(blockchain._clients.clear)
+
+        self.user = UserFactory()
+        self.client = blockchain.get_chain_client(NETWORK)
+        self.assertIsInstance(self.client, Web3ChainClient)
+        self.signers = self.client.signers
+
+    def submit(self, count=3):
+        contracts = SmartContractFactory.create_batch(count, user=self.user, blockchain_network=NETWORK)
+        deploy_batch(NETWORK)
+        return SmartContract.objects.filter(pk__in=[contract.pk for contract in contracts])
+
+    def test_hash_is_recorded_before_broadcast(self):
+        recorded = []
+        send_raw_transaction = self.client.web3.eth.send_raw_transaction
+
+        def broadcast(raw_transaction):
+            recorded.extend(SmartContract.objects.values_list('transaction_hash', flat=True))
+            return send_raw_transaction(raw_transaction)
+
+        with mock.patch.object(self.client.web3.eth, 'send_raw_transaction', side_effect=broadcast):
+            contracts = self.submit()
+
+        transaction_hash = contracts.first().transaction_hash
+        self.assertEqual(set(recorded), {transaction_hash})
+        self.assertIsNotNone(self.client.get_receipts([transaction_hash])[transaction_hash])
+
+    def test_rejected_broadcast_is_retried(self):
+        with mock.patch.object(
+            self.client.web3.eth, 'send_raw_transaction', side_effect=ValueError('insufficient funds')
+        ):
+            contracts = self.submit()
+        self.assertEqual(set(contracts.values_list('status', 'transaction_hash', 'retry_count')), {('pending', '', 1)})
+
+    def test_lost_broadcast_is_bumped_and_the_replacement_deployed(self):
+        with mock.patch.object(self.client.web3.eth, 'send_raw_transaction', return_value=b''):
+            contracts = self.submit()
+        original = contracts.first().transaction_hash
+        self.assertEqual(self.client.get_receipts([original]), {original: None})
+        self.assertEqual(track_network(NETWORK)['unmined'], 0)
+
+        self.signers.stuck_timeout = 0.01
+        time.sleep(0.02)
+        self.signers.recover()
+
+        receipt = self.client.get_receipts([original])[original]
+        self.assertIsNotNone(receipt)
+        replacement = receipt['transaction_hash']
+        self.assertNotEqual(replacement, original)
+
+        self.client.web3.testing.mine(3)
+        self.assertEqual(track_network(NETWORK)['deployed'], 3)
+        for contract in contracts:
+            self.assertEqual(contract.status, 'deployed')
+            self.assertEqual(contract.transaction_hash, replacement)
+            self.assertEqual(contract.contract_metadata['anchor']['transaction_hash'], replacement)
+            self.assertTrue(verify_anchor(contract, check_chain=True))
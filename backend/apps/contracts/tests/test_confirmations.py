@@ -0,0 +1,190 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.models import UserStats
+from apps.contracts.confirmations import track_confirmations, track_network
+from apps.contracts.models import ContractDeploymentLog, SmartContract
+
+from .factories import LOCAL_CACHES, SmartContractFactory, UserFactory
+
+NETWORK = 'ethereum_sepolia'
+
+
+def receipt(transaction_hash, block_number, status=1, gas_used=30000):
+    return {
+        'transaction_hash': transaction_hash,
+        'block_number': block_number,
+        'gas_used': gas_used,
+        'gas_price': 10 ** 9,
+        'contract_address': None,
+        'status': status,
+    }
+
+
+class FakeChainClient:
+    """
+    Chain client whose head, receipts and known transactions are set by the test.
+    """
+    def __init__(self):
+        self.head = 100
+        self.receipts = {}
+        self.known = set()
+        self.receipt_requests = []
+
+    def block_number(self):
+        return self.head
+
+    def get_receipts(self, transaction_hashes):
+        self.receipt_requests.append(sorted(transaction_hashes))
+        return {transaction_hash: self.receipts.get(transaction_hash) for transaction_hash in transaction_hashes}
+
+    def get_known_transactions(self, transaction_hashes):
+        return {transaction_hash for transaction_hash in transaction_hashes if transaction_hash in self.known}
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES,
+    BLOCKCHAIN_NETWORKS={NETWORK: {'confirmations': 3}},
+    DEPLOYMENT_PROCESSING_TIMEOUT=900,
+    DEPLOYMENT_MAX_RETRIES=5,
+)
+class TrackNetworkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = FakeChainClient()
+        patcher = mock.patch('apps.contracts.confirmations.get_chain_client', return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = UserFactory()
+
+    def submitted(self, count, transaction_hash, **kwargs):
+        contracts = SmartContractFactory.create_batch(
+            count, user=self.user, status='processing', transaction_hash=transaction_hash,
+            blockchain_network=NETWORK, **kwargs
+        )
+        for contract in contracts:
+            contract.contract_metadata = {'anchor': {'transaction_hash': transaction_hash, 'root': 'ab' * 32}}
+        SmartContract.objects.bulk_update(contracts, ['contract_metadata'])
+        return SmartContract.objects.filter(pk__in=[contract.pk for contract in contracts])
+
+    def age(self, contracts, seconds):
+        contracts.update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_receipts_are_fetched_once_per_transaction(self):
+        self.submitted(3, '0xaaa')
+        self.submitted(2, '0xbbb')
+        track_network(NETWORK)
+        self.assertEqual(self.client.receipt_requests, [['0xaaa', '0xbbb']])
+
+    def test_nothing_is_checked_until_a_new_block(self):
+        self.submitted(1, '0xaaa')
+        self.assertIsNotNone(track_network(NETWORK))
+        self.assertIsNone(track_network(NETWORK))
+        self.client.head += 1
+        self.assertIsNotNone(track_network(NETWORK))
+        self.assertEqual(len(self.client.receipt_requests), 2)
+
+    def test_shallow_receipt_records_the_block_in_one_update(self):
+        first = self.submitted(3, '0xaaa')
+        second = self.submitted(2, '0xbbb')
+        self.client.receipts = {'0xaaa': receipt('0xaaa', 99), '0xbbb': receipt('0xbbb', 100)}
+
+        # The processing hashes, then one UPDATE for every transaction.
+        with self.assertNumQueries(2):
+            counts = track_network(NETWORK)
+
+        self.assertEqual(counts['moved'], 5)
+        self.assertEqual(set(first.values_list('status', 'block_number')), {('processing', 99)})
+        self.assertEqual(set(second.values_list('status', 'block_number')), {('processing', 100)})
+
+        self.client.head += 1
+        self.assertEqual(track_network(NETWORK)['moved'], 0)
+
+    def test_reorged_receipt_moves_the_block(self):
+        contracts = self.submitted(2, '0xaaa')
+        contracts.update(block_number=98)
+        self.client.receipts = {'0xaaa': receipt('0xaaa', 99)}
+        self.assertEqual(track_network(NETWORK)['moved'], 2)
+        self.assertEqual(set(contracts.values_list('block_number', flat=True)), {99})
+
+    def test_lost_block_clears_it(self):
+        contracts = self.submitted(2, '0xaaa')
+        contracts.update(block_number=98)
+        self.assertEqual(track_network(NETWORK)['unmined'], 2)
+        self.assertEqual(set(contracts.values_list('status', 'block_number')), {('processing', None)})
+
+    def test_confirmed_receipt_deploys_and_shares_gas(self):
+        contracts = self.submitted(4, '0xaaa')
+        self.client.receipts = {'0xaaa': receipt('0xaaa', 98, gas_used=40000)}
+
+        self.assertEqual(track_network(NETWORK)['deployed'], 4)
+
+        for contract in contracts:
+            self.assertEqual(contract.status, 'deployed')
+            self.assertEqual(contract.block_number, 98)
+            self.assertEqual(contract.gas_used, 10000)
+            self.assertEqual(contract.contract_metadata['anchor']['block_number'], 98)
+            self.assertEqual(contract.contract_metadata['anchor']['confirmed_at_block'], 100)
+        self.assertEqual(
+            ContractDeploymentLog.objects.filter(contract__in=contracts, status='deployed').count(), 4
+        )
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.contracts_processing, stats.contracts_deployed), (0, 4))
+
+    def test_replacement_hash_is_adopted(self):
+        contracts = self.submitted(2, '0xaaa')
+        self.client.receipts = {'0xaaa': receipt('0xbump', 99)}
+
+        self.assertEqual(track_network(NETWORK)['moved'], 2)
+        self.assertEqual(set(contracts.values_list('transaction_hash', 'block_number')), {('0xbump', 99)})
+
+        self.client.head = 101
+        self.client.receipts = {'0xbump': receipt('0xbump', 99)}
+        self.assertEqual(track_network(NETWORK)['deployed'], 2)
+        for contract in contracts:
+            self.assertEqual(contract.transaction_hash, '0xbump')
+            self.assertEqual(contract.contract_metadata['anchor']['transaction_hash'], '0xbump')
+
+    def test_replacement_confirmed_directly_is_adopted(self):
+        contracts = self.submitted(2, '0xaaa')
+        self.client.receipts = {'0xaaa': receipt('0xbump', 90)}
+        self.assertEqual(track_network(NETWORK)['deployed'], 2)
+        self.assertEqual(set(contracts.values_list('status', 'transaction_hash')), {('deployed', '0xbump')})
+
+    def test_reverted_transaction_is_retried(self):
+        contracts = self.submitted(2, '0xaaa')
+        self.client.receipts = {'0xaaa': receipt('0xaaa', 99, status=0)}
+        self.assertEqual(track_network(NETWORK)['retried'], 2)
+        self.assertEqual(set(contracts.values_list('status', 'transaction_hash', 'retry_count')), {('pending', '', 1)})
+
+    def test_pending_transaction_keeps_waiting(self):
+        contracts = self.submitted(2, '0xaaa')
+        self.age(contracts, 3600)
+        self.client.known = {'0xaaa'}
+        self.assertEqual(track_network(NETWORK)['retried'], 0)
+        self.assertEqual(set(contracts.values_list('status', flat=True)), {'processing'})
+
+    def test_recent_unknown_transaction_keeps_waiting(self):
+        contracts = self.submitted(2, '0xaaa')
+        self.assertEqual(track_network(NETWORK)['retried'], 0)
+        self.assertEqual(set(contracts.values_list('status', flat=True)), {'processing'})
+
+    def test_dropped_transaction_is_retried_after_the_timeout(self):
+        dropped = self.submitted(2, '0xaaa')
+        pending = self.submitted(1, '0xbbb')
+        self.age(dropped, 3600)
+        self.age(pending, 3600)
+        self.client.known = {'0xbbb'}
+
+        self.assertEqual(track_network(NETWORK)['retried'], 2)
+        self.assertEqual(set(dropped.values_list('status', 'retry_count')), {('pending', 1)})
+        self.assertEqual(set(pending.values_list('status', flat=True)), {'processing'})
+
+    def test_track_confirmations_covers_networks_in_flight(self):
+        self.submitted(1, '0xaaa')
+        self.client.receipts = {'0xaaa': receipt('0xaaa', 90)}
+        self.assertEqual(track_confirmations(), {NETWORK: {'deployed': 1, 'moved': 0, 'unmined': 0, 'retried': 0}})
@@ -0,0 +1,204 @@
+from datetime import timedelta
+from unittest import mock
+
+import fakeredis
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.models import UserStats
+from apps.contracts.blockchain import ChainError
+from apps.contracts.deployment import (
+    NetworkSemaphore, claim_pending, deploy_batch, dispatch_deployments, recover_stale_deployments,
+    retry_delay, retry_or_fail,
+)
+from apps.contracts.models import ContractDeploymentLog, SmartContract
+from apps.contracts.state import InvalidTransition, check_transition, transition
+
+from .factories import LOCAL_CACHES, SmartContractFactory, UserFactory
+
+
+class TransitionTests(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+
+    def stats(self):
+        return UserStats.objects.get(user=self.user)
+
+    def test_allowed_and_forbidden_transitions(self):
+        check_transition('pending', 'processing')
+        check_transition('processing', 'pending')
+        check_transition('failed', 'pending')
+        for from_status, to_status in [
+            ('draft', 'deployed'), ('pending', 'deployed'), ('deployed', 'pending'),
+            ('verified', 'pending'), ('cancelled', 'pending'), ('processing', 'cancelled'),
+        ]:
+            with self.subTest(from_status=from_status, to_status=to_status):
+                with self.assertRaises(InvalidTransition):
+                    check_transition(from_status, to_status)
+
+    def test_transition_rejects_forbidden_change_without_writing(self):
+        contract = SmartContractFactory(user=self.user)
+        with self.assertRaises(InvalidTransition):
+            transition(SmartContract.objects.all(), 'pending', 'deployed')
+        contract.refresh_from_db()
+        self.assertEqual(contract.status, 'pending')
+
+    def test_transition_moves_only_live_contracts_in_the_source_status(self):
+        pending = SmartContractFactory.create_batch(3, user=self.user)
+        draft = SmartContractFactory(user=self.user, status='draft')
+        deleted = SmartContractFactory(user=self.user)
+        SmartContract.all_objects.filter(pk=deleted.pk).update(is_deleted=True)
+
+        moved = transition(SmartContract.all_objects.all(), 'pending', 'processing')
+
+        self.assertCountEqual(moved, [contract.pk for contract in pending])
+        self.assertEqual(SmartContract.objects.get(pk=draft.pk).status, 'draft')
+        self.assertEqual(SmartContract.all_objects.get(pk=deleted.pk).status, 'pending')
+
+    def test_transition_respects_limit_and_updates_stats(self):
+        SmartContractFactory.create_batch(5, user=self.user)
+        self.assertEqual(self.stats().contracts_pending, 5)
+
+        moved = transition(SmartContract.objects.all(), 'pending', 'processing', limit=2)
+
+        self.assertEqual(len(moved), 2)
+        stats = self.stats()
+        self.assertEqual(stats.contracts_pending, 3)
+        self.assertEqual(stats.contracts_processing, 2)
+        self.assertEqual(stats.contracts_total, 5)
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES,
+    DEPLOYMENT_MAX_RETRIES=2,
+    DEPLOYMENT_RETRY_BACKOFF=60,
+    DEPLOYMENT_RETRY_BACKOFF_MAX=600,
+    DEPLOYMENT_PROCESSING_TIMEOUT=900,
+)
+class DeploymentPipelineTests(TestCase):
+    network = 'ethereum_sepolia'
+
+    def setUp(self):
+        self.user = UserFactory()
+
+    def test_retry_delay_grows_exponentially_up_to_the_maximum(self):
+        self.assertEqual([retry_delay(n) for n in range(5)], [60, 120, 240, 480, 600])
+
+    def test_claim_pending_skips_contracts_not_due(self):
+        due = SmartContractFactory(user=self.user)
+        retried = SmartContractFactory(user=self.user, next_attempt_at=timezone.now() - timedelta(seconds=1))
+        SmartContractFactory(user=self.user, next_attempt_at=timezone.now() + timedelta(hours=1))
+        SmartContractFactory(user=self.user, document_hash='')
+        SmartContractFactory(user=self.user, blockchain_network='bsc_testnet')
+
+        claimed = claim_pending(self.network, 10)
+
+        self.assertCountEqual(claimed, [due.pk, retried.pk])
+        self.assertEqual(
+            set(SmartContract.objects.filter(pk__in=claimed).values_list('status', flat=True)),
+            {'processing'},
+        )
+
+    def test_claim_pending_takes_oldest_first(self):
+        contracts = SmartContractFactory.create_batch(4, user=self.user)
+        self.assertEqual(claim_pending(self.network, 2), [contract.pk for contract in contracts[:2]])
+
+    def test_retry_or_fail_backs_off_then_fails(self):
+        contract = SmartContractFactory(user=self.user)
+        error = ChainError('node unavailable')
+
+        for attempt in range(2):
+            SmartContract.objects.filter(pk=contract.pk).update(status='processing', transaction_hash='0xabc')
+            before = timezone.now()
+            self.assertEqual(retry_or_fail([contract.pk], error), {'retried': 1, 'failed': 0})
+            contract.refresh_from_db()
+            self.assertEqual(contract.status, 'pending')
+            self.assertEqual(contract.retry_count, attempt + 1)
+            self.assertEqual(contract.transaction_hash, '')
+            self.assertEqual(contract.error_message, 'node unavailable')
+            self.assertGreaterEqual(contract.next_attempt_at, before + timedelta(seconds=retry_delay(attempt)))
+
+        SmartContract.objects.filter(pk=contract.pk).update(status='processing')
+        self.assertEqual(retry_or_fail([contract.pk], error), {'retried': 0, 'failed': 1})
+        contract.refresh_from_db()
+        self.assertEqual(contract.status, 'failed')
+        self.assertIsNone(contract.next_attempt_at)
+        self.assertEqual(
+            list(ContractDeploymentLog.objects.filter(contract=contract).order_by('deployment_attempt')
+                 .values_list('status', flat=True)),
+            ['retrying', 'retrying', 'failed'],
+        )
+
+    def test_retry_or_fail_ignores_contracts_no_longer_processing(self):
+        contract = SmartContractFactory(user=self.user, status='pending')
+        self.assertEqual(retry_or_fail([contract.pk], ChainError('late')), {'retried': 0, 'failed': 0})
+        contract.refresh_from_db()
+        self.assertEqual(contract.retry_count, 0)
+
+    def test_deploy_batch_returns_unpublished_contracts_to_pending(self):
+        contracts = SmartContractFactory.create_batch(3, user=self.user)
+        with mock.patch('apps.contracts.deployment.anchor_contracts', side_effect=ChainError('rejected')):
+            self.assertEqual(deploy_batch(self.network), 3)
+        self.assertEqual(
+            set(SmartContract.objects.filter(pk__in=[c.pk for c in contracts]).values_list('status', 'retry_count')),
+            {('pending', 1)},
+        )
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual((stats.contracts_pending, stats.contracts_processing), (3, 0))
+
+    def test_deploy_batch_without_due_contracts_does_nothing(self):
+        with mock.patch('apps.contracts.deployment.anchor_contracts') as anchor:
+            self.assertEqual(deploy_batch(self.network), 0)
+        anchor.assert_not_called()
+
+    def test_recover_stale_deployments_only_retries_unpublished_contracts(self):
+        stale = SmartContractFactory(user=self.user, status='processing')
+        published = SmartContractFactory(user=self.user, status='processing', transaction_hash='0xabc')
+        fresh = SmartContractFactory(user=self.user, status='processing')
+        SmartContract.objects.filter(pk__in=[stale.pk, published.pk]).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(recover_stale_deployments(), {'retried': 1, 'failed': 0})
+        statuses = dict(SmartContract.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[stale.pk], 'pending')
+        self.assertEqual(statuses[published.pk], 'processing')
+        self.assertEqual(statuses[fresh.pk], 'processing')
+
+    @override_settings(ANCHOR_BATCH_SIZE=2, DEPLOYMENT_CONCURRENCY=2, BLOCKCHAIN_PRIVATE_KEYS=[], BLOCKCHAIN_PRIVATE_KEY='')
+    def test_dispatch_queues_one_task_per_batch_up_to_the_slot_limit(self):
+        SmartContractFactory.create_batch(7, user=self.user)
+        SmartContractFactory(user=self.user, blockchain_network='bsc_testnet')
+        with mock.patch('apps.contracts.tasks.deploy_network.delay') as delay:
+            result = dispatch_deployments()
+        self.assertEqual(result['queued'], {self.network: 2, 'bsc_testnet': 1})
+        self.assertEqual(delay.call_count, 3)
+
+
+@override_settings(BLOCKCHAIN_PRIVATE_KEYS=[], BLOCKCHAIN_PRIVATE_KEY='')
+class NetworkSemaphoreTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('django_redis.get_redis_connection', return_value=fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.slots = NetworkSemaphore(limit=2, timeout=60)
+
+    def test_slots_are_limited_and_released(self):
+        first = self.slots.acquire('ethereum_sepolia')
+        second = self.slots.acquire('ethereum_sepolia')
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertIsNone(self.slots.acquire('ethereum_sepolia'))
+        self.assertIsNotNone(self.slots.acquire('bsc_testnet'))
+
+        self.slots.release('ethereum_sepolia', first)
+        with self.slots.slot('ethereum_sepolia') as token:
+            self.assertIsNotNone(token)
+        self.assertIsNotNone(self.slots.acquire('ethereum_sepolia'))
+
+    def test_expired_leases_are_reclaimed(self):
+        with mock.patch('apps.contracts.deployment.time.time', return_value=1000):
+            self.slots.acquire('ethereum_sepolia')
+            self.slots.acquire('ethereum_sepolia')
+        with mock.patch('apps.contracts.deployment.time.time', return_value=1061):
+            self.assertIsNotNone(self.slots.acquire('ethereum_sepolia'))
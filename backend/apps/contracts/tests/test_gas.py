@@ -0,0 +1,118 @@
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.contracts.blockchain import ANCHOR_GAS, ChainError
+from apps.contracts.gas import GasOracle, fee_from_price
+
+from .factories import LOCAL_CACHES
+
+NETWORK = 'ethereum_sepolia'
+GWEI = 10 ** 9
+
+
+class FakeGasClient:
+    """
+    Chain client answering fee history and gas price from fixed values.
+    """
+    def __init__(self, fee_history=True):
+        self.has_fee_history = fee_history
+
+    def fee_history(self, block_count, percentiles):
+        if not self.has_fee_history:
+            raise ChainError('eth_feeHistory is not supported')
+        return {
+            'base_fee': 20 * GWEI,
+            'rewards': [[1 * GWEI, 2 * GWEI, 5 * GWEI]] * 2 + [[3 * GWEI, 4 * GWEI, 9 * GWEI]],
+        }
+
+    def gas_price(self):
+        return 30 * GWEI
+
+
+def entry(age=0, price=25 * GWEI):
+    return {
+        'network': NETWORK, 'source': 'gas_price', 'base_fee': None,
+        'slow': price, 'standard': price, 'fast': price, 'sampled_at': time.time() - age,
+    }
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class GasOracleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.oracle = GasOracle(ttl=30, stale_ttl=300, blocks=3)
+        self.client = FakeGasClient()
+        for patcher in (
+            mock.patch('apps.contracts.gas.get_chain_client', side_effect=lambda network: self.client),
+            mock.patch('apps.contracts.tasks.refresh_gas_price.delay'),
+        ):
+            self.addCleanup(patcher.stop)
+            patcher.start()
+        from apps.contracts.tasks import refresh_gas_price
+        self.delay = refresh_gas_price.delay
+
+    def test_fee_history_gives_base_fee_plus_median_tips(self):
+        sampled = self.oracle.refresh(NETWORK)
+        self.assertEqual(sampled['source'], 'fee_history')
+        self.assertEqual(
+            (sampled['slow'], sampled['standard'], sampled['fast']), (21 * GWEI, 22 * GWEI, 25 * GWEI)
+        )
+        self.assertEqual(cache.get(self.oracle.key(NETWORK)), sampled)
+
+    def test_networks_without_fee_history_use_the_gas_price(self):
+        self.client = FakeGasClient(fee_history=False)
+        sampled = self.oracle.refresh(NETWORK)
+        self.assertEqual(sampled['source'], 'gas_price')
+        self.assertEqual({sampled[speed] for speed in ('slow', 'standard', 'fast')}, {30 * GWEI})
+
+    def test_fresh_entry_is_served_without_a_refresh(self):
+        cache.set(self.oracle.key(NETWORK), entry())
+        self.assertEqual(self.oracle.get(NETWORK)['standard'], 25 * GWEI)
+        self.delay.assert_not_called()
+
+    def test_stale_entry_is_served_while_one_refresh_is_queued(self):
+        cache.set(self.oracle.key(NETWORK), entry(age=60))
+        for _ in range(3):
+            self.assertEqual(self.oracle.get(NETWORK)['standard'], 25 * GWEI)
+        self.assertEqual(self.oracle.get_many([NETWORK])[NETWORK]['standard'], 25 * GWEI)
+        self.delay.assert_called_once_with(NETWORK)
+
+        self.oracle.refresh(NETWORK)
+        self.assertFalse(self.oracle.is_stale(self.oracle.get(NETWORK)))
+        self.assertEqual(self.oracle.get(NETWORK)['standard'], 22 * GWEI)
+
+    def test_missing_entry_is_unavailable_until_refreshed(self):
+        self.assertEqual(self.oracle.get_many([NETWORK, 'bsc_testnet']), {NETWORK: None, 'bsc_testnet': None})
+        self.assertEqual(self.delay.call_count, 2)
+
+    def test_failed_refresh_is_not_requeued_until_the_flag_expires(self):
+        cache.set(self.oracle.key(NETWORK), entry(age=60))
+        self.oracle.get(NETWORK)
+        self.client.fee_history = self.client.gas_price = mock.Mock(side_effect=ChainError('node down'))
+
+        with self.assertRaises(ChainError):
+            self.oracle.refresh(NETWORK)
+        for _ in range(3):
+            self.assertIsNotNone(self.oracle.get(NETWORK))
+        self.delay.assert_called_once()
+
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + 31):
+            self.oracle.get(NETWORK)
+        self.assertEqual(self.delay.call_count, 2)
+
+    def test_successful_refresh_allows_the_next_revalidation(self):
+        self.oracle.get(NETWORK)
+        self.oracle.refresh(NETWORK)
+        cache.set(self.oracle.key(NETWORK), entry(age=60))
+        self.oracle.get(NETWORK)
+        self.assertEqual(self.delay.call_count, 2)
+
+    def test_fee_from_price_rounds_up(self):
+        # 21576 gas at 1 gwei is 0.000021576, rounded up to the fee quantum.
+        self.assertEqual(ANCHOR_GAS, 21576)
+        self.assertEqual(fee_from_price(GWEI), Decimal('0.00002158'))
+        self.assertEqual(fee_from_price(1, gas_units=1), Decimal('0.00000001'))
@@ -0,0 +1,79 @@
+from django.test import SimpleTestCase
+
+from apps.contracts.merkle import MerkleTree, leaf_hash, node_hash, verify_proof
+
+from .factories import document_hash
+
+
+class MerkleTreeTests(SimpleTestCase):
+    def test_single_leaf_is_the_root(self):
+        tree = MerkleTree([document_hash(0)])
+        self.assertEqual(tree.root, leaf_hash(document_hash(0)))
+        self.assertEqual(tree.proof(document_hash(0)), [])
+        self.assertTrue(verify_proof(document_hash(0), [], tree.root_hex))
+
+    def test_unpaired_node_is_carried_up(self):
+        hashes = [document_hash(i) for i in range(3)]
+        leaves = [leaf_hash(h) for h in hashes]
+        tree = MerkleTree(hashes)
+        self.assertEqual(tree.root, node_hash(node_hash(leaves[0], leaves[1]), leaves[2]))
+        self.assertEqual(tree.proof(hashes[2]), [node_hash(leaves[0], leaves[1]).hex()])
+
+    def test_node_hash_ignores_order(self):
+        left, right = leaf_hash(document_hash(0)), leaf_hash(document_hash(1))
+        self.assertEqual(node_hash(left, right), node_hash(right, left))
+
+    def test_leaves_and_nodes_are_domain_separated(self):
+        left, right = leaf_hash(document_hash(0)), leaf_hash(document_hash(1))
+        # An internal node must never verify as a document.
+        tree = MerkleTree([document_hash(0), document_hash(1)])
+        self.assertFalse(verify_proof(node_hash(left, right).hex(), [], tree.root_hex))
+
+    def test_every_proof_verifies(self):
+        for size in range(1, 18):
+            hashes = [document_hash(i) for i in range(size)]
+            tree = MerkleTree(hashes)
+            for h in hashes:
+                with self.subTest(size=size, document=h):
+                    self.assertTrue(verify_proof(h, tree.proof(h), tree.root_hex))
+
+    def test_proof_length_is_logarithmic(self):
+        tree = MerkleTree([document_hash(i) for i in range(1000)])
+        self.assertLessEqual(len(tree.proof(document_hash(500))), 10)
+
+    def test_empty_tree_is_rejected(self):
+        with self.assertRaises(ValueError):
+            MerkleTree([])
+
+
+class VerifyProofTests(SimpleTestCase):
+    def setUp(self):
+        self.hashes = [document_hash(i) for i in range(5)]
+        self.tree = MerkleTree(self.hashes)
+        self.proof = self.tree.proof(self.hashes[1])
+
+    def test_root_comparison_ignores_case(self):
+        self.assertTrue(verify_proof(self.hashes[1], self.proof, self.tree.root_hex.upper()))
+
+    def test_other_document_fails(self):
+        self.assertFalse(verify_proof(document_hash(99), self.proof, self.tree.root_hex))
+
+    def test_proof_of_other_leaf_fails(self):
+        self.assertFalse(verify_proof(self.hashes[1], self.tree.proof(self.hashes[3]), self.tree.root_hex))
+
+    def test_tampered_proof_fails(self):
+        tampered = [self.proof[0][:-1] + ('0' if self.proof[0][-1] != '0' else '1'), *self.proof[1:]]
+        self.assertFalse(verify_proof(self.hashes[1], tampered, self.tree.root_hex))
+
+    def test_truncated_proof_fails(self):
+        self.assertFalse(verify_proof(self.hashes[1], self.proof[:-1], self.tree.root_hex))
+
+    def test_other_root_fails(self):
+        other = MerkleTree(self.hashes[:4])
+        self.assertFalse(verify_proof(self.hashes[1], self.proof, other.root_hex))
+        self.assertFalse(verify_proof(self.hashes[1], self.proof, None))
+
+    def test_malformed_input_fails(self):
+        self.assertFalse(verify_proof('not hex', self.proof, self.tree.root_hex))
+        self.assertFalse(verify_proof(self.hashes[1], ['zz'], self.tree.root_hex))
+        self.assertFalse(verify_proof(self.hashes[1], [None], self.tree.root_hex))
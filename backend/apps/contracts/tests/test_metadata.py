@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+import fakeredis
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from apps.contracts import metadata
+from apps.contracts.metadata import ExtractionPool, process_contracts
+
+from .factories import LOCAL_CACHES, SmartContractFactory, UserFactory
+
+
+def _extract_or_hang(path, stats):
+    with open(path) as document:
+        if document.read().startswith('hang'):
+            time.sleep(60)
+    return metadata._extract_txt(path, stats)
+
+
+@override_settings(CACHES=LOCAL_CACHES, DOCUMENT_METADATA_TIMEOUT=1, DOCUMENT_METADATA_RETRIES=3)
+class HungExtractionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for patcher in (
+            mock.patch('django_redis.get_redis_connection', return_value=fakeredis.FakeRedis()),
+            # Pool processes are forked on first submit, so they see the patched table.
+            mock.patch.dict(metadata.EXTRACTORS, {'.txt': _extract_or_hang}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.pool = ExtractionPool(1)
+        self.addCleanup(self.pool.shutdown)
+        self.user = UserFactory()
+
+    def contract(self, text):
+        contract = SmartContractFactory(user=self.user, document_hash='')
+        contract.document_file.save('contract.txt', ContentFile(text.encode()))
+        return contract
+
+    def test_hung_extraction_is_killed_and_the_batch_continues(self):
+        hung = self.contract('hang forever')
+        others = [self.contract(f'Agreement number {n}\nthe parties agree') for n in range(2)]
+
+        updated, retry = process_contracts([hung.pk] + [contract.pk for contract in others], self.pool)
+
+        self.assertEqual((updated, retry), (2, [hung.pk]))
+        for contract in others:
+            contract.refresh_from_db()
+            self.assertEqual(contract.document_metadata['words'], 6)
+        hung.refresh_from_db()
+        self.assertEqual(hung.document_metadata, {})
+
+    def test_pool_is_usable_after_a_restart(self):
+        future = self.pool.submit(time.sleep, 60)
+        processes = list(self.pool._executor._processes.values())
+        self.pool.restart()
+        self.assertTrue(future.done())
+        self.assertFalse(any(process.is_alive() for process in processes))
+        self.assertEqual(self.pool.submit(abs, -1).result(timeout=10), 1)
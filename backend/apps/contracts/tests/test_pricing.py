@@ -0,0 +1,136 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.contracts.gas import gas_oracle
+from apps.contracts.models import SmartContract
+from apps.contracts.pricing import quote, reprice_contracts, reprice_open_contracts
+
+from .factories import LOCAL_CACHES, SmartContractFactory, UserFactory
+
+NETWORK = 'ethereum_sepolia'
+GWEI = 10 ** 9
+# 21576 gas at 1 gwei, rounded up to the fee quantum.
+ANCHOR_FEE = Decimal('0.00002158')
+
+
+def cache_gas_price(network, gas_price, age=0):
+    cache.set(gas_oracle.key(network), {
+        'network': network, 'source': 'gas_price', 'base_fee': None,
+        'slow': gas_price, 'standard': gas_price, 'fast': 2 * gas_price,
+        'sampled_at': time.time() - age,
+    })
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class PricingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('apps.contracts.tasks.refresh_gas_price.delay')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache_gas_price(NETWORK, GWEI)
+
+        self.subscriber = UserFactory(
+            subscription_type='subscription', subscription_active=True,
+            subscription_end_date=timezone.now() + timedelta(days=30),
+        )
+        self.customer = UserFactory()
+
+
+class RepriceContractsTests(PricingTestCase):
+    def prices(self, contract):
+        contract.refresh_from_db()
+        return contract.gas_fee_estimate, contract.service_fee, contract.total_cost
+
+    def test_prices_use_the_owners_fee_and_the_cached_gas_price(self):
+        subscribed = SmartContractFactory(user=self.subscriber)
+        paying = SmartContractFactory(user=self.customer)
+        # No cached price on this network: the stored estimate is kept.
+        estimated = SmartContractFactory(
+            user=self.customer, blockchain_network='bsc_testnet', gas_fee_estimate=Decimal('0.001')
+        )
+        unpriced = SmartContractFactory(user=self.customer, blockchain_network='bsc_testnet')
+
+        self.assertEqual(reprice_contracts(SmartContract.objects.all()), 3)
+
+        self.assertEqual(self.prices(subscribed), (ANCHOR_FEE, Decimal('0.00000216'), Decimal('0.00002374')))
+        self.assertEqual(self.prices(paying), (ANCHOR_FEE, Decimal('0.00000324'), Decimal('0.00002482')))
+        self.assertEqual(self.prices(estimated), (Decimal('0.001'), Decimal('0.00015'), Decimal('0.00115')))
+        self.assertEqual(self.prices(unpriced), (None, None, None))
+
+    def test_owners_are_loaded_once_and_each_batch_is_one_update(self):
+        for _ in range(3):
+            SmartContractFactory(user=self.subscriber)
+            SmartContractFactory(user=self.customer)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(reprice_contracts(SmartContract.objects.all(), batch_size=2), 6)
+
+        statements = [query['sql'] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in statements if 'accounts_user' in sql]), 1)
+        self.assertEqual(len([sql for sql in statements if sql.startswith('UPDATE')]), 3)
+        self.assertEqual(len(statements), 5)
+
+    def test_unchanged_prices_are_not_written(self):
+        SmartContractFactory.create_batch(2, user=self.customer)
+        reprice_contracts(SmartContract.objects.all())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(reprice_contracts(SmartContract.objects.all()), 0)
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith('UPDATE')])
+
+    def test_new_gas_price_reprices_only_open_contracts(self):
+        pending = SmartContractFactory(user=self.customer)
+        deployed = SmartContractFactory(user=self.customer, status='deployed')
+        reprice_contracts(SmartContract.objects.all())
+
+        cache_gas_price(NETWORK, 2 * GWEI)
+        self.assertEqual(reprice_open_contracts(network=NETWORK), 1)
+
+        self.assertEqual(self.prices(pending)[0], Decimal('0.00004316'))
+        self.assertEqual(self.prices(deployed)[0], ANCHOR_FEE)
+
+
+class QuoteTests(PricingTestCase):
+    def test_anonymous_quote_uses_the_pay_as_you_go_fee_without_queries(self):
+        with self.assertNumQueries(0):
+            result = quote([{'blockchain_network': NETWORK, 'quantity': 10}], user=AnonymousUser())
+
+        self.assertEqual(result['service_fee_percentage'], 15)
+        item = result['items'][0]
+        self.assertEqual(item['total_cost'], Decimal('0.00002482'))
+        self.assertEqual(item['subtotal'], Decimal('0.00024820'))
+        self.assertFalse(item['stale'])
+        self.assertEqual(result['total'], item['subtotal'])
+
+    def test_subscriber_quote_and_unpriced_networks(self):
+        cache_gas_price('polygon_mumbai', GWEI, age=60)
+        result = quote(
+            [
+                {'blockchain_network': NETWORK, 'quantity': 1},
+                {'blockchain_network': 'polygon_mumbai', 'quantity': 2},
+                {'blockchain_network': 'bsc_testnet', 'quantity': 5},
+            ],
+            user=self.subscriber, speed='fast',
+        )
+
+        self.assertEqual(result['service_fee_percentage'], 10)
+        priced, stale, unpriced = result['items']
+        self.assertEqual(priced['gas_price'], 2 * GWEI)
+        self.assertEqual(priced['total_cost'], Decimal('0.00004748'))
+        self.assertTrue(stale['stale'])
+        self.assertIsNone(unpriced['total_cost'])
+        self.assertEqual(result['total'], priced['subtotal'] + stale['subtotal'])
+
+    def test_unknown_speed_is_rejected(self):
+        with self.assertRaises(ValueError):
+            quote([{'blockchain_network': NETWORK, 'quantity': 1}], speed='instant')
@@ -0,0 +1,176 @@
+import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import fakeredis
+from django.test import SimpleTestCase
+
+from apps.contracts.blockchain import Web3ChainClient
+from apps.contracts.signers import NonceManager
+
+NETWORK = 'ethereum_sepolia'
+# Keys outside eth-tester's own accounts, so every key starts at nonce 0.
+PRIVATE_KEYS = ['0x' + '%064x' % (1000 + i) for i in range(2)]
+
+
+class RedisTestCase(SimpleTestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch('django_redis.get_redis_connection', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class NonceManagerTests(RedisTestCase):
+    def test_parallel_allocations_are_unique_and_contiguous(self):
+        nonces = NonceManager(NETWORK)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            allocated = list(executor.map(lambda _: nonces.allocate('0xabc', lambda: 5), range(200)))
+
+        self.assertEqual(sorted(allocated), list(range(5, 205)))
+        self.assertEqual(nonces.current('0xabc'), 205)
+        self.assertEqual(set(nonces.inflight('0xabc')), set(range(5, 205)))
+
+    def test_counters_are_per_address_and_network(self):
+        self.assertEqual(NonceManager(NETWORK).allocate('0xabc', lambda: 3), 3)
+        self.assertEqual(NonceManager(NETWORK).allocate('0xdef', lambda: 0), 0)
+        self.assertEqual(NonceManager('bsc_testnet').allocate('0xabc', lambda: 7), 7)
+        self.assertEqual(NonceManager(NETWORK).allocate('0xabc', lambda: 0), 4)
+
+
+class SignerPoolTests(RedisTestCase):
+    """
+    The signer pool against the in-process EVM, which mines every accepted transaction.
+    """
+    def setUp(self):
+        super().setUp()
+        self.client = Web3ChainClient.eth_tester(NETWORK, private_keys=PRIVATE_KEYS)
+        self.eth = self.client.web3.eth
+        self.signers = self.client.signers
+        self.address = self.signers.addresses[0]
+
+    def send(self, **kwargs):
+        return self.signers.send({'value': 0, 'gas': 21000}, address=self.address, **kwargs)
+
+    def lost(self):
+        """Broadcasts that return without reaching the node."""
+        return mock.patch.object(self.eth, 'send_raw_transaction', return_value=b'')
+
+    def mined_nonce(self):
+        return self.signers.chain_nonce(self.address, 'latest')
+
+    def test_transactions_go_to_the_least_loaded_key(self):
+        with self.lost():
+            sent = [self.signers.send({'value': 0, 'gas': 21000}) for _ in range(4)]
+
+        self.assertEqual(Counter(address for address, _, _ in sent), {address: 2 for address in self.signers.addresses})
+        for address in self.signers.addresses:
+            self.assertEqual(sorted(self.signers.nonces.inflight(address)), [0, 1])
+
+    def test_failing_on_signed_drops_the_transaction_unsent(self):
+        on_signed = mock.Mock(side_effect=RuntimeError('database unavailable'))
+        with mock.patch.object(self.eth, 'send_raw_transaction') as broadcast:
+            with self.assertRaises(RuntimeError):
+                self.send(on_signed=on_signed)
+
+        on_signed.assert_called_once()
+        broadcast.assert_not_called()
+        self.assertEqual(self.signers.nonces.inflight(self.address), {})
+        self.assertEqual(self.signers.nonces.current(self.address), 1)
+
+        # The skipped nonce is filled, so the key's next transaction can be mined.
+        self.assertEqual(self.signers.recover()['filled'], 1)
+        self.assertEqual(self.send()[1], 1)
+        self.assertEqual(self.mined_nonce(), 2)
+
+    def test_broadcast_error_for_a_transaction_the_node_accepted(self):
+        send_raw_transaction = self.eth.send_raw_transaction
+
+        def accept_then_time_out(raw_transaction):
+            send_raw_transaction(raw_transaction)
+            raise TimeoutError('read timed out')
+
+        with mock.patch.object(self.eth, 'send_raw_transaction', side_effect=accept_then_time_out):
+            address, nonce, transaction_hash = self.send()
+
+        self.assertEqual(nonce, 0)
+        self.assertEqual(self.signers.nonces.get(address, nonce)['hashes'], [transaction_hash])
+        self.assertIsNotNone(self.signers.receipt([transaction_hash]))
+
+    def test_rejected_broadcast_releases_its_nonce(self):
+        with mock.patch.object(self.eth, 'send_raw_transaction', side_effect=ValueError('insufficient funds')):
+            with self.assertRaises(ValueError):
+                self.send()
+        self.assertEqual(self.signers.nonces.inflight(self.address), {})
+
+    def test_nonce_error_resynchronises_the_counter(self):
+        # The counter drifted ahead of the chain, e.g. after a Redis restore.
+        self.signers.nonces.reset(self.address, 5)
+
+        self.assertEqual(self.send()[1], 0)
+        self.assertEqual(self.signers.nonces.current(self.address), 1)
+        self.assertEqual(list(self.signers.nonces.inflight(self.address)), [0])
+
+    def test_nonce_error_is_not_retried_for_a_fixed_nonce(self):
+        self.signers.nonces.allocate(self.address, lambda: 0)
+        with self.assertRaisesRegex(Exception, 'nonce'):
+            self.send(nonce=3)
+        self.assertEqual(list(self.signers.nonces.inflight(self.address)), [0])
+
+    def test_stuck_transaction_is_bumped_and_replacements_follow_it(self):
+        with self.lost():
+            original = self.send()[2]
+        gas_price = self.signers.nonces.get(self.address, 0)['transaction']['gasPrice']
+        self.signers.stuck_timeout = 0
+
+        with self.lost():
+            self.assertEqual(self.signers.recover()['bumped'], 1)
+        self.assertEqual(self.signers.recover()['bumped'], 1)
+
+        chain = self.signers.replacements([original])[original]
+        self.assertEqual(len(chain), 3)
+        self.assertEqual(chain[0], original)
+        self.assertEqual(self.signers.receipt(chain)['transactionHash'].hex(), chain[-1])
+        self.assertEqual(self.signers.nonces.get(self.address, 0)['hashes'], chain)
+
+        # Each bump raises the previous gas price by SIGNER_GAS_BUMP_PERCENT.
+        for _ in range(2):
+            gas_price = math.ceil(gas_price * 115 / 100)
+        self.assertEqual(self.eth.get_transaction(chain[-1])['gasPrice'], gas_price)
+
+        self.assertEqual(self.signers.recover(), {'completed': 1, 'bumped': 0, 'filled': 0})
+        self.assertEqual(self.signers.nonces.inflight(self.address), {})
+
+    def test_bumps_stop_at_the_limit(self):
+        self.signers.max_bumps = 1
+        self.signers.stuck_timeout = 0
+        with self.lost():
+            original = self.send()[2]
+            self.assertEqual(self.signers.recover()['bumped'], 1)
+            self.assertEqual(self.signers.recover()['bumped'], 0)
+        self.assertEqual(len(self.signers.replacements([original])[original]), 2)
+
+    def test_failed_bump_leaves_the_entry_unchanged(self):
+        with self.lost():
+            original = self.send()[2]
+        entry = self.signers.nonces.get(self.address, 0)
+        self.signers.stuck_timeout = 0
+
+        with mock.patch.object(self.eth, 'send_raw_transaction', side_effect=ValueError('replacement underpriced')):
+            self.assertEqual(self.signers.recover()['bumped'], 0)
+
+        self.assertEqual(self.signers.nonces.get(self.address, 0), entry)
+        self.assertEqual(self.signers.replacements([original]), {original: [original]})
+
+    def test_unsent_nonce_is_filled_once_it_is_stale(self):
+        # A worker allocated nonce 0 and died before broadcasting it.
+        self.signers.nonces.allocate(self.address, lambda: self.signers.chain_nonce(self.address))
+
+        self.assertEqual(self.signers.recover()['filled'], 0)
+
+        self.signers.stuck_timeout = 0
+        self.assertEqual(self.signers.recover()['filled'], 1)
+        self.assertEqual(self.mined_nonce(), 1)
+        self.assertEqual(self.send()[1], 1)
+        self.assertEqual(self.signers.recover()['completed'], 2)
@@ -0,0 +1,40 @@
+"""
+Per-client throttles for the public document verification endpoint.
+
+Hash lookups and file uploads are limited separately: hashing an uploaded file
+costs far more than a cached lookup, so ``document_verification_file`` is much
+stricter than ``document_verification``. Rates are set in
+``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``.
+
+Clients are identified with ``get_client_ip`` rather than DRF's default, which
+trusts any ``X-Forwarded-For`` header.
+"""
+from rest_framework.throttling import SimpleRateThrottle
+
+from apps.accounts.utils import get_client_ip
+
+
+class ClientIPRateThrottle(SimpleRateThrottle):
+    """
+    Rate throttle keyed on the client IP, for anonymous endpoints.
+    """
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': get_client_ip(request)}
+
+
+class DocumentVerificationThrottle(ClientIPRateThrottle):
+    scope = 'document_verification'
+
+
+class DocumentVerificationFileThrottle(ClientIPRateThrottle):
+    """
+    Stricter limit applied only to multipart uploads of a file to verify.
+    """
+    scope = 'document_verification_file'
+
+    def get_cache_key(self, request, view):
+        # Decided from the content type: reading request.data here would
+        # parse the upload before the request is throttled.
+        if not request.content_type.startswith('multipart/'):
+            return None
+        return super().get_cache_key(request, view)
@@ -0,0 +1,236 @@
+"""
+Resumable chunked uploads of contract documents.
+
+Each chunk is spooled to its own temporary file and checked against its
+SHA-256 checksum before the upload row is locked, so slow clients never hold
+a database lock. Verified chunks are then written into a partial file at their
+offset. Partial files live in ``DOCUMENT_UPLOAD_DIR``, outside ``MEDIA_ROOT``,
+so unfinished uploads are never served.
+
+Once every byte has arrived the partial file can no longer change, so it is
+hashed without holding any lock. The upload row is then locked again only to
+move the file into content-addressed document storage and record the result;
+the move is a rename when both directories are on the same file system.
+"""
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .storage import CHUNK_SIZE, digest_from_name, document_storage, hash_file
+
+DOCUMENT_DIR = 'contracts/documents'
+DOCUMENT_EXTENSIONS = ('pdf', 'doc', 'docx', 'txt')
+
+
+class UploadError(Exception):
+    """Raised when an upload request cannot be applied."""
+    def __init__(self, message, status_code=400, **extra):
+        super().__init__(message)
+        self.status_code = status_code
+        self.extra = extra
+
+
+def upload_dir():
+    return str(getattr(settings, 'DOCUMENT_UPLOAD_DIR', settings.BASE_DIR / 'private' / 'uploads'))
+
+
+def partial_path(upload_id):
+    return os.path.join(upload_dir(), f'{upload_id}.part')
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def start_upload(user, filename, total_size, expected_hash=''):
+    """Create an upload session and its empty partial file."""
+    from .models import DocumentUpload
+
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    if extension not in DOCUMENT_EXTENSIONS:
+        raise UploadError(f'Unsupported document type: {extension or filename}')
+    max_size = getattr(settings, 'DOCUMENT_UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+    if total_size <= 0 or total_size > max_size:
+        raise UploadError(f'Document size must be between 1 and {max_size} bytes')
+
+    upload = DocumentUpload.objects.create(
+        user=user,
+        filename=os.path.basename(filename),
+        total_size=total_size,
+        expected_hash=expected_hash.lower(),
+    )
+    path = upload.partial_path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def receive_chunk(upload_id, user, offset, stream, length, checksum):
+    """
+    Append ``length`` bytes read from ``stream`` at ``offset``.
+
+    ``checksum`` is the hex SHA-256 of the chunk. A chunk whose offset does not
+    match the bytes received so far is rejected with the current offset so the
+    client can resume from there.
+    """
+    from .models import DocumentUpload
+
+    max_chunk = getattr(settings, 'DOCUMENT_UPLOAD_MAX_CHUNK_SIZE', 8 * 1024 * 1024)
+    if length <= 0 or length > max_chunk:
+        raise UploadError(f'Chunk size must be between 1 and {max_chunk} bytes', status_code=413)
+
+    spool_dir = upload_dir()
+    os.makedirs(spool_dir, exist_ok=True)
+    fd, spool_path = tempfile.mkstemp(dir=spool_dir, prefix=f'{upload_id}.', suffix='.chunk')
+    try:
+        digest = hashlib.sha256()
+        received = 0
+        with os.fdopen(fd, 'wb') as spool:
+            while received < length:
+                data = stream.read(min(CHUNK_SIZE, length - received))
+                if not data:
+                    break
+                digest.update(data)
+                spool.write(data)
+                received += len(data)
+        if received != length:
+            raise UploadError('Chunk body is shorter than its declared length')
+        if digest.hexdigest() != (checksum or '').lower():
+            raise UploadError('Chunk checksum mismatch', status_code=422)
+
+        with transaction.atomic():
+            upload = DocumentUpload.objects.select_for_update().get(pk=upload_id, user=user)
+            if upload.status != 'uploading':
+                raise UploadError(f'Upload is {upload.status}', status_code=409)
+            if offset != upload.received_bytes:
+                raise UploadError(
+                    'Chunk offset does not match the uploaded size',
+                    status_code=409, offset=upload.received_bytes
+                )
+            if offset + length > upload.total_size:
+                raise UploadError('Chunk extends past the declared document size')
+
+            with open(spool_path, 'rb') as chunk, open(upload.partial_path, 'r+b') as partial:
+                partial.seek(offset)
+                # Drop bytes left behind by an earlier, unacknowledged attempt.
+                partial.truncate()
+                for data in iter(lambda: chunk.read(CHUNK_SIZE), b''):
+                    partial.write(data)
+                partial.flush()
+                os.fsync(partial.fileno())
+
+            upload.received_bytes = offset + length
+            upload.save(update_fields=['received_bytes', 'updated_at'])
+    finally:
+        _remove(spool_path)
+    return upload
+
+
+def complete_upload(upload_id, user, contract=None):
+    """
+    Move a fully received upload into document storage.
+
+    When ``contract`` is given the document is attached to it. Completing an
+    already completed upload returns it unchanged.
+    """
+    from .models import DocumentUpload
+
+    upload = DocumentUpload.objects.get(pk=upload_id, user=user)
+    if upload.status == 'completed':
+        return upload
+    _check_complete(upload)
+
+    # No chunk can be accepted once every byte has arrived, so the partial
+    # file is hashed outside the transaction.
+    path = upload.partial_path
+    try:
+        with open(path, 'rb') as partial:
+            digest = hash_file(partial)
+    except FileNotFoundError:
+        # Completed or aborted by a concurrent request in the meantime.
+        digest = None
+
+    with transaction.atomic():
+        upload = DocumentUpload.objects.select_for_update().get(pk=upload_id, user=user)
+        if upload.status == 'completed':
+            return upload
+        _check_complete(upload)
+        if digest is None:
+            raise UploadError('Upload file is missing', status_code=409)
+
+        if upload.expected_hash and digest != upload.expected_hash:
+            upload.status = 'aborted'
+            upload.save(update_fields=['status', 'updated_at'])
+        else:
+            name = document_storage.save_local_file(
+                path, os.path.join(DOCUMENT_DIR, upload.filename), digest=digest
+            )
+            upload.status = 'completed'
+            upload.document_name = name
+            upload.document_hash = digest_from_name(name)
+            upload.contract = contract
+            upload.save(update_fields=['status', 'document_name', 'document_hash', 'contract', 'updated_at'])
+
+            if contract is not None:
+                contract.document_file.name = name
+                contract.save(update_fields=['document_file', 'updated_at'])
+
+    if upload.status == 'aborted':
+        _remove(path)
+        raise UploadError('Document hash does not match the declared hash', status_code=422)
+    return upload
+
+
+def _check_complete(upload):
+    if upload.status != 'uploading':
+        raise UploadError(f'Upload is {upload.status}', status_code=409)
+    if upload.received_bytes != upload.total_size:
+        raise UploadError(
+            'Upload is incomplete', status_code=409, offset=upload.received_bytes
+        )
+
+
+def abort_upload(upload_id, user):
+    """Abort an upload and discard its partial file."""
+    from .models import DocumentUpload
+
+    with transaction.atomic():
+        upload = DocumentUpload.objects.select_for_update().get(pk=upload_id, user=user)
+        if upload.status == 'uploading':
+            upload.status = 'aborted'
+            upload.save(update_fields=['status', 'updated_at'])
+            _remove(upload.partial_path)
+    return upload
+
+
+def cleanup_stale_uploads(max_age=None):
+    """Abort idle uploads and delete finished upload rows older than ``max_age`` seconds."""
+    from .models import DocumentUpload
+
+    max_age = max_age or getattr(settings, 'DOCUMENT_UPLOAD_TTL', 24 * 60 * 60)
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+
+    stale = list(
+        DocumentUpload.objects
+        .filter(status='uploading', updated_at__lt=cutoff)
+        .values_list('pk', flat=True)
+    )
+    for upload_id in stale:
+        _remove(partial_path(upload_id))
+    aborted = DocumentUpload.objects.filter(pk__in=stale, status='uploading').update(status='aborted')
+
+    deleted, _ = (
+        DocumentUpload.objects
+        .filter(status__in=['completed', 'aborted'], updated_at__lt=cutoff)
+        .exclude(pk__in=stale)
+        .delete()
+    )
+    return {'aborted': aborted, 'deleted': deleted}
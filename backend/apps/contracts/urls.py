@@ -2,13 +2,30 @@
 URL patterns for contracts app.
 """
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
-# Placeholder for future viewsets
-router = DefaultRouter()
+from . import views
+
+# Contracts are served from the app root, so the API root view is not used
+router = SimpleRouter()
+router.register(r'templates', views.ContractTemplateViewSet, basename='contract-template')
+router.register(r'', views.SmartContractViewSet, basename='contract')
 
 urlpatterns = [
-    # Contract endpoints will be added here
+    # Resumable document uploads
+    path('uploads/', views.DocumentUploadView.as_view(), name='document_upload'),
+    path('uploads/<uuid:upload_id>/', views.DocumentUploadDetailView.as_view(), name='document_upload_detail'),
+    path('uploads/<uuid:upload_id>/complete/', views.DocumentUploadCompleteView.as_view(), name='document_upload_complete'),
+    
+    # Public document verification
+    path('verify/', views.DocumentVerificationView.as_view(), name='document_verify'),
+    path('verify/<str:document_hash>/', views.DocumentVerificationView.as_view(), name='document_verify_hash'),
+
+    # Cached gas prices and price quotes
+    path('gas-prices/', views.GasPriceView.as_view(), name='gas_prices'),
+    path('quotes/', views.QuoteView.as_view(), name='contract_quotes'),
+
+    # Contracts
     path('', include(router.urls)),
 ]
 
@@ -0,0 +1,86 @@
+"""
+Public lookup of registered documents by SHA-256 hash.
+
+Lookups go through the indexed ``document_hash`` column once and the answer
+is cached under the hash: registrations for ``VERIFICATION_CACHE_TIMEOUT``
+seconds and unknown hashes for the shorter
+``VERIFICATION_NEGATIVE_CACHE_TIMEOUT``, so repeated lookups of either never
+reach the database. Entries are dropped whenever a contract enters or leaves
+a registered status.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+HASH_RE = re.compile(r'^[0-9a-fA-F]{64}$')
+REGISTERED_STATUSES = ('deployed', 'verified')
+
+REGISTRATION_FIELDS = (
+    'status', 'blockchain_network', 'contract_address', 'transaction_hash',
+    'block_number', 'verification_timestamp', 'contract_metadata',
+)
+
+
+def _cache_key(document_hash):
+    return f'contracts:verification:{document_hash}'
+
+
+def normalize_hash(document_hash):
+    """Return the lower-case hex digest, or None if it is not a SHA-256 hash."""
+    document_hash = (document_hash or '').strip()
+    if document_hash.startswith('0x'):
+        document_hash = document_hash[2:]
+    return document_hash.lower() if HASH_RE.match(document_hash) else None
+
+
+def _registration(row):
+    anchor = (row['contract_metadata'] or {}).get('anchor') or {}
+    return {
+        'status': row['status'],
+        'network': row['blockchain_network'],
+        'contract_address': row['contract_address'] or None,
+        'transaction_hash': row['transaction_hash'] or None,
+        'block_number': row['block_number'],
+        'verified_at': row['verification_timestamp'].isoformat() if row['verification_timestamp'] else None,
+        'merkle_root': anchor.get('root'),
+        'merkle_proof': anchor.get('proof'),
+        'anchored_at': anchor.get('anchored_at'),
+    }
+
+
+def lookup_document(document_hash):
+    """Return the public registration record of a normalized document hash."""
+    from .models import SmartContract
+
+    key = _cache_key(document_hash)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    rows = (
+        SmartContract.objects
+        .filter(document_hash=document_hash, status__in=REGISTERED_STATUSES)
+        .order_by('block_number', 'id')
+        .values(*REGISTRATION_FIELDS)
+    )
+    registrations = [_registration(row) for row in rows]
+    result = {
+        'document_hash': document_hash,
+        'registered': bool(registrations),
+        'registrations': registrations,
+    }
+    if registrations:
+        timeout = getattr(settings, 'VERIFICATION_CACHE_TIMEOUT', 24 * 60 * 60)
+    else:
+        timeout = getattr(settings, 'VERIFICATION_NEGATIVE_CACHE_TIMEOUT', 60)
+    cache.set(key, result, timeout)
+    return result
+
+
+def invalidate_documents(document_hashes):
+    """Drop cached lookups of the given hashes once the transaction commits."""
+    keys = [_cache_key(document_hash) for document_hash in set(document_hashes) if document_hash]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,363 @@
+"""
+Smart contract views.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.core.pagination import CreatedAtCursorPagination
+
+from .models import ContractTemplate, DocumentUpload, SmartContract
+from .serializers import (
+    SmartContractSerializer, SmartContractListSerializer,
+    DocumentUploadSerializer, DocumentUploadCreateSerializer, DocumentUploadCompleteSerializer,
+    DocumentVerificationSerializer, ContractTemplateSerializer, TemplateRenderSerializer,
+    QuoteSerializer
+)
+from .gas import SPEEDS, fee_from_price, gas_oracle
+from .pricing import quote
+from .rendering import TemplateRenderError, create_contracts_from_template, get_compiled_template
+from .state import transition
+from .throttling import DocumentVerificationFileThrottle, DocumentVerificationThrottle
+from .storage import hash_file
+from .uploads import UploadError, abort_upload, complete_upload, receive_chunk, start_upload
+from .verification import lookup_document, normalize_hash
+
+
+class SmartContractViewSet(mixins.ListModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.CreateModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    List, retrieve and create the current user's smart contracts.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    # Ordering is fixed by the cursor, so the ordering filter is not offered.
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = ['status', 'blockchain_network', 'category']
+    search_fields = ['title']
+    lookup_value_regex = r'\d+'
+
+    def get_queryset(self):
+        # The default manager only returns live rows, matching the partial
+        # (user, created_at, id) index.
+        return (
+            SmartContract.objects
+            .filter(user_id=self.request.user.pk)
+            .select_related('category', 'user')
+        )
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SmartContractListSerializer
+        return SmartContractSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user_id=self.request.user.pk)
+
+    @action(detail=True, methods=['post'])
+    def submit(self, request, pk=None):
+        """Queue a draft or failed contract for deployment."""
+        contract = self.get_object()
+        if not contract.document_hash:
+            return Response(
+                {'error': 'Upload a document before submitting the contract'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        moved = contract.status in ('draft', 'failed') and transition(
+            SmartContract.objects.filter(pk=contract.pk), contract.status, 'pending',
+            retry_count=0, next_attempt_at=None, error_message='',
+        )
+        if not moved:
+            return Response(
+                {'error': f'Only draft or failed contracts can be submitted (status: {contract.status})'},
+                status=status.HTTP_409_CONFLICT
+            )
+        contract.refresh_from_db()
+        contract.update_gas_fee_estimate()
+        return Response(SmartContractSerializer(contract).data)
+
+
+class ContractTemplateViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    List active contract templates and render contracts from them in bulk.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ContractTemplateSerializer
+    lookup_value_regex = r'\d+'
+
+    def get_queryset(self):
+        return ContractTemplate.objects.filter(is_active=True).select_related('category')
+
+    def _compile(self, template):
+        try:
+            return get_compiled_template(template), None
+        except TemplateRenderError as e:
+            return None, Response({'error': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    @action(detail=True, methods=['post'], url_path='render')
+    def render_contracts(self, request, pk=None):
+        """Render many contracts from the template without saving them."""
+        template = self.get_object()
+        serializer = TemplateRenderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        compiled, error = self._compile(template)
+        if error:
+            return error
+
+        items = serializer.validated_data['items']
+        results = []
+        for index, text, errors in compiled.render_many([item['variables'] for item in items]):
+            if errors:
+                results.append({'index': index, 'errors': errors})
+            else:
+                results.append({'index': index, 'title': items[index].get('title') or template.name, 'content': text})
+        return Response({'template': template.pk, 'count': len(results), 'results': results})
+
+    @action(detail=True, methods=['post'])
+    def contracts(self, request, pk=None):
+        """Render the template once per item and create the draft contracts."""
+        template = self.get_object()
+        serializer = TemplateRenderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        compiled, error = self._compile(template)
+        if error:
+            return error
+
+        try:
+            contracts = create_contracts_from_template(
+                template,
+                request.user,
+                serializer.validated_data['items'],
+                blockchain_network=serializer.validated_data.get('blockchain_network'),
+            )
+        except TemplateRenderError as e:
+            return Response({'error': str(e), 'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {'count': len(contracts), 'ids': [contract.pk for contract in contracts]},
+            status=status.HTTP_201_CREATED
+        )
+
+
+def _upload_error_response(error):
+    return Response({'error': str(error), **error.extra}, status=error.status_code)
+
+
+class DocumentUploadView(APIView):
+    """
+    Start a resumable document upload.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = DocumentUploadCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = start_upload(
+                request.user,
+                serializer.validated_data['filename'],
+                serializer.validated_data['total_size'],
+                serializer.validated_data.get('sha256', ''),
+            )
+        except UploadError as e:
+            return _upload_error_response(e)
+        return Response(DocumentUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+class DocumentUploadDetailView(APIView):
+    """
+    Inspect, append a chunk to, or abort a resumable document upload.
+
+    Chunks are sent as the raw ``PATCH`` body with an ``Upload-Offset`` header
+    and an ``Upload-Checksum: sha256 <hex>`` header.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, upload_id):
+        upload = get_object_or_404(DocumentUpload, pk=upload_id, user=request.user)
+        return Response(DocumentUploadSerializer(upload).data)
+
+    def patch(self, request, upload_id):
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return Response(
+                {'error': 'Upload-Offset and Content-Length headers are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        algorithm, _, checksum = request.headers.get('Upload-Checksum', '').partition(' ')
+        if algorithm.lower() != 'sha256' or not checksum:
+            return Response(
+                {'error': 'Upload-Checksum header must be "sha256 <hex digest>"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            upload = receive_chunk(
+                upload_id, request.user, offset, request.stream, length, checksum.strip()
+            )
+        except DocumentUpload.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        except UploadError as e:
+            return _upload_error_response(e)
+        return Response(DocumentUploadSerializer(upload).data)
+
+    def delete(self, request, upload_id):
+        try:
+            abort_upload(upload_id, request.user)
+        except DocumentUpload.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class DocumentUploadCompleteView(APIView):
+    """
+    Finalize a fully received upload into document storage.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, upload_id):
+        serializer = DocumentUploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        contract = None
+        if serializer.validated_data.get('contract'):
+            contract = get_object_or_404(
+                SmartContract, pk=serializer.validated_data['contract'], user=request.user
+            )
+        try:
+            upload = complete_upload(upload_id, request.user, contract=contract)
+        except DocumentUpload.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        except UploadError as e:
+            return _upload_error_response(e)
+        return Response(DocumentUploadSerializer(upload).data)
+
+
+class DocumentVerificationView(APIView):
+    """
+    Public check of whether a document is registered on chain.
+
+    ``GET verify/<sha256>/`` looks up a hash; ``POST verify/`` accepts a
+    ``document_hash`` or a ``file``. Uploaded files are first stored by
+    Django's upload handlers (in memory, or in a temporary file above
+    ``FILE_UPLOAD_MAX_MEMORY_SIZE``) and then hashed in chunks, so they are
+    capped at ``DOCUMENT_VERIFICATION_MAX_SIZE`` bytes. Answers are served
+    from the cache, so repeated lookups never reach the database. Both
+    methods are throttled per client IP.
+    """
+    # No authentication: anonymous lookups must not load users either.
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+    throttle_classes = [DocumentVerificationThrottle, DocumentVerificationFileThrottle]
+
+    def get(self, request, document_hash):
+        document_hash = normalize_hash(document_hash)
+        if document_hash is None:
+            return Response(
+                {'error': 'Document hash must be a hex SHA-256 digest'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self._respond(lookup_document(document_hash))
+
+    def post(self, request):
+        # Rejected before request.data is read, so oversized files are never stored.
+        max_size = getattr(settings, 'DOCUMENT_VERIFICATION_MAX_SIZE', 50 * 1024 * 1024)
+        try:
+            length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = 0
+        if length > max_size:
+            return Response(
+                {'error': f'Request body must not exceed {max_size} bytes'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        serializer = DocumentVerificationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        document_hash = serializer.validated_data.get('document_hash')
+        if document_hash is None:
+            document_hash = hash_file(serializer.validated_data['file'])
+        return self._respond(lookup_document(document_hash))
+
+    def _respond(self, result):
+        response = Response(result)
+        if result['registered']:
+            patch_cache_control(response, public=True, max_age=300)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+
+class GasPriceView(APIView):
+    """
+    Public cached gas prices and anchoring fees per network.
+
+    ``GET gas-prices/`` lists every network, ``?network=`` selects one.
+    Prices come from the gas oracle's cache and are never fetched from a
+    node during the request; networks not sampled yet are reported as None.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        networks = [code for code, _ in SmartContract.BLOCKCHAIN_NETWORK_CHOICES]
+        network = request.query_params.get('network')
+        if network is not None:
+            if network not in networks:
+                return Response(
+                    {'error': f'Unknown network {network!r}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            networks = [network]
+
+        entries = gas_oracle.get_many(networks)
+        result = {network: entry and self._format(entry) for network, entry in entries.items()}
+        response = Response(result)
+        if all(entry and not entry['stale'] for entry in result.values()):
+            patch_cache_control(response, public=True, max_age=gas_oracle.ttl)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def _format(self, entry):
+        return {
+            'gas_price': {speed: entry[speed] for speed in SPEEDS},
+            'base_fee': entry['base_fee'],
+            'fee': {speed: str(fee_from_price(entry[speed])) for speed in SPEEDS},
+            'source': entry['source'],
+            'sampled_at': datetime.fromtimestamp(entry['sampled_at'], tz=dt_timezone.utc).isoformat(),
+            'stale': gas_oracle.is_stale(entry),
+        }
+
+
+class QuoteView(APIView):
+    """
+    Batch price quotes for the pricing page.
+
+    ``POST quotes/`` prices ``items`` of ``{blockchain_network, quantity}`` at
+    the requested gas ``speed`` with the caller's service fee (pay-as-you-go
+    for anonymous visitors). Gas prices come from the gas oracle's cache.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = QuoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = quote(
+            serializer.validated_data['items'],
+            user=request.user,
+            speed=serializer.validated_data['speed'],
+        )
+        return Response(QuoteSerializer(result).data)
@@ -0,0 +1,14 @@
+"""
+Admin configuration for core app.
+"""
+from django.contrib import admin
+from .models import FailedEmail
+
+
+@admin.register(FailedEmail)
+class FailedEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'from_email', 'attempts', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['subject', 'recipients', 'error']
+    readonly_fields = ['subject', 'from_email', 'recipients', 'error', 'attempts', 'created_at']
+    ordering = ['-created_at']
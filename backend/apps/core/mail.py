@@ -0,0 +1,104 @@
+"""
+Outbound email queue.
+
+Messages are handed to a Celery worker once the surrounding transaction
+commits, so request handlers never wait on SMTP and never hold a database
+transaction open while mail is being delivered.
+
+Single messages from ``queue_email`` are buffered in a Redis list. The first
+message of a window schedules one flush ``EMAIL_BATCH_WINDOW`` seconds later,
+which hands everything buffered by then to ``deliver_emails`` in batches of
+``EMAIL_BATCH_SIZE``; a periodic flush picks up anything a lost flush task
+left behind. Messages passed together to ``queue_emails`` skip the buffer
+and share one task. If Redis is unavailable, or the window is 0, a single
+message gets a task of its own. Workers keep one SMTP connection open per
+process, so consecutive tasks do not reconnect.
+"""
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = 'core:email_buffer'
+FLUSH_SCHEDULED_KEY = f'{BUFFER_KEY}:scheduled'
+# Seconds after which a scheduled flush that never ran stops blocking new ones.
+FLUSH_DEADLINE = 60
+
+
+def _redis():
+    from django_redis import get_redis_connection
+    return get_redis_connection('default')
+
+
+def build_message(subject, message, recipient_list, from_email=None):
+    """Return the serializable payload for one outbound email."""
+    return {
+        'subject': subject,
+        'body': message,
+        'from_email': from_email or settings.DEFAULT_FROM_EMAIL,
+        'recipients': list(recipient_list),
+    }
+
+
+def queue_emails(messages):
+    """Queue message payloads for delivery, as one task, after commit."""
+    from .tasks import deliver_emails
+
+    messages = list(messages)
+    if messages:
+        transaction.on_commit(lambda: deliver_emails.delay(messages))
+
+
+def queue_email(subject, message, recipient_list, from_email=None):
+    """Buffer a single email for batched delivery after commit."""
+    payload = build_message(subject, message, recipient_list, from_email)
+    if getattr(settings, 'EMAIL_BATCH_WINDOW', 2) <= 0:
+        queue_emails([payload])
+    else:
+        transaction.on_commit(lambda: _buffer(payload))
+
+
+def _buffer(message):
+    from .tasks import deliver_emails, flush_email_buffer
+
+    window = getattr(settings, 'EMAIL_BATCH_WINDOW', 2)
+    try:
+        pipe = _redis().pipeline()
+        pipe.rpush(BUFFER_KEY, json.dumps(message))
+        pipe.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=FLUSH_DEADLINE)
+        _, schedule = pipe.execute()
+    except RedisError as exc:
+        logger.warning('Email buffer unavailable, sending to %s directly: %s', message['recipients'], exc)
+        deliver_emails.delay([message])
+        return
+    if schedule:
+        flush_email_buffer.apply_async(countdown=window)
+
+
+def flush_buffered_emails(batch_size=None):
+    """Hand buffered emails to ``deliver_emails`` in batches. Returns messages handed over."""
+    from .tasks import deliver_emails
+
+    batch_size = batch_size or getattr(settings, 'EMAIL_BATCH_SIZE', 100)
+    redis = _redis()
+    # Clear the flag first: a message buffered from here on either lands in
+    # this flush or schedules the next one.
+    redis.delete(FLUSH_SCHEDULED_KEY)
+
+    flushed = 0
+    while True:
+        pipe = redis.pipeline()
+        pipe.lrange(BUFFER_KEY, 0, batch_size - 1)
+        pipe.ltrim(BUFFER_KEY, batch_size, -1)
+        raw, _ = pipe.execute()
+        if not raw:
+            break
+        deliver_emails.delay([json.loads(message) for message in raw])
+        flushed += len(raw)
+        if len(raw) < batch_size:
+            break
+    return flushed
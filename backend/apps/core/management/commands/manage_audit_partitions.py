@@ -0,0 +1,81 @@
+"""
+Management command to partition audit tables and enforce their retention.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.partitioning import (
+    PARTITIONED_MODELS, PartitioningError, convert_to_partitioned,
+    is_partitioned, maintain_partitions
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Convert audit tables to monthly range partitions, pre-create future '
+        'partitions and drop (optionally archive) expired ones'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Convert tables that are not partitioned yet (run once, ideally in a maintenance window)'
+        )
+        parser.add_argument(
+            '--keep-legacy',
+            action='store_true',
+            help='Keep the original table (renamed) after conversion'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50000,
+            help='Rows copied per statement during conversion'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=getattr(settings, 'AUDIT_PARTITION_MONTHS_AHEAD', 3),
+            help='Number of future monthly partitions to keep created'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            default=getattr(settings, 'AUDIT_ARCHIVE_DIR', None),
+            help='Export expiring partitions to gzip CSV files in this directory before dropping them'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['convert']:
+                for label in PARTITIONED_MODELS:
+                    model = apps.get_model(label)
+                    table = model._meta.db_table
+                    if is_partitioned(table):
+                        self.stdout.write(self.style.WARNING(f'{table} is already partitioned'))
+                        continue
+                    convert_to_partitioned(
+                        model,
+                        months_ahead=options['months_ahead'],
+                        batch_size=options['batch_size'],
+                        keep_legacy=options['keep_legacy'],
+                    )
+                    self.stdout.write(self.style.SUCCESS(f'Converted {table} to monthly partitions'))
+
+            report = maintain_partitions(
+                months_ahead=options['months_ahead'],
+                archive_dir=options['archive_dir'],
+            )
+        except PartitioningError as exc:
+            raise CommandError(str(exc))
+
+        for label, result in report.items():
+            for name in result.get('dropped', []):
+                self.stdout.write(self.style.WARNING(f'{label}: dropped partition {name}'))
+            if 'deleted' in result:
+                self.stdout.write(f"{label}: deleted {result['deleted']} expired rows")
+            if 'ensured' in result:
+                self.stdout.write(f"{label}: {len(result['ensured'])} current/future partitions present")
+
+        self.stdout.write(self.style.SUCCESS('Audit partition maintenance complete'))
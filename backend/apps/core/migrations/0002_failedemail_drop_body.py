@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='failedemail',
+            name='body',
+        ),
+    ]
@@ -1,7 +1,7 @@
 """
 Core models for the BlockBustre application.
 """
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 
@@ -16,13 +16,56 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    QuerySet with bulk soft delete and restore.
+    """
+    def alive(self):
+        return self.filter(is_deleted=False)
+
+    def dead(self):
+        return self.filter(is_deleted=True)
+
+    def soft_delete(self):
+        """Soft delete every row in the queryset with one UPDATE."""
+        from django.utils import timezone
+        from .signals import pre_soft_delete
+
+        rows = self.filter(is_deleted=False)
+        with transaction.atomic(using=self.db):
+            pre_soft_delete.send(sender=self.model, queryset=rows)
+            return rows.update(is_deleted=True, deleted_at=timezone.now())
+
+    def restore(self):
+        """Restore every soft-deleted row in the queryset with one UPDATE."""
+        from .signals import pre_restore
+
+        rows = self.filter(is_deleted=True)
+        with transaction.atomic(using=self.db):
+            pre_restore.send(sender=self.model, queryset=rows)
+            return rows.update(is_deleted=False, deleted_at=None)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """
+    Manager that hides soft-deleted rows.
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class SoftDeleteModel(models.Model):
     """
     Abstract base class that provides soft delete functionality.
+
+    ``objects`` only returns live rows; ``all_objects`` includes soft-deleted ones.
     """
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
@@ -39,3 +82,24 @@ class SoftDeleteModel(models.Model):
         self.deleted_at = None
         self.save(update_fields=['is_deleted', 'deleted_at'])
 
+
+
+class FailedEmail(models.Model):
+    """
+    Dead-letter record for outbound emails that exhausted their retries.
+
+    The body is deliberately not stored: verification and password reset
+    emails contain tokens that must not outlive the message.
+    """
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
@@ -0,0 +1,22 @@
+"""
+Shared pagination classes.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Cursor pagination keyed on ``created_at``, newest first.
+
+    DRF's cursor holds the ``created_at`` of the page boundary plus an offset
+    counting the rows that share that timestamp; ``-id`` only makes the order
+    of such ties stable. Each page is an index range scan from the boundary
+    timestamp with no ``COUNT(*)``, and the offset only skips rows created in
+    the same microsecond, so deep pages cost the same as the first. ``id`` is
+    descending like ``created_at`` so the ordering reads as a single backward
+    scan of the ``(user, is_deleted, created_at, id)`` index.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
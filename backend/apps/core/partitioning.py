@@ -0,0 +1,288 @@
+"""
+Monthly range partitioning and retention for append-heavy audit tables.
+
+Partitioned tables are split by month on their timestamp column. Future
+partitions are created ahead of time, and expired months are removed by
+detaching and dropping whole partitions (optionally after exporting them to
+gzip-compressed CSV) instead of running ``DELETE``. PostgreSQL only.
+"""
+import gzip
+import logging
+import os
+import re
+from datetime import date, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Models stored as monthly range partitions, with their partition column.
+PARTITIONED_MODELS = {
+    'accounts.LoginAttempt': 'created_at',
+    'contracts.ContractDeploymentLog': 'created_at',
+}
+
+PARTITION_NAME_RE = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+class PartitioningError(Exception):
+    """Raised when a table cannot be partitioned or maintained."""
+
+
+def _check_backend():
+    if connection.vendor != 'postgresql':
+        raise PartitioningError('Table partitioning requires PostgreSQL.')
+
+
+def add_months(day, months):
+    """Return the first day of the month ``months`` after ``day``'s month."""
+    month_index = day.year * 12 + (day.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(table, month_start):
+    return f'{table}_p{month_start.year}{month_start.month:02d}'
+
+
+def is_partitioned(table):
+    """Return True if ``table`` is already a partitioned table."""
+    _check_backend()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table pt '
+            'JOIN pg_class c ON c.oid = pt.partrelid '
+            'WHERE c.relname = %s',
+            [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table):
+    """Return ``(name, month_start)`` pairs for the table's monthly partitions."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits i '
+            'JOIN pg_class parent ON parent.oid = i.inhparent '
+            'JOIN pg_class child ON child.oid = i.inhrelid '
+            'WHERE parent.relname = %s',
+            [table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME_RE.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(table, month_start):
+    """Create the partition holding ``month_start``'s month if it is missing."""
+    qn = connection.ops.quote_name
+    name = partition_name(table, month_start)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(table)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [month_start.isoformat(), add_months(month_start, 1).isoformat()]
+        )
+    return name
+
+
+def ensure_partitions(model, months_ahead=3):
+    """Create partitions for the current month and ``months_ahead`` months."""
+    _check_backend()
+    table = model._meta.db_table
+    this_month = timezone.now().date().replace(day=1)
+    return [
+        create_partition(table, add_months(this_month, offset))
+        for offset in range(months_ahead + 1)
+    ]
+
+
+def convert_to_partitioned(model, months_ahead=3, batch_size=50000, keep_legacy=False):
+    """
+    Rebuild an existing table as a monthly range-partitioned table.
+
+    The original table is renamed, its rows are copied across in id ranges,
+    and the model's indexes and foreign keys are recreated on the new parent.
+    """
+    _check_backend()
+    meta = model._meta
+    table = meta.db_table
+    column = meta.get_field(PARTITIONED_MODELS[meta.label]).column
+    legacy = f'{table}_legacy'
+    qn = connection.ops.quote_name
+
+    if is_partitioned(table):
+        raise PartitioningError(f'{table} is already partitioned.')
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+            cursor.execute(
+                f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS '
+                f'INCLUDING CONSTRAINTS INCLUDING IDENTITY) PARTITION BY RANGE ({qn(column)})'
+            )
+            # Unique constraints on a partitioned table must include the partition key.
+            cursor.execute(
+                f'ALTER TABLE {qn(table)} ADD PRIMARY KEY ({qn(meta.pk.column)}, {qn(column)})'
+            )
+            cursor.execute(f'SELECT MIN({qn(column)}), MAX({qn(meta.pk.column)}) FROM {qn(legacy)}')
+            oldest, max_id = cursor.fetchone()
+
+        this_month = timezone.now().date().replace(day=1)
+        month = oldest.date().replace(day=1) if oldest else this_month
+        while month <= add_months(this_month, months_ahead):
+            create_partition(table, month)
+            month = add_months(month, 1)
+
+        columns = ', '.join(qn(field.column) for field in meta.concrete_fields)
+        with connection.cursor() as cursor:
+            start = 0
+            while max_id is not None and start <= max_id:
+                cursor.execute(
+                    f'INSERT INTO {qn(table)} ({columns}) SELECT {columns} FROM {qn(legacy)} '
+                    f'WHERE {qn(meta.pk.column)} >= %s AND {qn(meta.pk.column)} < %s',
+                    [start, start + batch_size]
+                )
+                start += batch_size
+            if max_id is not None:
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, %s), %s)",
+                    [table, meta.pk.column, max_id]
+                )
+            if keep_legacy:
+                cursor.execute(
+                    f'ALTER TABLE {qn(legacy)} RENAME TO {qn(legacy + "_" + timezone.now().strftime("%Y%m%d"))}'
+                )
+            else:
+                cursor.execute(f'DROP TABLE {qn(legacy)} CASCADE')
+
+        _recreate_indexes_and_constraints(model)
+
+
+def _recreate_indexes_and_constraints(model):
+    meta = model._meta
+    table = meta.db_table
+    qn = connection.ops.quote_name
+
+    with connection.schema_editor(atomic=False) as editor, connection.cursor() as cursor:
+        for field in meta.concrete_fields:
+            if field.remote_field and field.db_constraint:
+                target = field.target_field
+                cursor.execute(
+                    f'ALTER TABLE {qn(table)} ADD CONSTRAINT '
+                    f'{qn(f"{table}_{field.column}_fk_p")} FOREIGN KEY ({qn(field.column)}) '
+                    f'REFERENCES {qn(target.model._meta.db_table)} ({qn(target.column)}) '
+                    f'DEFERRABLE INITIALLY DEFERRED'
+                )
+            if field.db_index and not field.primary_key:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {qn(f"{table}_{field.column}_idx_p")} '
+                    f'ON {qn(table)} ({qn(field.column)})'
+                )
+        for index in meta.indexes:
+            # A kept legacy table still owns the index name, so release it first.
+            cursor.execute(f'DROP INDEX IF EXISTS {qn(index.name)}')
+            editor.add_index(model, index)
+
+
+def drop_expired_partitions(model, retention_months, archive_dir=None):
+    """
+    Detach and drop partitions older than ``retention_months``.
+
+    With ``archive_dir`` each partition is first exported to
+    ``<archive_dir>/<partition>.csv.gz``. Returns the dropped partition names.
+    """
+    _check_backend()
+    table = model._meta.db_table
+    cutoff = add_months(timezone.now().date().replace(day=1), -retention_months)
+    qn = connection.ops.quote_name
+
+    dropped = []
+    for name, month_start in list_partitions(table):
+        if add_months(month_start, 1) > cutoff:
+            continue
+        if archive_dir:
+            archive_partition(name, archive_dir)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}')
+            cursor.execute(f'DROP TABLE {qn(name)}')
+        logger.info('Dropped expired partition %s', name)
+        dropped.append(name)
+    return dropped
+
+
+def archive_partition(name, archive_dir):
+    """Stream a partition to ``<archive_dir>/<name>.csv.gz`` with COPY."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{name}.csv.gz')
+    qn = connection.ops.quote_name
+    with gzip.open(path, 'wb') as archive, connection.cursor() as cursor:
+        cursor.copy_expert(f'COPY {qn(name)} TO STDOUT WITH (FORMAT csv, HEADER)', archive)
+    return path
+
+
+def prune_user_sessions(retention_months, batch_size=10000):
+    """
+    Delete inactive UserSession rows past retention, in small batches.
+
+    Sessions are updated in place and keep a globally unique ``session_key``,
+    which a ``created_at`` partitioned table cannot enforce, so they are pruned
+    by key range instead of by dropping partitions.
+    """
+    UserSession = apps.get_model('accounts', 'UserSession')
+    cutoff = timezone.now() - timedelta(days=30 * retention_months)
+    deleted = 0
+    while True:
+        ids = list(
+            UserSession.objects
+            .filter(is_active=False, last_activity__lt=cutoff)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += UserSession.objects.filter(pk__in=ids).delete()[0]
+
+
+def maintain_partitions(months_ahead=None, archive_dir=None):
+    """
+    Pre-create future partitions and enforce retention for every table.
+
+    On databases other than PostgreSQL the partitioned tables are skipped with
+    a log message; UserSession pruning does not depend on partitioning and
+    still runs.
+    """
+    months_ahead = months_ahead if months_ahead is not None else getattr(
+        settings, 'AUDIT_PARTITION_MONTHS_AHEAD', 3
+    )
+    archive_dir = archive_dir or getattr(settings, 'AUDIT_ARCHIVE_DIR', None)
+    retention = getattr(settings, 'AUDIT_RETENTION_MONTHS', {})
+
+    report = {}
+    partitioned_models = PARTITIONED_MODELS
+    if connection.vendor != 'postgresql':
+        logger.info('Table partitioning requires PostgreSQL, skipping partition maintenance')
+        partitioned_models = {}
+    for label in partitioned_models:
+        model = apps.get_model(label)
+        if not is_partitioned(model._meta.db_table):
+            logger.warning('%s is not partitioned yet, skipping', model._meta.db_table)
+            continue
+        created = ensure_partitions(model, months_ahead)
+        dropped = []
+        if label in retention:
+            dropped = drop_expired_partitions(model, retention[label], archive_dir)
+        report[label] = {'ensured': created, 'dropped': dropped}
+
+    if 'accounts.UserSession' in retention:
+        report['accounts.UserSession'] = {
+            'deleted': prune_user_sessions(retention['accounts.UserSession'])
+        }
+    return report
@@ -0,0 +1,10 @@
+"""
+Signals sent by core model helpers.
+"""
+from django.dispatch import Signal
+
+# Sent with ``queryset`` (the live rows) before a bulk soft delete.
+pre_soft_delete = Signal()
+
+# Sent with ``queryset`` (the deleted rows) before a bulk restore.
+pre_restore = Signal()
@@ -0,0 +1,105 @@
+"""
+Celery tasks for the core app.
+"""
+import logging
+from smtplib import SMTPServerDisconnected
+
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+logger = logging.getLogger(__name__)
+
+# One mail connection per worker process, reused across tasks.
+_connection = None
+
+
+def get_pooled_connection():
+    """Return this worker's open mail connection, opening it if needed."""
+    global _connection
+    if _connection is None:
+        _connection = get_connection(fail_silently=False)
+        _connection.open()
+    return _connection
+
+
+def reset_pooled_connection():
+    """Close and forget this worker's mail connection."""
+    global _connection
+    if _connection is not None:
+        try:
+            _connection.close()
+        except Exception:
+            pass
+        _connection = None
+
+
+def _send(message):
+    email = EmailMessage(
+        subject=message['subject'],
+        body=message['body'],
+        from_email=message['from_email'],
+        to=message['recipients'],
+    )
+    try:
+        get_pooled_connection().send_messages([email])
+    except SMTPServerDisconnected:
+        # The server dropped an idle pooled connection; reconnect once.
+        reset_pooled_connection()
+        get_pooled_connection().send_messages([email])
+
+
+@shared_task(bind=True, max_retries=getattr(settings, 'EMAIL_DELIVERY_MAX_RETRIES', 5))
+def deliver_emails(self, messages):
+    """
+    Deliver queued emails over the worker's pooled connection.
+
+    Messages that fail are retried with exponential backoff; once retries are
+    exhausted their recipients, subject and error are written to the
+    ``FailedEmail`` dead-letter table. Bodies are not kept: they carry live
+    verification and reset tokens.
+    """
+    failed = []
+    errors = {}
+    for message in messages:
+        try:
+            _send(message)
+        except Exception as exc:
+            logger.warning('Email delivery to %s failed: %s', message['recipients'], exc)
+            reset_pooled_connection()
+            failed.append(message)
+            errors[id(message)] = exc
+
+    if not failed:
+        return len(messages)
+
+    if self.request.retries >= self.max_retries:
+        from .models import FailedEmail
+        FailedEmail.objects.bulk_create([
+            FailedEmail(
+                subject=message['subject'],
+                from_email=message['from_email'],
+                recipients=message['recipients'],
+                error=str(errors[id(message)]),
+                attempts=self.request.retries + 1,
+            )
+            for message in failed
+        ])
+        return len(messages) - len(failed)
+
+    backoff = getattr(settings, 'EMAIL_DELIVERY_RETRY_BACKOFF', 30)
+    raise self.retry(args=[failed], countdown=backoff * (2 ** self.request.retries))
+
+
+@shared_task
+def flush_email_buffer():
+    """Deliver the emails buffered by ``queue_email`` in batches."""
+    from .mail import flush_buffered_emails
+    return flush_buffered_emails()
+
+
+@shared_task
+def maintain_audit_partitions():
+    """Pre-create future audit partitions and drop expired ones."""
+    from .partitioning import maintain_partitions
+    return maintain_partitions()
@@ -0,0 +1,90 @@
+from unittest import mock
+
+import fakeredis
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from apps.core.mail import BUFFER_KEY, FLUSH_SCHEDULED_KEY, flush_buffered_emails, queue_email, queue_emails
+from apps.core.tasks import reset_pooled_connection
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@override_settings(EMAIL_BACKEND=EMAIL_BACKEND, EMAIL_BATCH_WINDOW=2, EMAIL_BATCH_SIZE=2)
+class EmailBufferTests(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        for patcher in (
+            mock.patch('django_redis.get_redis_connection', return_value=self.redis),
+            mock.patch('apps.core.tasks.flush_email_buffer.apply_async'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        from apps.core.tasks import flush_email_buffer
+        self.schedule_flush = flush_email_buffer.apply_async
+        reset_pooled_connection()
+        self.addCleanup(reset_pooled_connection)
+
+    def queue(self, count, start=0):
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(start, start + count):
+                queue_email(f'Subject {number}', 'Body', [f'user{number}@example.com'])
+
+    def test_single_emails_are_buffered_until_the_flush(self):
+        self.queue(3)
+        self.assertEqual(self.redis.llen(BUFFER_KEY), 3)
+        self.assertEqual(mail.outbox, [])
+        self.schedule_flush.assert_called_once_with(countdown=2)
+
+    def test_flush_delivers_buffered_emails_in_batches(self):
+        self.queue(3)
+        with mock.patch('apps.core.tasks.deliver_emails.delay') as deliver:
+            self.assertEqual(flush_buffered_emails(), 3)
+        self.assertEqual([len(call.args[0]) for call in deliver.call_args_list], [2, 1])
+        self.assertEqual(self.redis.llen(BUFFER_KEY), 0)
+
+        self.assertEqual(flush_buffered_emails(), 0)
+
+    def test_emails_are_sent_after_the_flush(self):
+        self.queue(3)
+        flush_buffered_emails()
+        self.assertEqual([message.subject for message in mail.outbox], ['Subject 0', 'Subject 1', 'Subject 2'])
+        self.assertEqual(mail.outbox[0].to, ['user0@example.com'])
+
+    def test_flush_lets_the_next_email_schedule_another(self):
+        self.queue(1)
+        flush_buffered_emails()
+        self.assertFalse(self.redis.exists(FLUSH_SCHEDULED_KEY))
+
+        self.queue(1, start=1)
+        self.assertEqual(self.schedule_flush.call_count, 2)
+
+    def test_nothing_is_buffered_when_the_transaction_rolls_back(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            queue_email('Subject', 'Body', ['user@example.com'])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.redis.llen(BUFFER_KEY), 0)
+
+    def test_unavailable_redis_sends_the_email_on_its_own(self):
+        server = fakeredis.FakeServer()
+        server.connected = False
+        with mock.patch('django_redis.get_redis_connection', return_value=fakeredis.FakeRedis(server=server)):
+            self.queue(1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.schedule_flush.assert_not_called()
+
+    @override_settings(EMAIL_BATCH_WINDOW=0)
+    def test_zero_window_disables_buffering(self):
+        self.queue(1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(self.redis.llen(BUFFER_KEY), 0)
+
+    def test_explicit_batches_skip_the_buffer(self):
+        messages = [
+            {'subject': 'Digest', 'body': 'Body', 'from_email': 'noreply@example.com', 'recipients': [address]}
+            for address in ('a@example.com', 'b@example.com')
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_emails(messages)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(self.redis.llen(BUFFER_KEY), 0)
@@ -6,3 +6,5 @@ class TransactionsConfig(AppConfig):
     name = 'apps.transactions'
     verbose_name = 'Transactions'
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,82 @@
+"""
+Signal receivers for the transactions app.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.accounts.models import UserStats
+
+from .models import Transaction
+
+_UNKNOWN = object()
+_STATE_FIELDS = ('user_id', 'status', 'amount', 'transaction_type')
+
+
+def _stats_state(instance):
+    """Return the (status, spend) pair a transaction is counted under."""
+    spend = Decimal('0')
+    if instance.status == 'completed' and instance.transaction_type != 'refund':
+        spend = Decimal(instance.amount or 0)
+    return instance.status, spend
+
+
+def _state_deltas(deltas, state, sign):
+    """Add (``sign`` = 1) or remove (-1) one transaction counted under ``state``."""
+    status, spend = state
+    deltas['transactions_total'] = deltas.get('transactions_total', 0) + sign
+    deltas[f'transactions_{status}'] = deltas.get(f'transactions_{status}', 0) + sign
+    deltas['total_spend'] = deltas.get('total_spend', Decimal('0')) + sign * spend
+
+
+@receiver(post_init, sender=Transaction)
+def remember_transaction_stats_state(sender, instance, **kwargs):
+    """Remember the owner and counted state as loaded, to diff against on save."""
+    if instance.pk is None:
+        instance._stats_state = None
+        instance._stats_user_id = None
+    elif all(field in instance.__dict__ for field in _STATE_FIELDS):
+        instance._stats_state = _stats_state(instance)
+        instance._stats_user_id = instance.user_id
+    else:
+        instance._stats_state = _UNKNOWN
+
+
+@receiver(pre_save, sender=Transaction)
+def load_transaction_stats_state(sender, instance, **kwargs):
+    """Fetch the stored owner and state when they were deferred at load time."""
+    if getattr(instance, '_stats_state', None) is not _UNKNOWN:
+        return
+    stored = Transaction.objects.filter(pk=instance.pk).only(*_STATE_FIELDS).first()
+    instance._stats_state = _stats_state(stored) if stored else None
+    instance._stats_user_id = stored.user_id if stored else None
+
+
+@receiver(post_save, sender=Transaction)
+def update_user_stats_on_transaction_save(sender, instance, created, **kwargs):
+    """Move the transaction between counters and spend totals, and between owners if reassigned."""
+    old_state = None if created else getattr(instance, '_stats_state', None)
+    old_user_id = None if created else getattr(instance, '_stats_user_id', instance.user_id)
+    new_state = _stats_state(instance)
+    instance._stats_state = new_state
+    instance._stats_user_id = instance.user_id
+    if old_state == new_state and old_user_id == instance.user_id:
+        return
+
+    per_user = defaultdict(dict)
+    if old_state is not None and old_user_id is not None:
+        _state_deltas(per_user[old_user_id], old_state, -1)
+    _state_deltas(per_user[instance.user_id], new_state, 1)
+
+    for user_id, deltas in per_user.items():
+        UserStats.apply_deltas(user_id, deltas)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_user_stats_on_transaction_delete(sender, instance, **kwargs):
+    """Remove a deleted transaction from the owner's counters."""
+    deltas = {}
+    _state_deltas(deltas, _stats_state(instance), -1)
+    UserStats.apply_deltas(instance.user_id, deltas, create=False)
@@ -0,0 +1,12 @@
+"""
+Celery application for blockbustre project.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blockbustre.settings')
+
+app = Celery('blockbustre')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -70,6 +70,7 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.accounts.middleware.SessionActivityMiddleware',
 ]
 
 ROOT_URLCONF = 'blockbustre.urls'
@@ -155,7 +156,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -171,7 +172,110 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'document_verification': env('DOCUMENT_VERIFICATION_RATE', default='60/min'),
+        'document_verification_file': env('DOCUMENT_VERIFICATION_FILE_RATE', default='30/hour'),
+    },
+}
+
+# RBAC permission cache
+ROLE_PERMISSION_CACHE_TIMEOUT = env.int('ROLE_PERMISSION_CACHE_TIMEOUT', default=60 * 60)
+ROLE_PERMISSION_LOCAL_CACHE_SIZE = env.int('ROLE_PERMISSION_LOCAL_CACHE_SIZE', default=256)
+ROLE_PERMISSION_LOCAL_CACHE_TTL = env.int('ROLE_PERMISSION_LOCAL_CACHE_TTL', default=30)
+
+# Login audit buffer ('memory', 'redis' or 'sync')
+LOGIN_AUDIT_BACKEND = env('LOGIN_AUDIT_BACKEND', default='memory')
+LOGIN_AUDIT_FLUSH_INTERVAL_MS = env.int('LOGIN_AUDIT_FLUSH_INTERVAL_MS', default=500)
+LOGIN_AUDIT_BATCH_SIZE = env.int('LOGIN_AUDIT_BATCH_SIZE', default=200)
+
+# Login rate limiting (Redis sliding windows)
+LOGIN_RATE_LIMIT_ENABLED = env.bool('LOGIN_RATE_LIMIT_ENABLED', default=True)
+LOGIN_RATE_LIMIT_WINDOW = env.int('LOGIN_RATE_LIMIT_WINDOW', default=300)
+LOGIN_RATE_LIMIT_IP_ATTEMPTS = env.int('LOGIN_RATE_LIMIT_IP_ATTEMPTS', default=20)
+LOGIN_RATE_LIMIT_EMAIL_FAILURES = env.int('LOGIN_RATE_LIMIT_EMAIL_FAILURES', default=5)
+
+# Reverse proxies whose X-Forwarded-For header is trusted (addresses or CIDR networks)
+TRUSTED_PROXIES = env.list('TRUSTED_PROXIES', default=[])
+
+# Cached user snapshots for JWT authentication
+USER_SNAPSHOT_CACHE_TIMEOUT = env.int('USER_SNAPSHOT_CACHE_TIMEOUT', default=15 * 60)
+USER_PAYLOAD_CACHE_TIMEOUT = env.int('USER_PAYLOAD_CACHE_TIMEOUT', default=15 * 60)
+
+# Session activity tracking (coalesced in Redis, flushed by Celery beat)
+SESSION_ACTIVITY_TRACKING_ENABLED = env.bool('SESSION_ACTIVITY_TRACKING_ENABLED', default=True)
+SESSION_ACTIVITY_GRANULARITY = env.int('SESSION_ACTIVITY_GRANULARITY', default=60)
+
+# GDPR data export archives (kept outside MEDIA_ROOT so they are never public)
+GDPR_EXPORT_DIR = env('GDPR_EXPORT_DIR', default=str(BASE_DIR / 'private' / 'gdpr_exports'))
+GDPR_EXPORT_TTL = env.int('GDPR_EXPORT_TTL', default=7 * 24 * 60 * 60)
+# Seconds after which a pending export is considered lost and may be requested again
+GDPR_EXPORT_PENDING_TIMEOUT = env.int('GDPR_EXPORT_PENDING_TIMEOUT', default=30 * 60)
+
+# Resumable contract document uploads
+DOCUMENT_UPLOAD_DIR = env('DOCUMENT_UPLOAD_DIR', default=str(BASE_DIR / 'private' / 'uploads'))
+DOCUMENT_UPLOAD_MAX_SIZE = env.int('DOCUMENT_UPLOAD_MAX_SIZE', default=2 * 1024 ** 3)
+DOCUMENT_UPLOAD_MAX_CHUNK_SIZE = env.int('DOCUMENT_UPLOAD_MAX_CHUNK_SIZE', default=8 * 1024 * 1024)
+DOCUMENT_UPLOAD_TTL = env.int('DOCUMENT_UPLOAD_TTL', default=24 * 60 * 60)
+
+# Public document verification by uploaded file
+DOCUMENT_VERIFICATION_MAX_SIZE = env.int('DOCUMENT_VERIFICATION_MAX_SIZE', default=50 * 1024 * 1024)
+
+# Document metadata extraction
+DOCUMENT_METADATA_WORKERS = env.int('DOCUMENT_METADATA_WORKERS', default=2)
+DOCUMENT_METADATA_CACHE_TIMEOUT = env.int('DOCUMENT_METADATA_CACHE_TIMEOUT', default=30 * 24 * 60 * 60)
+DOCUMENT_METADATA_TIMEOUT = env.int('DOCUMENT_METADATA_TIMEOUT', default=120)
+DOCUMENT_METADATA_RETRIES = env.int('DOCUMENT_METADATA_RETRIES', default=3)
+
+# Compiled contract templates (per-process LRU) and bulk rendering limit
+CONTRACT_TEMPLATE_CACHE_SIZE = env.int('CONTRACT_TEMPLATE_CACHE_SIZE', default=128)
+CONTRACT_TEMPLATE_MAX_BATCH = env.int('CONTRACT_TEMPLATE_MAX_BATCH', default=1000)
+
+# Public document verification cache (registered / unknown hashes)
+VERIFICATION_CACHE_TIMEOUT = env.int('VERIFICATION_CACHE_TIMEOUT', default=24 * 60 * 60)
+VERIFICATION_NEGATIVE_CACHE_TIMEOUT = env.int('VERIFICATION_NEGATIVE_CACHE_TIMEOUT', default=60)
+
+# Blockchain anchoring (pending documents are published as one Merkle root per batch)
+BLOCKCHAIN_CLIENT = env('BLOCKCHAIN_CLIENT', default='web3')
+BLOCKCHAIN_PRIVATE_KEY = env('PRIVATE_KEY', default='')
+# Signing keys shared by every network; a network's own 'private_keys' take precedence
+BLOCKCHAIN_PRIVATE_KEYS = env.list('PRIVATE_KEYS', default=[])
+BLOCKCHAIN_NETWORKS = {
+    'ethereum_mainnet': {'chain_id': 1, 'confirmations': 12, 'rpc_url': env('ETHEREUM_MAINNET_RPC_URL', default='')},
+    'ethereum_sepolia': {'chain_id': 11155111, 'confirmations': 3, 'rpc_url': env('ETHEREUM_RPC_URL', default='')},
+    'polygon_mainnet': {'chain_id': 137, 'confirmations': 64, 'rpc_url': env('POLYGON_RPC_URL', default='')},
+    'polygon_mumbai': {'chain_id': 80001, 'confirmations': 5, 'rpc_url': env('POLYGON_MUMBAI_RPC_URL', default='')},
+    'bsc_mainnet': {'chain_id': 56, 'confirmations': 15, 'rpc_url': env('BSC_RPC_URL', default='')},
+    'bsc_testnet': {'chain_id': 97, 'confirmations': 3, 'rpc_url': env('BSC_TESTNET_RPC_URL', default='')},
 }
+ANCHOR_BATCH_SIZE = env.int('ANCHOR_BATCH_SIZE', default=5000)
+ANCHOR_INTERVAL = env.int('ANCHOR_INTERVAL', default=5 * 60)
+
+# Confirmation tracking (default depth for networks without 'confirmations')
+DEPLOYMENT_CONFIRMATIONS = env.int('DEPLOYMENT_CONFIRMATIONS', default=12)
+CONFIRMATION_POLL_INTERVAL = env.int('CONFIRMATION_POLL_INTERVAL', default=15)
+BLOCKCHAIN_RPC_BATCH_SIZE = env.int('BLOCKCHAIN_RPC_BATCH_SIZE', default=100)
+
+# Deployment pipeline (concurrent batches per network, retry backoff in seconds)
+DEPLOYMENT_CONCURRENCY = env.int('DEPLOYMENT_CONCURRENCY', default=2)
+DEPLOYMENT_MAX_RETRIES = env.int('DEPLOYMENT_MAX_RETRIES', default=5)
+DEPLOYMENT_RETRY_BACKOFF = env.int('DEPLOYMENT_RETRY_BACKOFF', default=60)
+DEPLOYMENT_RETRY_BACKOFF_MAX = env.int('DEPLOYMENT_RETRY_BACKOFF_MAX', default=6 * 60 * 60)
+DEPLOYMENT_PROCESSING_TIMEOUT = env.int('DEPLOYMENT_PROCESSING_TIMEOUT', default=15 * 60)
+
+# Signer pool (seconds before a transaction counts as stuck, gas bump per replacement)
+SIGNER_STUCK_TIMEOUT = env.int('SIGNER_STUCK_TIMEOUT', default=90)
+SIGNER_GAS_BUMP_PERCENT = env.int('SIGNER_GAS_BUMP_PERCENT', default=15)
+SIGNER_MAX_BUMPS = env.int('SIGNER_MAX_BUMPS', default=3)
+
+# Gas price oracle (seconds between samples, fresh and stale-while-revalidate lifetimes) and quote size
+GAS_ORACLE_INTERVAL = env.int('GAS_ORACLE_INTERVAL', default=15)
+GAS_ORACLE_TTL = env.int('GAS_ORACLE_TTL', default=30)
+GAS_ORACLE_STALE_TTL = env.int('GAS_ORACLE_STALE_TTL', default=5 * 60)
+GAS_ORACLE_BLOCKS = env.int('GAS_ORACLE_BLOCKS', default=20)
+PRICING_QUOTE_MAX_ITEMS = env.int('PRICING_QUOTE_MAX_ITEMS', default=100)
+
+# JWT revocation store (revoked jtis expire with the token)
+JWT_REVOCATION_STORE = env('JWT_REVOCATION_STORE', default='apps.accounts.revocation.RedisRevocationStore')
 
 # JWT Settings
 SIMPLE_JWT = {
@@ -209,13 +313,22 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = env('EMAIL_FILE_PATH', default=str(BASE_DIR / 'logs' / 'emails'))
 EMAIL_HOST = env('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = env('EMAIL_PORT', default=587)
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='noreply@blockbustre.com')
+EMAIL_DELIVERY_MAX_RETRIES = env.int('EMAIL_DELIVERY_MAX_RETRIES', default=5)
+EMAIL_DELIVERY_RETRY_BACKOFF = env.int('EMAIL_DELIVERY_RETRY_BACKOFF', default=30)
+# Seconds single emails wait in the Redis buffer to be delivered together (0 disables buffering)
+EMAIL_BATCH_WINDOW = env.int('EMAIL_BATCH_WINDOW', default=2)
+EMAIL_BATCH_SIZE = env.int('EMAIL_BATCH_SIZE', default=100)
+
+# Frontend URL used in emailed links
+FRONTEND_URL = env('FRONTEND_URL', default='http://localhost:3000')
 
 # Celery Configuration
 CELERY_BROKER_URL = env('REDIS_URL')
@@ -224,6 +337,54 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', default=False)
+CELERY_BEAT_SCHEDULE = {
+    'flush-session-activity': {
+        'task': 'apps.accounts.tasks.flush_session_activity',
+        'schedule': timedelta(seconds=env.int('SESSION_ACTIVITY_FLUSH_INTERVAL', default=60)),
+    },
+    'cleanup-gdpr-exports': {
+        'task': 'apps.accounts.tasks.cleanup_gdpr_exports',
+        'schedule': timedelta(hours=1),
+    },
+    'flush-email-buffer': {
+        'task': 'apps.core.tasks.flush_email_buffer',
+        'schedule': timedelta(minutes=1),
+    },
+    'maintain-audit-partitions': {
+        'task': 'apps.core.tasks.maintain_audit_partitions',
+        'schedule': timedelta(hours=24),
+    },
+    'cleanup-document-uploads': {
+        'task': 'apps.contracts.tasks.cleanup_document_uploads',
+        'schedule': timedelta(hours=1),
+    },
+    'dispatch-deployments': {
+        'task': 'apps.contracts.tasks.dispatch_deployments',
+        'schedule': timedelta(seconds=ANCHOR_INTERVAL),
+    },
+    'track-confirmations': {
+        'task': 'apps.contracts.tasks.track_confirmations',
+        'schedule': timedelta(seconds=CONFIRMATION_POLL_INTERVAL),
+    },
+    'recover-signer-nonces': {
+        'task': 'apps.contracts.tasks.recover_signer_nonces',
+        'schedule': timedelta(seconds=SIGNER_STUCK_TIMEOUT),
+    },
+    'refresh-gas-prices': {
+        'task': 'apps.contracts.tasks.refresh_gas_prices',
+        'schedule': timedelta(seconds=GAS_ORACLE_INTERVAL),
+    },
+}
+
+# Audit table partitioning and retention (months)
+AUDIT_PARTITION_MONTHS_AHEAD = env.int('AUDIT_PARTITION_MONTHS_AHEAD', default=3)
+AUDIT_RETENTION_MONTHS = {
+    'accounts.LoginAttempt': env.int('LOGIN_ATTEMPT_RETENTION_MONTHS', default=6),
+    'accounts.UserSession': env.int('USER_SESSION_RETENTION_MONTHS', default=6),
+    'contracts.ContractDeploymentLog': env.int('DEPLOYMENT_LOG_RETENTION_MONTHS', default=24),
+}
+AUDIT_ARCHIVE_DIR = env('AUDIT_ARCHIVE_DIR', default=None)
 
 # Logging
 LOGGING = {